@@ -8,10 +8,12 @@ load_dotenv()
 USER = os.getenv("EUSER")
 PASSWORD = os.getenv("EPASS")
 
-# URLs
-URL_INICIAL = "https://sicredi.elaw.com.br/processoView.elaw"
-URL_LOGOUT  = "https://sicredi.elaw.com.br/logout"
-URL_LOGIN   = "https://sicredi.elaw.com.br/login.elaw"
+# URLs (ELAW_URL_BASE permite apontar o robô para outro host, ex.: o mock local de tools/)
+URL_BASE    = os.getenv("ELAW_URL_BASE", "https://sicredi.elaw.com.br").rstrip("/")
+URL_INICIAL = f"{URL_BASE}/processoView.elaw"
+URL_LOGOUT  = f"{URL_BASE}/logout"
+URL_LOGIN   = f"{URL_BASE}/login.elaw"
+URL_AGENDAMENTOS = f"{URL_BASE}/agendamentoContenciosoList.elaw"
 
 # Execução
 HEADLESS = os.getenv("HEADLESS", "true").lower() == "true"
@@ -21,20 +23,101 @@ WORK_END_HOUR   = int(os.getenv("WORK_END_HOUR",   "18"))
 # Horário exato desejado para a execução
 RUN_AT_HOUR = int(os.getenv("HOUR", "10"))
 RUN_AT_MINUTE = int(os.getenv("MINUTE", "30"))
+# Pré-aquecimento (min): a execução começa esse tempo antes de RUN_AT_HOUR:RUN_AT_MINUTE
+# (navegador, login, página e formulário prontos) e só o "Gerar" espera o horário. 0 desliga.
+PRE_AQUECER_MIN = float(os.getenv("PRE_AQUECER_MIN", "3"))
+
+# Status das tarefas no filtro de Agendamentos (data-item-value):
+# 4 = Atrasadas, 8 = A vencer, 1 = Pendentes
+STATUS_TAREFAS = [v.strip() for v in os.getenv("STATUS_TAREFAS", "4,8,1").split(",") if v.strip()]
 
 INTERVALO_EXECUCAO = int(os.getenv("INTERVALO_EXECUCAO", "60"))
 INTERVALO_BAIXAR   = int(os.getenv("INTERVALO_BAIXAR",   "5"))
 
+# Consulta de relatório pronto: intervalo denso (s) perto do horário estimado
+# e primeiro passo (s) do backoff exponencial longe dele
+POLL_DENSO_S   = float(os.getenv("POLL_DENSO_S",   "15"))
+POLL_INICIAL_S = float(os.getenv("POLL_INICIAL_S", "30"))
+
+# Pool de navegadores aquecidos (reuso entre execuções e retentativas)
+POOL_TAMANHO   = int(os.getenv("POOL_TAMANHO",   "1"))
+POOL_MAX_USOS  = int(os.getenv("POOL_MAX_USOS",  "20"))
+POOL_MAX_RSS_MB = int(os.getenv("POOL_MAX_RSS_MB", "1500"))
+
+# Validade (minutos) dos cookies de sessão salvos em disco
+SESSAO_TTL_MIN = int(os.getenv("SESSAO_TTL_MIN", "60"))
+
 # Arquivo/pastas
 OUTPUT_NAME = os.getenv("OUTPUT_NAME", "relatorio_recebimentos.xlsx")
 FINAL_DIR   = Path(os.getenv("FINAL_DIR", ".")).expanduser()
 
+# Relatórios a gerar (JSON, ver services/jobs.py). Sem o arquivo: um relatório
+# "Tarefas" do ano corrente gravado em OUTPUT_NAME
+RELATORIOS_PATH = Path(os.getenv("RELATORIOS_PATH", "relatorios.json")).expanduser()
+
 # Downloads temporários (relativo ao projeto)
 DOWNLOADS_TEMP = Path.cwd() / "downloads_temp"
 
+# Histórico append-only de execuções (spans de tempo, métricas)
+HISTORICO_PATH = Path(os.getenv("HISTORICO_PATH", "logs/historico.jsonl")).expanduser()
+
+# Conta comandos WebDriver e mede a latência de cada um (por tipo e por função)
+INSTRUMENTAR_WEBDRIVER = os.getenv("INSTRUMENTAR_WEBDRIVER", "true").lower() == "true"
+
+# Cache local do robô (chromedriver resolvido, sessão etc.)
+CACHE_DIR = Path(os.getenv("CACHE_DIR", Path.cwd() / ".cache")).expanduser()
+
+# Partições mensais (jobs com "particionar": "mes"): cache dos meses fechados
+# e a cada quantos dias um mês fechado é solicitado de novo (0 = nunca)
+PARTICOES_DIR = CACHE_DIR / "particoes"
+PARTICAO_REVALIDAR_DIAS = int(os.getenv("PARTICAO_REVALIDAR_DIAS", "30"))
+
+# Modo delta (jobs com "modo": "delta"): banco local das linhas e a cada
+# quantos dias o período completo é pedido de novo para reconciliar
+DELTA_DIR = CACHE_DIR / "delta"
+DELTA_DB = Path(os.getenv("DELTA_DB", DELTA_DIR / "delta.sqlite3")).expanduser()
+DELTA_REFRESH_DIAS = int(os.getenv("DELTA_REFRESH_DIAS", "7"))
+
+# Conversão do .xlsx publicado (jobs com "formatos": ["csv", "parquet", ...])
+CSV_SEPARADOR = os.getenv("CSV_SEPARADOR", ",")
+# Colunas (regex no cabeçalho) gravadas sempre como texto, mesmo se numéricas
+COLUNAS_TEXTO = os.getenv("COLUNAS_TEXTO", r"^id\b|\bid$|n[úu]mero|processo|cnj|c[óo]digo|cpf|cnpj")
+
+# Backend do navegador: "selenium" (chromedriver) ou "playwright" (API async,
+# services/navegador_playwright.py; exige `pip install playwright`).
+# PLAYWRIGHT_CDP_URL conecta a um Chrome já aberto (--remote-debugging-port)
+NAVEGADOR_BACKEND = os.getenv("NAVEGADOR_BACKEND", "selenium").strip().lower()
+PLAYWRIGHT_CDP_URL = os.getenv("PLAYWRIGHT_CDP_URL") or None
+
+# Perfil "enxuto": bloqueia recursos que o robô não usa (URLs e tipos abaixo),
+# desliga imagens e não espera o load completo (pageLoadStrategy "eager").
+# "padrao" carrega tudo. CSS fica fora por default: os diálogos do PrimeFaces
+# dependem dele para esconder/mostrar elementos.
+PERFIL_NAVEGADOR = os.getenv("PERFIL_NAVEGADOR", "padrao").strip().lower()
+BLOQUEAR_URLS = [u.strip() for u in os.getenv(
+    "BLOQUEAR_URLS", "*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*hotjar*"
+).split(",") if u.strip()]
+BLOQUEAR_TIPOS = [t.strip().lower() for t in os.getenv("BLOQUEAR_TIPOS", "image,font,media").split(",") if t.strip()]
+
+# Motor da execução: "http" (sem navegador; refaz os POSTs JSF do portal,
+# services/motor_http.py), "navegador" (Chrome/Selenium) ou "auto" (HTTP,
+# seguindo no Chrome se o portal responder algo fora do previsto). O padrão
+# fica no navegador até a receita (RECEITA_PADRAO/MOTOR_HTTP_RECEITA) ser
+# conferida contra o portal real: um campo a menos no POST gera outro relatório
+MOTOR = os.getenv("MOTOR", "navegador").strip().lower()
+# JSON opcional sobrescrevendo IDs/campos do motor HTTP (RECEITA_PADRAO)
+MOTOR_HTTP_RECEITA = Path(os.getenv("MOTOR_HTTP_RECEITA", "motor_http.json")).expanduser()
+
 # Validações leves
 if not USER or not PASSWORD:
     raise RuntimeError("EUSER/EPASS não definidos no .env")
+if NAVEGADOR_BACKEND not in ("selenium", "playwright"):
+    raise RuntimeError(f"NAVEGADOR_BACKEND inválido: {NAVEGADOR_BACKEND!r} (use selenium ou playwright)")
+if PERFIL_NAVEGADOR not in ("padrao", "enxuto"):
+    raise RuntimeError(f"PERFIL_NAVEGADOR inválido: {PERFIL_NAVEGADOR!r} (use padrao ou enxuto)")
+if MOTOR not in ("http", "navegador", "auto"):
+    raise RuntimeError(f"MOTOR inválido: {MOTOR!r} (use http, navegador ou auto)")
 
 FINAL_DIR.mkdir(parents=True, exist_ok=True)
 DOWNLOADS_TEMP.mkdir(parents=True, exist_ok=True)
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
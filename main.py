@@ -1,20 +1,26 @@
 import logging
 import shutil
-import tempfile
 import time
 from logging.handlers import RotatingFileHandler
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from config import (
-    INTERVALO_BAIXAR, OUTPUT_NAME, FINAL_DIR,
+    INTERVALO_BAIXAR, FINAL_DIR, MOTOR, PRE_AQUECER_MIN,
     WORK_START_HOUR, WORK_END_HOUR, RUN_AT_HOUR, RUN_AT_MINUTE
 )
-from services.driver_factory import create_driver
-from services.auth import login, logout, is_logged_in
-from services.reports_iniciais import gerar_relatorio
-from services.baixar_relatorio import baixar_relatorio
-from services.utils import dentro_horario, proximo_dia_util_at, perguntar_com_timeout, proxima_execucao_agendada
+from services.session_pool import obter_sessao, devolver_sessao, encerrar_pool
+from services.jobs import carregar_jobs
+from services.pipeline import MotorNavegador, submeter_jobs, baixar_jobs
+from services.motor_http import MotorHTTP, MotorHTTPErro
+from services.particoes import expandir_particoes, montar_particionados
+from services.delta import expandir_delta, publicar_delta
+from services.conversao import converter_saidas
+from services.utils import (
+    aguardar_horario, dentro_horario, proximo_dia_util_at, perguntar_com_timeout, proxima_execucao_agendada
+)
 from services.checkpoint import checkpoint_clear, checkpoint_load, checkpoint_save
+from services.tracing import iniciar_execucao, registrar, anotar
+from services import metricas_webdriver
 
 # =================== LOGGING ===================
 LOG_PATH = Path("logs/robo-elaw.log")
@@ -34,76 +40,148 @@ logger.addHandler(ch)
 # =================================================
 
 
-def run_once():
-    estado = checkpoint_load()   # pode ser None
-    profile_path = Path(tempfile.mkdtemp())
-    driver = create_driver()
+def _pendencias_do_checkpoint(estado, jobs):
+    """Pendências salvas; checkpoints antigos (um único relatorio_id) viram um job padrão."""
+    if estado.get("jobs") or not estado.get("relatorio_id"):
+        return estado.get("jobs") or []
+    return [{
+        "nome": jobs[0]["nome"],
+        "arquivo": jobs[0]["arquivo"],
+        "pasta": None,
+        "particao": None,
+        "delta": None,
+        "relatorio_id": estado["relatorio_id"],
+        "solicitado_em": estado.get("solicitado_em") or time.time(),
+        "baixado": False,
+        "ultimo_nao_pronto": None,
+    }]
 
-    # ======================================
-    # 0) LOGIN SEMPRE É GARANTIDO AO INICIAR
-    # ======================================
-    try:
-        if not is_logged_in(driver):
-            logger.info("🔐 Sessão inexistente. Realizando login...")
-            login(driver)
-        else:
-            logger.info("🔒 Sessão já estava ativa.")
-    except:
-        logger.info("🔐 Realizando login inicial...")
-        login(driver)
 
-    try:
-        # ===============================
-        # 1) GERAR RELATÓRIO
-        # ===============================
+def _registrar_deriva(agendado, inicio, submetido_em):
+    """Deriva entre o horário agendado e o primeiro "Gerar" (clique/POST) da execução."""
+    deriva = submetido_em - agendado.timestamp()
+    registrar(
+        "agendamento",
+        agendado=agendado.isoformat(timespec="seconds"),
+        inicio_s=round(inicio - agendado.timestamp(), 3),
+        deriva_s=round(deriva, 3),
+        pre_aquecer_min=PRE_AQUECER_MIN,
+    )
+    logger.info(f"🎯 Primeiro relatório solicitado {deriva:+.2f}s em relação ao horário agendado "
+                f"({agendado:%H:%M}).")
 
-        # CASO 1 -> retomando
-        if estado and estado.get("stage") == "gerou_relatorio":
-            relatorio_id = estado["relatorio_id"]  # aqui é seguro
-            logger.info(f"🔁 Retomando com relatório ID salvo: {relatorio_id}")
 
-        # CASO 2 -> começando do zero
-        else:
-            logger.info("🧾 Gerando relatório de processos...")
-            relatorio_id = gerar_relatorio(driver)
-            logger.info(f"🆔 ID: {relatorio_id}")
-            checkpoint_save("gerou_relatorio", relatorio_id)
+def _executar(motor, tarefas, pendencias, salvar):
+    """Solicita o que faltar e baixa tudo com o motor informado."""
+    pendencias = submeter_jobs(motor, tarefas, ao_submeter=salvar, pendencias=pendencias)
+    if len(pendencias) == 1:
+        anotar(relatorio_id=pendencias[0]["relatorio_id"])
+    logger.info(f"⬇️ Aguardando e baixando relatórios (motor {motor.nome})...")
+    baixar_jobs(motor, pendencias, FINAL_DIR, INTERVALO_BAIXAR, ao_baixar=salvar)
+    return pendencias
+
+
+def run_once(agendado=None):
+    """
+    Uma execução completa. Com `agendado` (datetime), pode começar antes do
+    horário (pré-aquecimento): tudo corre normalmente e só o "Gerar" do
+    primeiro relatório espera até `agendado`.
+    """
+    estado = checkpoint_load()   # pode ser None
+    execucao_id = iniciar_execucao(retomada=bool(estado))
+    metricas_webdriver.zerar()
+    inicio = time.perf_counter()
+    inicio_ts = time.time()
+    ok = False
+    logger.info(f"🧭 Execução {execucao_id}")
+    liberar = None
+    if agendado:
+        liberado = []
+
+        def liberar():
+            # chamado logo antes do clique/POST do "Gerar": é o instante da submissão
+            aguardar_horario(agendado)
+            if not liberado:
+                liberado.append(time.time())
+                _registrar_deriva(agendado, inicio_ts, liberado[0])
 
+    # Navegador (pool aquecido, login garantido) só é aberto se o motor HTTP
+    # estiver desligado ou falhar
+    nav = None
+
+    try:
         # ===============================
-        # 2) BAIXAR RELATÓRIO
+        # 1) GERAR E BAIXAR RELATÓRIOS (todos os jobs solicitados sem esperar)
         # ===============================
+        jobs = carregar_jobs()
+        # meses fechados em cache ficam de fora; jobs delta pedem só a janela móvel
+        tarefas = expandir_delta(expandir_particoes(jobs))
+        salvar = lambda pendencias: checkpoint_save("gerou_relatorio", jobs=pendencias)
+
+        # CASO 1 -> download já estava completo
+        if estado and estado.get("stage") == "baixou_relatorio":
+            logger.info("📦 Download já havia sido concluído anteriormente. Ignorando etapa.")
+            pendencias = None
 
-        # CASE 1 — Primeira execução do dia (estado == None)
-        if estado is None:
-            logger.info("⬇️ Baixando relatório (primeira execução)...")
-            baixar_relatorio(driver, relatorio_id, FINAL_DIR, OUTPUT_NAME, INTERVALO_BAIXAR)
-            checkpoint_save("baixou_relatorio", relatorio_id)
+        # CASO 2 -> retomando (relatórios já solicitados; pede só os que faltarem)
+        elif estado and estado.get("stage") == "gerou_relatorio":
+            pendencias = _pendencias_do_checkpoint(estado, jobs)
+            logger.info(f"🔁 Retomando {len(pendencias)} relatório(s) já solicitado(s): "
+                        + ", ".join(f"{p['nome']}={p['relatorio_id']}" for p in pendencias))
 
-        # CASE 2 — Retomando após gerar relatório (não chegou a baixar)
-        elif estado.get("stage") == "gerou_relatorio":
-            logger.info("⬇️ Retomando download pendente do relatório...")
-            baixar_relatorio(driver, relatorio_id, FINAL_DIR, OUTPUT_NAME, INTERVALO_BAIXAR)
-            checkpoint_save("baixou_relatorio", relatorio_id)
+        # CASO 3 -> começando do zero
+        else:
+            logger.info(f"🧾 Solicitando {len(tarefas)} relatório(s): {', '.join(j['nome'] for j in tarefas)}...")
+            pendencias = []
 
-        # CASE 3 — Download já estava completo
-        elif estado.get("stage") == "baixou_relatorio":
-            logger.info("📦 Download já havia sido concluído anteriormente. Ignorando etapa.")
+        if pendencias is not None:
+            concluido = False
+            if MOTOR in ("http", "auto"):
+                try:
+                    pendencias = _executar(MotorHTTP(antes_de_gerar=liberar), tarefas, pendencias, salvar)
+                    concluido = True
+                except MotorHTTPErro as e:
+                    if MOTOR == "http":
+                        raise
+                    logger.warning(f"⚠️ Motor HTTP falhou ({e}); seguindo no navegador.")
+                    anotar(fallback_navegador=str(e))
+                    # o que já foi solicitado/baixado pelo HTTP está no checkpoint
+                    pendencias = (checkpoint_load() or {}).get("jobs") or pendencias
+            if not concluido:
+                nav = obter_sessao()
+                pendencias = _executar(MotorNavegador(nav, liberar), tarefas, pendencias, salvar)
 
+            montar_particionados(jobs, FINAL_DIR)
+            publicar_delta(jobs, FINAL_DIR)
+            converter_saidas(jobs, FINAL_DIR)
+            checkpoint_save("baixou_relatorio", jobs=pendencias)
 
         logger.info("✅ Execução OK.")
+        ok = True
 
     except Exception as e:
         logger.exception(f"❌ Erro durante a execução: {e}")
         raise
 
     finally:
-        try:
-            logout(driver)
-        except:
-            pass
-
-        driver.quit()
+        # Mantém o navegador aquecido para a próxima execução/retentativa; se a
+        # execução falhou (página/diálogo/iframe em estado incerto), é reciclado.
+        if nav is not None:
+            devolver_sessao(nav, saudavel=ok)
         checkpoint_clear()
+        registrar("execucao", ok=ok, duracao_s=round(time.perf_counter() - inicio, 3))
+        registrar("webdriver", **metricas_webdriver.exportar())
+        for linha in metricas_webdriver.resumo_texto():
+            logger.info(f"📡 {linha}")
+
+def _janela_agendada(now):
+    """
+    (agendado, falta): o horário programado de hoje e os segundos que faltam
+    para o início do pré-aquecimento (PRE_AQUECER_MIN antes dele).
+    """
+    agendado = now.replace(hour=RUN_AT_HOUR, minute=RUN_AT_MINUTE, second=0, microsecond=0)
+    return agendado, (agendado - now).total_seconds() - PRE_AQUECER_MIN * 60
+
 
 def main():
     
@@ -118,11 +196,18 @@ def main():
             if ultima_execucao and ultima_execucao.date() == now.date():
                 logger.info("✅ Já executado hoje. Aguardando próximo dia útil 08:00...")
                 prox = proximo_dia_util_at(WORK_START_HOUR)
+                # acorda antes se o pré-aquecimento começar antes do expediente
+                prox += timedelta(seconds=min(0, _janela_agendada(prox)[1]))
                 time.sleep(max(10, (prox - now).total_seconds()))
                 continue
 
+            # Horário programado e janela de pré-aquecimento (que pode começar
+            # antes de WORK_START_HOUR, ex.: 07:57 para uma execução às 08:00)
+            agendado, falta = _janela_agendada(now)
+            pre_aquecendo = falta <= 0 < (agendado - now).total_seconds() and now.weekday() < 5
+
             # Fora do horário permitido
-            if not dentro_horario(WORK_START_HOUR, WORK_END_HOUR):
+            if not pre_aquecendo and not dentro_horario(WORK_START_HOUR, WORK_END_HOUR):
                 resposta = perguntar_com_timeout(
                     "⏸ Fora do horário de execução (Seg-Sex, 08h às 18h).\n👉 Deseja executar mesmo assim? (Y/N): ",
                     timeout=15,
@@ -133,25 +218,32 @@ def main():
                     executar_fora_do_horario = True
                 else:
                     logger.info("⏳ Fora do horário, aguardando 30 minutos para checar novamente...")
-                    time.sleep(30 * 60)
+                    # sem perder o pré-aquecimento de hoje, se ele começar antes disso
+                    time.sleep(falta if 0 < falta < 30 * 60 and now.weekday() < 5 else 30 * 60)
                     continue
 
             # =============================
             # Checa horário programado apenas se NÃO for execução forçada
             # =============================
-            if not executar_fora_do_horario:
-                if not (now.hour == RUN_AT_HOUR and now.minute >= RUN_AT_MINUTE):
+            if executar_fora_do_horario:
+                agendado = None
+            else:
+                if pre_aquecendo:
+                    logger.info(f"🔥 Pré-aquecendo: execução iniciada antes do horário; "
+                                f"o relatório será solicitado às {agendado:%H:%M:%S}.")
+                elif not (now.hour == RUN_AT_HOUR and now.minute >= RUN_AT_MINUTE):
                     logger.info(
                         f"⏳ Aguardando horário programado: "
                         f"{RUN_AT_HOUR:02d}:{RUN_AT_MINUTE:02d} "
                         f"(agora {now.hour:02d}:{now.minute:02d})"
                     )
-                    time.sleep(60)
+                    # acorda exatamente no início do pré-aquecimento quando ele estiver a menos de 1 min
+                    time.sleep(falta if 0 < falta < 60 else 60)
                     continue
 
             # Execução principal
             try:
-                run_once()
+                run_once(agendado)
                 ultima_execucao = datetime.now()
             except Exception as e:
                 logger.exception(f"❌ Erro na execução principal: {e}")
@@ -160,6 +252,9 @@ def main():
 
     except KeyboardInterrupt:
         logger.info("🧩 Execução interrompida manualmente pelo usuário. 🛑 Encerrando com segurança...")
+
+    finally:
+        encerrar_pool()
  
 if __name__ == "__main__":
     main()
@@ -1,42 +1,177 @@
-import time
+import json
 import logging
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from config import USER, PASSWORD, URL_INICIAL, URL_LOGOUT
+import os
+import time
+import requests
+from config import USER, PASSWORD, URL_INICIAL, URL_LOGOUT, CACHE_DIR, SESSAO_TTL_MIN
+from services.esperas import aguardar_ocioso
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # sem cryptography os cookies não são persistidos (nunca em texto puro)
+    Fernet = None
+
+logger = logging.getLogger("robo-elaw")
+
+COOKIES_FILE = CACHE_DIR / "sessao.cookies"
+CHAVE_FILE   = CACHE_DIR / "sessao.key"
 
-def login(driver, timeout=30):
-    driver.get(URL_INICIAL)
-    wait = WebDriverWait(driver, timeout)
+def login(nav, timeout=30):
+    nav.ir(URL_INICIAL)
 
     # Espera os campos corretos da tela de login
-    usuario = wait.until(EC.presence_of_element_located((By.ID, "fieldUser")))
-    senha   = wait.until(EC.presence_of_element_located((By.ID, "fieldPassword")))
+    nav.esperar("id=fieldUser", timeout)
+    nav.esperar("id=fieldPassword", timeout)
 
-    usuario.clear()
-    usuario.send_keys(USER)
-    senha.clear()
-    senha.send_keys(PASSWORD)
-    senha.submit()  # equivale ao pressionar Enter
+    nav.preencher("id=fieldUser", USER)
+    nav.preencher("id=fieldPassword", PASSWORD)
+    nav.tecla("Enter", "id=fieldPassword")  # submete o form
 
     # Espera até a URL mudar para o painel
-    wait.until(lambda d: "processoView.elaw" in d.current_url or "homePage.elaw" in d.current_url)
+    limite = time.monotonic() + timeout
+    while "processoView.elaw" not in nav.url and "homePage.elaw" not in nav.url:
+        if time.monotonic() > limite:
+            raise TimeoutError(f"Login não chegou ao painel em {timeout}s (URL: {nav.url})")
+        time.sleep(0.1)
 
     return True
 
-def logout(driver):
-    driver.get(URL_LOGOUT)
-    time.sleep(2)
+def logout(nav):
+    """Logout explícito: encerra a sessão no portal e apaga os cookies salvos."""
+    nav.ir(URL_LOGOUT)
+    aguardar_ocioso(nav, teto=2)
+    apagar_cookies()
     logging.info("↩️ Logout executado.")
 
-def is_logged_in(driver):
+def is_logged_in(nav):
     """
     Verifica se o usuário está logado no eLaw.
     Retorna True se o elemento de perfil estiver visível na página.
     """
+    return bool(nav.buscar("li.profile-item .profile-name"))
+
+
+# =================== SESSÃO PERSISTIDA (COOKIES) ===================
+
+_cifra = None   # Fernet validado uma vez; False = não persistir cookies
+
+
+def _gerar_chave():
+    """Cria CHAVE_FILE já com permissão 0600 (só o dono lê a chave)."""
+    CHAVE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        fd = os.open(CHAVE_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:   # outro processo criou no meio-tempo
+        return
+    with os.fdopen(fd, "wb") as f:
+        f.write(Fernet.generate_key())
+
+
+def _fernet():
+    """
+    Cifra dos cookies: chave do .env (SESSAO_CHAVE) ou gerada em CACHE_DIR.
+    None (cookies não são persistidos) sem cryptography ou com chave inválida.
+    """
+    global _cifra
+    if _cifra is None:
+        _cifra = False
+        if Fernet is None:
+            logger.warning("⚠️ 'cryptography' não instalado: cookies da sessão não serão salvos.")
+        else:
+            try:
+                chave = os.getenv("SESSAO_CHAVE")
+                if not chave:
+                    if not CHAVE_FILE.exists():
+                        _gerar_chave()
+                    chave = CHAVE_FILE.read_bytes()
+                _cifra = Fernet(chave)
+            except (ValueError, TypeError, OSError) as e:
+                logger.warning(f"⚠️ Chave da sessão inválida ou inacessível ({e}): "
+                               "cookies da sessão não serão salvos.")
+    return _cifra or None
+
+
+def salvar_cookies(nav):
+    """Grava (cifrados) os cookies da sessão atual do navegador."""
+    gravar_cookies(nav.cookies())
+
+
+def gravar_cookies(cookies):
+    """Grava (cifrada) uma lista de cookies no formato do WebDriver ({name, value, domain, path})."""
+    f = _fernet()
+    if f is None:
+        return
+    COOKIES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    COOKIES_FILE.write_bytes(f.encrypt(json.dumps(cookies).encode("utf-8")))
+
+
+def carregar_cookies():
+    """Lê os cookies salvos; None se não existirem, expiraram (TTL) ou não decifram."""
+    f = _fernet()
+    if f is None or not COOKIES_FILE.exists():
+        return None
+    try:
+        return json.loads(f.decrypt(COOKIES_FILE.read_bytes(), ttl=SESSAO_TTL_MIN * 60))
+    except (InvalidToken, ValueError):
+        return None
+
+
+def apagar_cookies():
+    if COOKIES_FILE.exists():
+        COOKIES_FILE.unlink()
+
+
+def sessao_valida(cookies, timeout=10) -> bool:
+    """
+    Probe leve: GET em processoView.elaw com os cookies, sem renderizar a página.
+    A sessão é válida se o portal responder 200 sem redirecionar para o login.
+    """
     try:
-        driver.find_element(By.CSS_SELECTOR, "li.profile-item .profile-name")
-        return True
-    except NoSuchElementException:
+        resp = requests.get(
+            URL_INICIAL,
+            cookies={c["name"]: c["value"] for c in cookies},
+            allow_redirects=False,
+            timeout=timeout,
+        )
+    except requests.RequestException:
         return False
+    return resp.status_code == 200 and "fieldPassword" not in resp.text
+
+
+def _cookies_do_navegador(nav):
+    try:
+        return nav.cookies() or None
+    except Exception:
+        return None
+
+
+def garantir_login(nav):
+    """
+    Garante sessão autenticada no navegador:
+    1) probe com os cookies do próprio navegador (instância aquecida);
+    2) probe com os cookies salvos em disco, injetando-os no navegador;
+    3) só então o login completo pelo formulário (salvando os novos cookies).
+    Probe e login são cronometrados separadamente.
+    """
+    for origem, cookies in (("navegador", _cookies_do_navegador(nav)), ("disco", carregar_cookies())):
+        if not cookies:
+            continue
+        inicio = time.perf_counter()
+        valida = sessao_valida(cookies)
+        logger.info(
+            f"🔎 Probe de sessão ({origem}): {'válida' if valida else 'inválida'} "
+            f"em {time.perf_counter() - inicio:.2f}s"
+        )
+        if valida:
+            if origem == "disco":
+                nav.definir_cookies(cookies)
+            logger.info("🔒 Sessão já estava ativa.")
+            return
+        if origem == "disco":
+            apagar_cookies()
+
+    logger.info("🔐 Sessão inexistente. Realizando login...")
+    inicio = time.perf_counter()
+    login(nav)
+    logger.info(f"🔐 Login por formulário concluído em {time.perf_counter() - inicio:.2f}s")
+    salvar_cookies(nav)
@@ -1,126 +1,255 @@
 # services/relatorios.py
 
 import os
-import time
 import shutil
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, ElementClickInterceptedException
-from services.utils import esperar_download
-from config import INTERVALO_BAIXAR as CFG_INTERVALO, OUTPUT_NAME as CFG_NOME
+from services.esperas import aguardar_ocioso, aguardar_atualizacao
+from services.download_http import baixar_http, href_baixavel
+from services.validacao import arquivo_completo
+from services.tracing import span
+from config import URL_INICIAL
 from pathlib import Path
 
 
-def baixar_relatorio(driver, relatorio_id, pasta_final, nome_arquivo=None, intervalo_baixar=None):
+# Página "Meus relatórios"
+_PAGINA_LISTA = "userElawReportRequestList.elaw"
+
+# Colunas da tabela "Meus relatórios" (tableElawReportRequest_data)
+_COL_DOWNLOAD = 2
+_COL_ID = 3
+
+# Lê a página atual da tabela de uma vez: linhas (índice, ID, status, presença/href
+# do link), o botão "próxima página" habilitado e o filtro da coluna ID (se houver).
+# A coluna de status é localizada pelo cabeçalho; sem ela, usa o texto da célula de download.
+# Botão e filtro são marcados com data-robo (seletor estável para qualquer backend).
+_JS_LER_PAGINA = """
+    var colDownload = arguments[0], colId = arguments[1];
+    var corpo = document.getElementById('tableElawReportRequest_data');
+    if (!corpo) return null;
+    var tabela = corpo.closest('table');
+    var colStatus = -1;
+    if (tabela) {
+        Array.from(tabela.querySelectorAll('thead th')).forEach(function(th, i){
+            if (colStatus < 0 && /status|situa/i.test(th.textContent)) colStatus = i;
+        });
+    }
+    var linhas = Array.from(corpo.rows).map(function(tr, indice){
+        var tds = tr.cells;
+        if (tds.length <= colId) return null;
+        var link = tds[colDownload] ? tds[colDownload].querySelector('a') : null;
+        var celStatus = colStatus >= 0 && tds[colStatus] ? tds[colStatus] : tds[colDownload];
+        return {
+            indice: indice,
+            id: tds[colId].textContent.trim(),
+            status: celStatus ? celStatus.textContent.trim() : '',
+            tem_link: !!link,
+            href: link ? link.href : null
+        };
+    }).filter(function(r){ return r !== null; });
+
+    var raiz = corpo.closest('.ui-datatable') || (tabela && tabela.parentNode) || document;
+    var proxima = raiz.querySelector('.ui-paginator-next:not(.ui-state-disabled)')
+        || document.querySelector('.ui-paginator-next:not(.ui-state-disabled)');
+    var thId = tabela ? tabela.querySelectorAll('thead th')[colId] : null;
+    var filtro = thId ? thId.querySelector('input.ui-column-filter, input[type=text]') : null;
+    document.querySelectorAll('[data-robo]').forEach(function(el){ el.removeAttribute('data-robo'); });
+    if (proxima) proxima.setAttribute('data-robo', 'proxima');
+    if (filtro) filtro.setAttribute('data-robo', 'filtro');
+    return {linhas: linhas, proxima: !!proxima, filtro: !!filtro, filtro_valor: filtro ? filtro.value : null};
+"""
+
+_SEL_PROXIMA = "[data-robo='proxima']"
+_SEL_FILTRO = "[data-robo='filtro']"
+
+
+_JS_CLICAR_DOWNLOAD = """
+    var tr = document.getElementById('tableElawReportRequest_data').rows[arguments[0]];
+    tr.cells[%d].querySelector('a').click();
+""" % _COL_DOWNLOAD
+
+
+def ler_pagina(nav):
     """
-    Acessa 'Meus relatórios', pesquisa e baixa o relatório pelo ID fornecido.
-    Caso o arquivo ainda não esteja pronto, refaz TODO o processo a cada X minutos.
-    O arquivo é baixado localmente e movido para o diretório final (sobrescrevendo se existir).
-
-    Parâmetros:
-        driver            -> instância ativa do WebDriver
-        relatorio_id      -> ID do relatório a baixar
-        pasta_final       -> diretório destino do arquivo
-        nome_arquivo      -> nome final opcional (default = OUTPUT_NAME do config)
-        intervalo_baixar  -> tempo em minutos entre tentativas (default = INTERVALO_BAIXAR do config)
+    Lê, em uma única ida ao navegador, a página atual de "Meus relatórios":
+    {"linhas": [{indice, id, status, tem_link, href}, ...],
+     "proxima": seletor|None, "filtro": seletor|None, "filtro_valor": str|None}.
     """
-    wait = WebDriverWait(driver, 30)
+    pagina = nav.avaliar(_JS_LER_PAGINA, _COL_DOWNLOAD, _COL_ID)
+    if not pagina:
+        return {"linhas": [], "proxima": None, "filtro": None, "filtro_valor": None}
+    pagina["proxima"] = _SEL_PROXIMA if pagina["proxima"] else None
+    pagina["filtro"] = _SEL_FILTRO if pagina["filtro"] else None
+    return pagina
 
-    # Defaults vindos do config, se não forem passados
-    nome_arquivo = nome_arquivo or CFG_NOME
-    intervalo_baixar = intervalo_baixar or CFG_INTERVALO
 
-    # Cria pasta temporária para download local
-    pasta_temp = Path(os.getcwd()) / "downloads_temp"
+def ler_relatorios(nav):
+    """Linhas visíveis (página atual) de "Meus relatórios"."""
+    return ler_pagina(nav)["linhas"]
+
+
+def ler_lista(nav, timeout=10):
+    """
+    Linhas da página atual de "Meus relatórios" SEM filtro de ID: limpa o
+    filtro que um localizar_relatorio anterior tenha deixado, para que uma
+    única leitura veja todos os relatórios recentes.
+    """
+    pagina = ler_pagina(nav)
+    if pagina["filtro"] is not None and (pagina["filtro_valor"] or "").strip():
+        if aguardar_atualizacao(nav, pagina["filtro"], "tableElawReportRequest_data", timeout, valor=""):
+            aguardar_ocioso(nav, teto=3)
+            pagina = ler_pagina(nav)
+    return pagina["linhas"]
+
+
+def _ja_passou(linhas, relatorio_id) -> bool:
+    """
+    Lista em ordem decrescente de ID (mais recentes primeiro) e a página já
+    chegou abaixo do ID procurado: ele não está nas páginas seguintes.
+    """
+    try:
+        ids = [int(r["id"]) for r in linhas]
+        alvo = int(relatorio_id)
+    except ValueError:
+        return False
+    return len(ids) > 1 and ids[0] >= ids[-1] and ids[-1] < alvo
+
+
+def localizar_relatorio(nav, relatorio_id, max_paginas=50, timeout=10):
+    """
+    Linha do relatório `relatorio_id` em "Meus relatórios" (ou None).
+    Usa o filtro da coluna ID quando a tabela tiver um (custo constante);
+    senão percorre as páginas — uma leitura por página — parando assim que a
+    ordem decrescente de IDs mostra que o relatório não está adiante.
+    """
+    relatorio_id = str(relatorio_id).strip()
+    pagina = ler_pagina(nav)
+
+    if pagina["filtro"] is not None and (pagina["filtro_valor"] or "").strip() != relatorio_id:
+        if aguardar_atualizacao(nav, pagina["filtro"], "tableElawReportRequest_data", timeout,
+                                valor=relatorio_id):
+            aguardar_ocioso(nav, teto=3)
+            pagina = ler_pagina(nav)
+
+    for numero in range(1, max_paginas + 1):
+        alvo = next((r for r in pagina["linhas"] if r["id"] == relatorio_id), None)
+        if alvo:
+            if numero > 1:
+                print(f"📄 Relatório {relatorio_id} encontrado na página {numero}.")
+            return alvo
+        if pagina["proxima"] is None or _ja_passou(pagina["linhas"], relatorio_id):
+            return None
+        if not aguardar_atualizacao(nav, pagina["proxima"], "tableElawReportRequest_data", timeout):
+            return None
+        aguardar_ocioso(nav, teto=3)
+        pagina = ler_pagina(nav)
+    return None
+
+
+def abrir_meus_relatorios(nav):
+    """Navegação completa: página inicial -> maleta -> 'Meus relatórios' -> Pesquisar."""
+    # 1️⃣ Vai para a página inicial após login
+    nav.ir(URL_INICIAL)
+    aguardar_ocioso(nav, teto=3)
+
+    # 2️⃣ Abre o menu da maleta
+    nav.clicar("xpath=//li[@class='notifications-item']//i[contains(@class,'pi-briefcase')]/..")
+    aguardar_ocioso(nav, teto=2)
+
+    # 3️⃣ Clica em "Meus relatórios"
+    meus_relatorios = nav.esperar(
+        "xpath=//a[starts-with(@href,'userElawReportRequestList.elaw?faces-redirect=true&etoken=')]",
+        estado="clicavel",
+    )
+    nav.clicar(meus_relatorios, js=True)
+    print("📂 Acessando 'Meus relatórios'...")
+    aguardar_ocioso(nav, teto=2)
+
+    # 4️⃣ Clica em "Pesquisar"
+    nav.clicar(nav.esperar("id=btnPesquisar", estado="clicavel"), js=True)
+    print("🔎 Pesquisa disparada.")
+    aguardar_ocioso(nav, teto=3)
+
+
+def atualizar_meus_relatorios(nav, timeout=15) -> bool:
+    """
+    Se o navegador já está em 'Meus relatórios', refaz só a pesquisa AJAX
+    (btnPesquisar -> tableElawReportRequest_data), sem recarregar a página.
+    Retorna False quando é preciso navegar de novo (outra página, sessão ou
+    ViewState expirado: o update não chega ou a página é redirecionada).
+    """
+    try:
+        if _PAGINA_LISTA not in nav.url:
+            return False
+    except Exception:
+        return False
+    if not aguardar_atualizacao(nav, "btnPesquisar", "tableElawReportRequest_data", timeout):
+        return False
+    aguardar_ocioso(nav, teto=3)
+    return _PAGINA_LISTA in nav.url
+
+
+def consultar_lista(nav, navegar=False):
+    """
+    Deixa a tabela de 'Meus relatórios' atualizada: refresh AJAX no lugar quando
+    possível, navegação completa quando `navegar` ou quando o refresh falha.
+    """
+    atualizado = False
+    if not navegar:
+        with span("atualizar_tabela"):
+            atualizado = atualizar_meus_relatorios(nav)
+        if atualizado:
+            print("🔄 Tabela de 'Meus relatórios' atualizada sem recarregar a página.")
+        else:
+            print("♻️ Página não respondeu ao update (sessão/ViewState expirado?). Navegando de novo...")
+    if not atualizado:
+        with span("navegar"):
+            abrir_meus_relatorios(nav)
+    nav.esperar("id=tableElawReportRequest_data")
+
+
+def baixar_pronto(nav, alvo, pasta_final, nome_arquivo, pasta_temp=None):
+    """
+    Baixa a linha `alvo` (de ler_pagina/localizar_relatorio, já com link) para
+    pasta_final/nome_arquivo: HTTP direto com a sessão do navegador e, se falhar,
+    clique no link + espera do download. Levanta exceção se não conseguir.
+    """
+    pasta_temp = Path(pasta_temp or Path(os.getcwd()) / "downloads_temp")
     pasta_temp.mkdir(parents=True, exist_ok=True)
 
-    while True:
+    # Caminho rápido: baixa o href direto por HTTP com a sessão do navegador
+    if href_baixavel(alvo["href"]):
         try:
-            # 1️⃣ Vai para a página inicial após login
-            driver.get("https://sicredi.elaw.com.br/processoView.elaw")
-            time.sleep(3)
-
-            # 2️⃣ Abre o menu da maleta
-            menu_btn = wait.until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, "//li[@class='notifications-item']//i[contains(@class,'pi-briefcase')]/..")
-                )
-            )
-            menu_btn.click()
-            time.sleep(2)
-
-            # 3️⃣ Clica em "Meus relatórios"
-            meus_relatorios = wait.until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, "//a[starts-with(@href,'userElawReportRequestList.elaw?faces-redirect=true&etoken=')]")
+            with span("download_http"):
+                destino_final, sha256 = baixar_http(
+                    nav, alvo["href"], Path(pasta_final) / nome_arquivo
                 )
-            )
-            driver.execute_script("arguments[0].click();", meus_relatorios)
-            print("📂 Acessando 'Meus relatórios'...")
-            time.sleep(2)
-
-            # 4️⃣ Clica em "Pesquisar"
-            btn_pesquisar = wait.until(EC.element_to_be_clickable((By.ID, "btnPesquisar")))
-            driver.execute_script("arguments[0].click();", btn_pesquisar)
-            print("🔎 Pesquisa disparada.")
-            time.sleep(3)
-
-            # 5️⃣ Procura o relatório na tabela
-            tabela = wait.until(EC.presence_of_element_located((By.ID, "tableElawReportRequest_data")))
-            linhas = tabela.find_elements(By.TAG_NAME, "tr")
-
-            alvo = None
-            for linha in linhas:
-                colunas = linha.find_elements(By.TAG_NAME, "td")
-                if len(colunas) > 3 and colunas[3].text.strip() == relatorio_id:
-                    alvo = linha
-                    break
-
-            if not alvo:
-                raise Exception(f"❌ Relatório com ID {relatorio_id} não encontrado na lista.")
-
-            # 6️⃣ Verifica se o link de download está disponível
-            try:
-                link_download = alvo.find_element(By.CSS_SELECTOR, "td:nth-child(3) a")
-                driver.execute_script("arguments[0].click();", link_download)
-                print(f"📥 Download iniciado para relatório ID {relatorio_id}")
-
-                # 7️⃣ Espera o download terminar e verifica se o arquivo foi realmente salvo
-                arquivo_baixado = esperar_download(pasta_temp, nome_arquivo)
-
-                if not arquivo_baixado or not os.path.exists(arquivo_baixado):
-                    raise FileNotFoundError(f"Arquivo {nome_arquivo} não foi encontrado após o download.")
-
-                # 8️⃣ Move para o diretório final (sobrescreve se existir)
-                destino_final = os.path.join(pasta_final, nome_arquivo)
-                if os.path.exists(destino_final):
-                    os.remove(destino_final)
-
-                shutil.move(arquivo_baixado, destino_final)
-                print(f"✅ Arquivo movido e sobrescrito em: {destino_final}")
-                break  # 🔹 Download concluído, encerra o loop
-
-            except NoSuchElementException:
-                print(f"⏳ Relatório {relatorio_id} ainda não está pronto. "
-                    f"Tentando novamente em {intervalo_baixar} minutos...")
-                time.sleep(intervalo_baixar * 60)
-                continue
-
-            except ElementClickInterceptedException:
-                print(f"⚠️ O botão de download está visível, mas não clicável ainda. "
-                    f"Nova tentativa em {intervalo_baixar} minutos...")
-                time.sleep(intervalo_baixar * 60)
-                continue
-
-            except Exception as e:
-                print(f"⚠️ Erro inesperado ao baixar relatório {relatorio_id}: {type(e).__name__} → {e}")
-                time.sleep(intervalo_baixar * 60)
-                continue
-
+                print(f"✅ Arquivo baixado via HTTP em: {destino_final} (sha256 {sha256[:12]}…)")
+            return destino_final
         except Exception as e:
-            print(f"⚠️ Erro durante tentativa de download: {e}")
-            print(f"🔁 Repetindo processo em {intervalo_baixar} minutos...")
-            time.sleep(intervalo_baixar * 60)
-
-    print("✅ Download solicitado e concluído com sucesso.")
+            print(f"⚠️ Download HTTP falhou ({e}). Usando o clique no navegador...")
+
+    # O backend acompanha só este download (eventos do navegador), numa pasta
+    # própria do job: downloads de jobs diferentes nunca se misturam
+    with span("download_navegador"):
+        def clicar():
+            nav.avaliar(_JS_CLICAR_DOWNLOAD, alvo["indice"])
+            print(f"📥 Download iniciado para relatório ID {alvo['id']}")
+
+        arquivo_baixado = nav.baixar(clicar, pasta_temp / Path(nome_arquivo).stem, nome_arquivo)
+
+    if not arquivo_baixado or not os.path.exists(arquivo_baixado):
+        raise FileNotFoundError(f"Arquivo {nome_arquivo} não foi encontrado após o download.")
+
+    # Nunca publica arquivo truncado em FINAL_DIR
+    if not arquivo_completo(arquivo_baixado):
+        os.remove(arquivo_baixado)
+        raise ValueError(f"Arquivo {nome_arquivo} incompleto/corrompido após o download.")
+
+    # Move para o diretório final (sobrescreve se existir)
+    with span("mover_arquivo"):
+        destino_final = os.path.join(pasta_final, nome_arquivo)
+        if os.path.exists(destino_final):
+            os.remove(destino_final)
+
+        shutil.move(arquivo_baixado, destino_final)
+        print(f"✅ Arquivo movido e sobrescrito em: {destino_final}")
+    return Path(destino_final)
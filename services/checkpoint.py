@@ -5,11 +5,11 @@ from pathlib import Path
 STATE_FILE = Path("state.json")
 
 
-def checkpoint_save(stage: str, relatorio_id: str = None):
+def checkpoint_save(stage: str, jobs: list = None):
     data = {
         "data": datetime.now().strftime("%Y-%m-%d"),
         "stage": stage,
-        "relatorio_id": relatorio_id
+        "jobs": jobs
     }
     STATE_FILE.write_text(json.dumps(data), encoding="utf-8")
 
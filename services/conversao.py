@@ -0,0 +1,242 @@
+# services/conversao.py
+"""
+Conversão em streaming do .xlsx publicado para CSV e/ou Parquet (Power BI).
+
+Job com "formatos": ["csv"], ["xlsx", "parquet"] etc. (default ["xlsx"]).
+Os arquivos saem ao lado do .xlsx, com o mesmo nome-base; se "xlsx" não
+estiver na lista, o .xlsx é removido após a conversão.
+
+Tipos por coluna: datas como datas (células numéricas com estilo de data ou
+texto dd/mm/aaaa [hh:mm]), identificadores como texto (cabeçalho casando com
+COLUNAS_TEXTO ou listado em `colunas_texto` do job), números como números.
+A planilha é lida linha a linha (services/xlsx.py) e gravada em lotes: a
+memória não cresce com o número de linhas. No Parquet, uma primeira passada
+infere o tipo de cada coluna sobre o arquivo inteiro (alargando int -> float,
+date -> timestamp e, se misturar, -> texto), então nenhum valor vira nulo.
+Parquet exige pyarrow (opcional).
+"""
+
+import csv
+import os
+import re
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from config import CSV_SEPARADOR, COLUNAS_TEXTO
+from services.tracing import span
+from services import xlsx
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional
+    pa = pq = None
+
+LOTE_PARQUET = 10_000
+
+_EPOCA_EXCEL = datetime(1899, 12, 30)
+_DATA_TEXTO = re.compile(r"^(\d{2})/(\d{2})/(\d{4})(?: (\d{2}):(\d{2})(?::(\d{2}))?)?$")
+
+
+def _serial_para_data(valor: float):
+    dt = _EPOCA_EXCEL + timedelta(days=valor)
+    return dt.date() if valor == int(valor) else dt.replace(microsecond=0)
+
+
+def _texto_para_data(texto: str):
+    m = _DATA_TEXTO.match(texto)
+    if not m:
+        return None
+    dia, mes, ano, hora, minuto, segundo = m.groups()
+    try:
+        if hora is None:
+            return date(int(ano), int(mes), int(dia))
+        return datetime(int(ano), int(mes), int(dia), int(hora), int(minuto), int(segundo or 0))
+    except ValueError:
+        return None
+
+
+def _numero(texto: str):
+    n = float(texto)
+    return int(n) if n.is_integer() and abs(n) < 2 ** 53 else n
+
+
+def _valor(celula, estilos_data, como_texto):
+    """Valor Python tipado da célula."""
+    if celula is None:
+        return None
+    tipo, estilo, valor = celula
+    if tipo == "e":
+        return None
+    if tipo == "b":
+        return valor == "1"
+    if tipo == "n":
+        if como_texto:
+            return str(_numero(valor))
+        if estilo in estilos_data:
+            return _serial_para_data(float(valor))
+        return _numero(valor)
+    if tipo == "d":
+        return datetime.fromisoformat(valor)
+    if como_texto:
+        return valor
+    return _texto_para_data(valor.strip()) or valor
+
+
+def linhas_tipadas(caminho, colunas_texto=()):
+    """(cabecalho, gerador de linhas com valores tipados) da primeira aba."""
+    estilos_data = xlsx.estilos_de_data(xlsx.ler_estilos(caminho))
+    linhas = xlsx.ler_linhas(caminho)
+    cabecalho = [(c.valor if c else "") or f"coluna_{i + 1}" for i, c in enumerate(next(linhas, []))]
+    padrao = re.compile(COLUNAS_TEXTO, re.IGNORECASE)
+    texto = [bool(padrao.search(nome)) or nome in colunas_texto for nome in cabecalho]
+    n = len(cabecalho)
+
+    def gerar():
+        for linha in linhas:
+            linha = (linha + [None] * n)[:n]
+            yield [_valor(c, estilos_data, texto[i]) for i, c in enumerate(linha)]
+
+    return cabecalho, gerar()
+
+
+def _texto_csv(v):
+    if v is None:
+        return ""
+    if isinstance(v, datetime):
+        return v.isoformat(sep=" ")
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    return v
+
+
+def _escrever_csv(destino: Path, cabecalho, linhas) -> int:
+    total = 0
+    with open(destino, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f, delimiter=CSV_SEPARADOR)
+        w.writerow(cabecalho)
+        for linha in linhas:
+            w.writerow([_texto_csv(v) for v in linha])
+            total += 1
+    return total
+
+
+def _inferir_tipos(linhas, n) -> list:
+    """Conjunto dos tipos Python (não nulos) de cada uma das `n` colunas, no arquivo todo."""
+    tipos = [set() for _ in range(n)]
+    for linha in linhas:
+        for i, v in enumerate(linha):
+            if v is not None:
+                tipos[i].add(type(v))
+    return tipos
+
+
+def _tipo_arrow(tipos):
+    """Menor tipo Arrow que comporta todos os tipos Python vistos na coluna."""
+    if not tipos:
+        return pa.string()
+    if tipos == {bool}:
+        return pa.bool_()
+    if tipos == {date}:
+        return pa.date32()
+    if tipos <= {date, datetime}:
+        return pa.timestamp("s")
+    if tipos == {int}:
+        return pa.int64()
+    if tipos <= {int, float}:
+        return pa.float64()
+    return pa.string()
+
+
+def _coagir(v, tipo):
+    """Converte v para o tipo (já alargado) da coluna; nunca descarta um valor."""
+    if v is None:
+        return None
+    if pa.types.is_string(tipo):
+        return str(_texto_csv(v))
+    ok = (
+        (pa.types.is_boolean(tipo) and isinstance(v, bool))
+        or (pa.types.is_date32(tipo) and isinstance(v, date) and not isinstance(v, datetime))
+        or (pa.types.is_timestamp(tipo) and isinstance(v, date))
+        or (pa.types.is_integer(tipo) and isinstance(v, int) and not isinstance(v, bool))
+        or (pa.types.is_floating(tipo) and isinstance(v, (int, float)) and not isinstance(v, bool))
+    )
+    if not ok:   # só ocorreria se a inferência divergisse da leitura
+        raise ValueError(f"valor {v!r} não cabe no tipo {tipo} inferido para a coluna")
+    if pa.types.is_floating(tipo):
+        return float(v)
+    if pa.types.is_timestamp(tipo) and not isinstance(v, datetime):
+        return datetime(v.year, v.month, v.day)
+    return v
+
+
+def _escrever_parquet(destino: Path, cabecalho, linhas, tipos) -> int:
+    """Grava em lotes com o schema de `tipos` (_inferir_tipos sobre o arquivo inteiro)."""
+    total = 0
+    schema = pa.schema([(nome, _tipo_arrow(t)) for nome, t in zip(cabecalho, tipos)])
+    lote = []
+
+    def gravar():
+        colunas = list(zip(*lote))
+        arrays = [
+            pa.array([_coagir(v, campo.type) for v in col], type=campo.type)
+            for campo, col in zip(schema, colunas)
+        ]
+        escritor.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        lote.clear()
+
+    with pq.ParquetWriter(destino, schema) as escritor:
+        for linha in linhas:
+            lote.append(linha)
+            total += 1
+            if len(lote) >= LOTE_PARQUET:
+                gravar()
+        if lote:
+            gravar()
+    return total
+
+
+def converter(caminho_xlsx, formatos, colunas_texto=()) -> dict:
+    """
+    Converte o .xlsx para cada formato pedido (csv/parquet). Retorna
+    {formato: caminho}. Cada formato é uma passada em streaming pelo arquivo.
+    """
+    caminho_xlsx = Path(caminho_xlsx)
+    saidas = {}
+    for formato in formatos:
+        if formato == "xlsx":
+            continue
+        if formato == "parquet" and pa is None:
+            print("⚠️ Parquet pedido, mas pyarrow não está instalado (pip install pyarrow). Pulando.")
+            continue
+        destino = caminho_xlsx.with_suffix("." + formato)
+        tmp = destino.with_name(destino.name + ".tmp")
+        inicio = time.perf_counter()
+        with span("converter", formato=formato, arquivo=caminho_xlsx.name):
+            cabecalho, linhas = linhas_tipadas(caminho_xlsx, colunas_texto)
+            if formato == "csv":
+                total = _escrever_csv(tmp, cabecalho, linhas)
+            else:
+                # 1ª passada: tipos do arquivo inteiro; 2ª: gravação
+                tipos = _inferir_tipos(linhas, len(cabecalho))
+                cabecalho, linhas = linhas_tipadas(caminho_xlsx, colunas_texto)
+                total = _escrever_parquet(tmp, cabecalho, linhas, tipos)
+            os.replace(tmp, destino)
+        print(f"🔄 {caminho_xlsx.name} → {destino.name}: {total} linhas em {time.perf_counter() - inicio:.1f}s")
+        saidas[formato] = destino
+    return saidas
+
+
+def converter_saidas(jobs: list, pasta_final):
+    """Etapa pós-download: gera os formatos pedidos por cada job a partir do .xlsx publicado."""
+    for job in jobs:
+        formatos = job.get("formatos") or ["xlsx"]
+        if formatos == ["xlsx"]:
+            continue
+        caminho = Path(job.get("pasta") or pasta_final) / job["arquivo"]
+        saidas = converter(caminho, formatos, job.get("colunas_texto") or ())
+        if "xlsx" not in formatos and saidas:
+            caminho.unlink()
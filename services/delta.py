@@ -0,0 +1,221 @@
+# services/delta.py
+"""
+Modo incremental (job com "modo": "delta").
+
+A execução diária pede só a janela móvel que ainda muda — de `janela_dias`
+atrás até `futuro_dias` à frente — e faz upsert das linhas num banco local
+(SQLite em DELTA_DB) pela `chave` (colunas do cabeçalho, ex.: ["ID Tarefa"]).
+O arquivo publicado é reconstruído a partir do banco, que guarda o período
+completo. A cada DELTA_REFRESH_DIAS (ou com o banco vazio) o job pede o
+período inteiro e o banco é reconciliado: linhas que não vieram são apagadas.
+
+Com `coluna_data` configurada, a janela também é reconciliada: linhas do banco
+com data dentro da janela que não vieram no delta (ex.: tarefa que mudou para
+um status fora do filtro) são apagadas.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from config import DELTA_DB, DELTA_DIR, DELTA_REFRESH_DIAS
+from services.tracing import span
+from services.validacao import xlsx_completo
+from services import xlsx
+
+_EPOCA_EXCEL = datetime(1899, 12, 30)
+_FORMATOS_DATA = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS linhas (
+    job      TEXT NOT NULL,
+    chave    TEXT NOT NULL,
+    data     TEXT,
+    celulas  TEXT NOT NULL,
+    visto_em TEXT NOT NULL,
+    PRIMARY KEY (job, chave)
+);
+CREATE INDEX IF NOT EXISTS linhas_data ON linhas (job, data);
+CREATE TABLE IF NOT EXISTS meta (
+    job             TEXT PRIMARY KEY,
+    cabecalho       TEXT,
+    estilos         BLOB,
+    ultimo_completo TEXT
+);
+"""
+
+
+def _conectar():
+    DELTA_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DELTA_DB)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _meta(conn, job_nome):
+    linha = conn.execute(
+        "SELECT cabecalho, estilos, ultimo_completo FROM meta WHERE job = ?", (job_nome,)
+    ).fetchone()
+    if not linha:
+        return None
+    return {"cabecalho": json.loads(linha[0]) if linha[0] else None, "estilos": linha[1],
+            "ultimo_completo": linha[2]}
+
+
+def _data_iso(celula):
+    """Data da célula como 'AAAA-MM-DD' (serial do Excel ou texto em formatos comuns) ou None."""
+    if celula is None or celula.valor in (None, ""):
+        return None
+    if celula.tipo == "n":
+        try:
+            return (_EPOCA_EXCEL + timedelta(days=float(celula.valor))).strftime("%Y-%m-%d")
+        except ValueError:
+            return None
+    texto = celula.valor.strip()
+    for formato in _FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def expandir_delta(jobs: list, hoje: datetime = None) -> list:
+    """
+    Substitui cada job delta pelo pedido do dia: o período completo (refresh
+    periódico/banco vazio) ou só a janela móvel. Jobs comuns passam direto.
+    """
+    hoje = hoje or datetime.now()
+    expandidos = []
+    with closing(_conectar()) as conn:
+        for job in jobs:
+            if job.get("modo") != "delta":
+                expandidos.append(job)
+                continue
+            meta = _meta(conn, job["nome"])
+            ultimo = datetime.fromisoformat(meta["ultimo_completo"]) if meta and meta["ultimo_completo"] else None
+            completo = ultimo is None or hoje - ultimo >= timedelta(days=DELTA_REFRESH_DIAS)
+
+            sub = dict(job, modo=None, pasta=str(DELTA_DIR))
+            if completo:
+                sub["nome"] = f"{job['nome']}@completo"
+                print(f"🔁 Job '{job['nome']}': refresh completo "
+                      f"({'banco vazio' if ultimo is None else f'último em {ultimo:%d/%m/%Y}'}).")
+            else:
+                inicio = hoje - timedelta(days=job["janela_dias"])
+                fim = hoje + timedelta(days=job["futuro_dias"])
+                sub.update(nome=f"{job['nome']}@delta",
+                           data_inicial=inicio.strftime("%Y-%m-%d"), data_final=fim.strftime("%Y-%m-%d"))
+                print(f"⚡ Job '{job['nome']}': delta de {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}.")
+            sub["arquivo"] = f"{sub['nome'].replace('@', '_')}.xlsx"
+            sub["delta"] = {
+                "job": job["nome"],
+                "completo": completo,
+                "inicio": None if completo else sub["data_inicial"],
+                "fim": None if completo else sub["data_final"],
+                "chave": job["chave"],
+                "coluna_data": job["coluna_data"],
+            }
+            expandidos.append(sub)
+    return expandidos
+
+
+def aplicar_delta(pendencia: dict, arquivo) -> dict:
+    """
+    Faz upsert do arquivo baixado no banco e reconcilia o que sumiu
+    (tudo, no refresh completo; só a janela, no delta com coluna_data).
+    Retorna contagens {"linhas", "removidas"}.
+    """
+    delta = pendencia["delta"]
+    job_nome = delta["job"]
+    marca = datetime.now().isoformat(timespec="microseconds")
+    linhas = xlsx.ler_linhas(arquivo)
+    cabecalho = [c.valor if c else None for c in next(linhas, [])]
+
+    faltando = [c for c in delta["chave"] if c not in cabecalho]
+    if faltando or (delta["coluna_data"] and delta["coluna_data"] not in cabecalho):
+        raise ValueError(f"❌ Colunas {faltando or [delta['coluna_data']]} ausentes no relatório de '{job_nome}'.")
+    idx_chave = [cabecalho.index(c) for c in delta["chave"]]
+    idx_data = cabecalho.index(delta["coluna_data"]) if delta["coluna_data"] else None
+
+    with span("aplicar_delta", job=job_nome, completo=delta["completo"]), closing(_conectar()) as conn, conn:
+        meta = _meta(conn, job_nome)
+        if meta and meta["cabecalho"] and meta["cabecalho"] != cabecalho and not delta["completo"]:
+            # força refresh completo na próxima execução
+            conn.execute("UPDATE meta SET ultimo_completo = NULL WHERE job = ?", (job_nome,))
+            conn.commit()
+            raise ValueError(f"❌ Cabeçalho de '{job_nome}' mudou; o próximo run fará o refresh completo.")
+
+        def registros():
+            for linha in linhas:
+                valores = [linha[i].valor if i < len(linha) and linha[i] else "" for i in idx_chave]
+                if not any(valores):
+                    continue
+                data = _data_iso(linha[idx_data]) if idx_data is not None and idx_data < len(linha) else None
+                celulas = json.dumps([list(c) if c else None for c in linha], ensure_ascii=False)
+                yield job_nome, "\x1f".join(valores), data, celulas, marca
+
+        antes = conn.total_changes
+        conn.executemany(
+            "INSERT INTO linhas (job, chave, data, celulas, visto_em) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (job, chave) DO UPDATE SET data = excluded.data, celulas = excluded.celulas, "
+            "visto_em = excluded.visto_em",
+            registros(),
+        )
+        total = conn.total_changes - antes
+
+        if delta["completo"]:
+            removidas = conn.execute(
+                "DELETE FROM linhas WHERE job = ? AND visto_em <> ?", (job_nome, marca)
+            ).rowcount
+        elif idx_data is not None:
+            removidas = conn.execute(
+                "DELETE FROM linhas WHERE job = ? AND visto_em <> ? AND data BETWEEN ? AND ?",
+                (job_nome, marca, delta["inicio"], delta["fim"]),
+            ).rowcount
+        else:
+            removidas = 0
+
+        conn.execute(
+            "INSERT INTO meta (job, cabecalho, estilos, ultimo_completo) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (job) DO UPDATE SET cabecalho = excluded.cabecalho, estilos = excluded.estilos, "
+            "ultimo_completo = COALESCE(excluded.ultimo_completo, meta.ultimo_completo)",
+            (job_nome, json.dumps(cabecalho, ensure_ascii=False), xlsx.ler_estilos(arquivo),
+             marca if delta["completo"] else None),
+        )
+
+    print(f"🗄️ '{job_nome}': {total} linha(s) gravada(s), {removidas} removida(s) "
+          f"({'refresh completo' if delta['completo'] else 'delta'}).")
+    return {"linhas": total, "removidas": removidas}
+
+
+def publicar_delta(jobs: list, pasta_final):
+    """Reconstrói, a partir do banco, o arquivo final de cada job delta."""
+    for job in jobs:
+        if job.get("modo") != "delta":
+            continue
+        destino = Path(job.get("pasta") or pasta_final) / job["arquivo"]
+        tmp = destino.with_name(destino.name + ".montando.xlsx")
+        inicio = time.perf_counter()
+        with span("publicar_delta", job=job["nome"]), closing(_conectar()) as conn:
+            meta = _meta(conn, job["nome"])
+            if not meta or not meta["cabecalho"]:
+                raise ValueError(f"❌ Banco delta de '{job['nome']}' vazio; nada para publicar.")
+
+            def linhas():
+                yield [xlsx.Celula("s", None, v) if v is not None else None for v in meta["cabecalho"]]
+                for (celulas,) in conn.execute(
+                    "SELECT celulas FROM linhas WHERE job = ? ORDER BY data, chave", (job["nome"],)
+                ):
+                    yield [xlsx.Celula(*c) if c else None for c in json.loads(celulas)]
+
+            total = xlsx.escrever_xlsx(tmp, linhas(), estilos=meta["estilos"])
+            if not xlsx_completo(tmp):
+                tmp.unlink()
+                raise ValueError(f"❌ Arquivo reconstruído de '{job['nome']}' ficou inválido.")
+            tmp.replace(destino)
+        print(f"📤 '{job['nome']}' publicado do banco delta: {total - 1} linhas em "
+              f"{time.perf_counter() - inicio:.1f}s → {destino}")
@@ -0,0 +1,121 @@
+# services/download_http.py
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services.validacao import arquivo_completo
+
+# Sessão HTTP única (pool de conexões keep-alive reaproveitado entre downloads)
+_sessao = None
+
+
+def _sessao_http() -> requests.Session:
+    global _sessao
+    if _sessao is None:
+        _sessao = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        _sessao.mount("https://", adapter)
+        _sessao.mount("http://", adapter)
+    return _sessao
+
+
+def href_baixavel(href) -> bool:
+    """True se o link aponta para uma URL HTTP real (não '#' nem javascript:)."""
+    return bool(href) and href.startswith(("http://", "https://")) and not href.endswith("#")
+
+
+def _copiar_sessao_do_navegador(nav, sessao: requests.Session) -> dict:
+    """Copia os cookies do navegador para a sessão HTTP e devolve os headers equivalentes."""
+    for c in nav.cookies():
+        sessao.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+    return {
+        "User-Agent": nav.avaliar("return navigator.userAgent;"),
+        "Referer": nav.url,
+    }
+
+
+def baixar_http(nav, url, destino: Path, tentativas=3, chunk=1024 * 1024, timeout=60):
+    """
+    Baixa `url` direto por HTTP usando a sessão (cookies) do navegador.
+    Retorna (destino, sha256); ver baixar_url.
+    """
+    sessao = _sessao_http()
+    headers = _copiar_sessao_do_navegador(nav, sessao)
+    return baixar_url(sessao, url, destino, headers, tentativas=tentativas, chunk=chunk, timeout=timeout)
+
+
+def baixar_url(sessao: requests.Session, url, destino: Path, headers=None, dados=None,
+               tentativas=3, chunk=1024 * 1024, timeout=60):
+    """
+    Baixa `url` com a sessão HTTP informada (GET; POST de formulário se
+    `dados` for passado, ex.: commandLink JSF que devolve o arquivo).
+    Grava em <pasta do destino>/.parcial/<nome>.part, retomando com Range se
+    a conexão cair, calcula o SHA-256 durante o stream e, ao receber o último
+    byte, move atomicamente para `destino`.
+    Retorna (destino, sha256).
+    """
+    destino = Path(destino)
+    pasta_parcial = destino.parent / ".parcial"
+    pasta_parcial.mkdir(parents=True, exist_ok=True)
+    parcial = pasta_parcial / (destino.name + ".part")
+    if parcial.exists():
+        parcial.unlink()  # sobra de outra execução: o conteúdo pode ser de outro relatório
+
+    headers = headers or {}
+    hash_ = hashlib.sha256()
+    ultimo_erro = None
+    esperado = None   # tamanho total anunciado pelo servidor (Content-Length)
+
+    for tentativa in range(1, tentativas + 1):
+        recebido = parcial.stat().st_size if parcial.exists() else 0
+        h = dict(headers)
+        if recebido:
+            h["Range"] = f"bytes={recebido}-"
+
+        try:
+            metodo = sessao.post if dados is not None else sessao.get
+            with metodo(url, data=dados, headers=h, stream=True, timeout=timeout) as resp:
+                if resp.status_code == 416 and recebido:
+                    break  # servidor diz que já temos tudo
+                resp.raise_for_status()
+                if "text/html" in resp.headers.get("Content-Type", ""):
+                    raise requests.HTTPError("Resposta HTML (sessão expirada?) em vez do arquivo.")
+
+                if recebido and resp.status_code != 206:
+                    # servidor ignorou o Range: recomeça do zero
+                    recebido = 0
+                    hash_ = hashlib.sha256()
+
+                tamanho = resp.headers.get("Content-Length")
+                esperado = recebido + int(tamanho) if tamanho else None
+
+                with open(parcial, "ab" if recebido else "wb") as f:
+                    for bloco in resp.iter_content(chunk_size=chunk):
+                        if bloco:
+                            f.write(bloco)
+                            hash_.update(bloco)
+
+                if esperado is not None and parcial.stat().st_size < esperado:
+                    raise requests.ConnectionError(
+                        f"Download incompleto ({parcial.stat().st_size}/{esperado} bytes)."
+                    )
+                break
+
+        except (requests.ConnectionError, requests.Timeout) as e:
+            ultimo_erro = e
+            print(f"⚠️ Download HTTP interrompido (tentativa {tentativa}/{tentativas}): {e}")
+            time.sleep(min(2 ** tentativa, 10))
+    else:
+        raise ultimo_erro or RuntimeError("Falha no download HTTP.")
+
+    if not arquivo_completo(parcial, sufixo=destino.suffix, tamanho_esperado=esperado):
+        parcial.unlink()
+        raise ValueError(f"Arquivo baixado incompleto/corrompido: {destino.name}")
+
+    os.replace(parcial, destino)
+    return destino, hash_.hexdigest()
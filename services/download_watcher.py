@@ -0,0 +1,151 @@
+# services/download_watcher.py
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from services.validacao import arquivo_completo, validavel
+
+# Máscaras do inotify (linux/inotify.h)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO    = 0x00000080
+_IN_CREATE      = 0x00000100
+_EVENTO = struct.Struct("iIII")  # wd, mask, cookie, len
+
+_SUFIXOS_TEMPORARIOS = (".crdownload", ".part", ".tmp")
+
+
+def _libc_inotify():
+    """libc com suporte a inotify (Linux) ou None nas demais plataformas."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def _temporario(nome: str) -> bool:
+    # Chrome no Linux também cria ".com.google.Chrome.XXXX" durante o download
+    return nome.startswith(".") or nome.endswith(_SUFIXOS_TEMPORARIOS)
+
+
+class ObservadorDownload:
+    """
+    Acompanha UM download numa pasta: deve ser criado ANTES do clique.
+    Tudo que já existia na pasta é ignorado (sobras de execuções anteriores).
+    No Linux usa inotify (criação -> rename do .crdownload / close-write),
+    sem polling; nas demais plataformas faz polling leve do diretório.
+    """
+
+    def __init__(self, pasta: Path, ignorar_existentes: bool = True):
+        self.pasta = Path(pasta)
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        self._fd = None
+        self._libc = _libc_inotify()
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                mascara = _IN_CREATE | _IN_MOVED_TO | _IN_CLOSE_WRITE
+                if self._libc.inotify_add_watch(fd, str(self.pasta).encode(), mascara) >= 0:
+                    self._fd = fd
+                else:
+                    os.close(fd)
+        self._existentes = {p.name for p in self.pasta.iterdir()} if ignorar_existentes else set()
+
+    @property
+    def usa_inotify(self) -> bool:
+        return self._fd is not None
+
+    def _novos_concluidos(self):
+        """Arquivos finais (não temporários) que surgiram desde o início, mais novo primeiro."""
+        novos = [
+            p for p in self.pasta.iterdir()
+            if p.is_file() and p.name not in self._existentes and not _temporario(p.name)
+        ]
+        return sorted(novos, key=lambda p: p.stat().st_mtime, reverse=True)
+
+    def _ler_eventos(self):
+        try:
+            dados = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        pos = 0
+        while pos + _EVENTO.size <= len(dados):
+            _wd, mascara, _cookie, tam = _EVENTO.unpack_from(dados, pos)
+            pos += _EVENTO.size
+            nome = dados[pos:pos + tam].rstrip(b"\0").decode(errors="replace")
+            pos += tam
+            yield mascara, nome
+
+    def aguardar(self, timeout: float, estabilidade_s: float = 3) -> Path:
+        """
+        Bloqueia até o download terminar e retorna o caminho do arquivo.
+        .xlsx/.csv são aceitos assim que estiverem estruturalmente completos
+        (validacao.arquivo_completo); `estabilidade_s` só vale, no fallback por
+        polling, para outros tipos de arquivo.
+        """
+        deadline = time.monotonic() + timeout
+
+        # O download pode ter terminado entre a criação do observador e esta chamada
+        prontos = self._novos_concluidos()
+        if prontos and self.usa_inotify and arquivo_completo(prontos[0]):
+            return prontos[0]
+
+        if self.usa_inotify:
+            while True:
+                restante = deadline - time.monotonic()
+                if restante <= 0:
+                    break
+                legiveis, _, _ = select.select([self._fd], [], [], restante)
+                if not legiveis:
+                    continue
+                for mascara, nome in self._ler_eventos():
+                    if not nome or nome in self._existentes or _temporario(nome):
+                        continue
+                    # rename .crdownload -> final (Chrome) ou escrita direta fechada
+                    if mascara & (_IN_MOVED_TO | _IN_CLOSE_WRITE):
+                        if arquivo_completo(self.pasta / nome):
+                            return self.pasta / nome
+            raise TimeoutError("Tempo limite aguardando conclusão do download.")
+
+        # Fallback: polling (sem inotify)
+        ultimo, ultimo_tam, igual_desde = None, -1, None
+        while time.monotonic() < deadline:
+            prontos = self._novos_concluidos()
+            if prontos:
+                atual = prontos[0]
+                if validavel(atual):
+                    if arquivo_completo(atual):
+                        return atual
+                    time.sleep(0.5)
+                    continue
+                tam = atual.stat().st_size
+                if atual == ultimo and tam == ultimo_tam:
+                    if igual_desde is None:
+                        igual_desde = time.monotonic()
+                    elif time.monotonic() - igual_desde >= estabilidade_s:
+                        return atual
+                else:
+                    ultimo, ultimo_tam, igual_desde = atual, tam, None
+            time.sleep(0.5)
+        raise TimeoutError("Tempo limite aguardando conclusão do download.")
+
+    def fechar(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
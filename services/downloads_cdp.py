@@ -0,0 +1,165 @@
+# services/downloads_cdp.py
+"""
+Downloads acompanhados pelo próprio Chrome via DevTools (CDP), sem observar a pasta.
+
+O chromedriver abre o Chrome com a porta de depuração (debuggerAddress); o
+MonitorDownloads abre ali uma conexão de nível de navegador, liga
+Browser.setDownloadBehavior com eventsEnabled e recebe os eventos
+Browser.downloadWillBegin / Browser.downloadProgress: GUID, nome sugerido,
+bytes recebidos e o estado (inProgress / completed / canceled).
+
+Com o comportamento "allowAndName" o Chrome grava cada download como
+<pasta>/<GUID>: vários downloads ao mesmo tempo nunca se confundem, e a
+pasta pode ser diferente a cada download (uma por job).
+"""
+
+import itertools
+import json
+import logging
+import threading
+import urllib.request
+from pathlib import Path
+
+try:
+    import websocket  # websocket-client (já vem com o selenium)
+except ImportError:
+    websocket = None
+
+logger = logging.getLogger("robo-elaw")
+
+
+class DownloadCDP:
+    """Um download identificado pelo GUID do Chrome, atualizado pelos eventos."""
+
+    def __init__(self, guid, url, nome_sugerido, pasta: Path):
+        self.guid = guid
+        self.url = url
+        self.nome_sugerido = nome_sugerido
+        self.pasta = pasta
+        self.recebidos = 0
+        self.total = 0
+        self.estado = "inProgress"
+        self._fim = threading.Event()
+
+    @property
+    def arquivo(self) -> Path:
+        return self.pasta / self.guid
+
+    def _atualizar(self, params):
+        self.recebidos = params.get("receivedBytes", self.recebidos)
+        self.total = params.get("totalBytes", self.total)
+        self.estado = params.get("state", self.estado)
+        if self.estado != "inProgress":
+            self._fim.set()
+
+    def aguardar(self, timeout: float) -> Path:
+        """Bloqueia até o Chrome reportar o fim; devolve <pasta>/<GUID>."""
+        if not self._fim.wait(timeout):
+            raise TimeoutError(f"Download '{self.nome_sugerido}' não concluiu em {timeout}s "
+                               f"({self.recebidos}/{self.total or '?'} bytes).")
+        if self.estado != "completed":
+            raise IOError(f"Download '{self.nome_sugerido}' terminou como '{self.estado}'.")
+        return self.arquivo
+
+
+class MonitorDownloads:
+    """Conexão CDP com o navegador que entrega os downloads por evento."""
+
+    def __init__(self, debugger_address: str, timeout: float = 10):
+        if websocket is None:
+            raise RuntimeError("websocket-client não está instalado")
+        with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=timeout) as r:
+            ws_url = json.load(r)["webSocketDebuggerUrl"]
+        self._ws = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        self._ws.settimeout(None)
+        self._ids = itertools.count(1)
+        self._respostas = {}               # id do comando -> [Event, resposta]
+        self._envio = threading.Lock()
+        self._clique = threading.Lock()    # comportamento + clique + início, um por vez
+        self._novos = threading.Condition()
+        self._iniciados = []               # downloadWillBegin ainda não reclamados
+        self._downloads = {}               # GUID -> DownloadCDP
+        self._pasta = None
+        self.ativo = True
+        threading.Thread(target=self._ler, name="cdp-downloads", daemon=True).start()
+
+    # ---------- conexão ----------
+    def _ler(self):
+        while True:
+            try:
+                msg = json.loads(self._ws.recv())
+            except Exception:
+                break
+            if "id" in msg:
+                espera = self._respostas.pop(msg["id"], None)
+                if espera:
+                    espera[1] = msg
+                    espera[0].set()
+                continue
+            metodo, params = msg.get("method"), msg.get("params", {})
+            if metodo == "Browser.downloadWillBegin":
+                download = DownloadCDP(params["guid"], params.get("url"),
+                                       params.get("suggestedFilename"), self._pasta)
+                with self._novos:
+                    self._downloads[download.guid] = download
+                    self._iniciados.append(download)
+                    self._novos.notify_all()
+            elif metodo == "Browser.downloadProgress":
+                download = self._downloads.get(params.get("guid"))
+                if download is not None:
+                    download._atualizar(params)
+                    if download.estado != "inProgress":
+                        self._downloads.pop(download.guid, None)
+
+        # Conexão caiu: ninguém fica esperando para sempre
+        self.ativo = False
+        for espera in list(self._respostas.values()):
+            espera[0].set()
+        for download in list(self._downloads.values()):
+            download._atualizar({"state": "desconectado"})
+        with self._novos:
+            self._novos.notify_all()
+
+    def _comando(self, metodo, timeout=10, **params):
+        id_ = next(self._ids)
+        espera = self._respostas[id_] = [threading.Event(), None]
+        with self._envio:
+            self._ws.send(json.dumps({"id": id_, "method": metodo, "params": params}))
+        if not espera[0].wait(timeout) or espera[1] is None:
+            raise TimeoutError(f"CDP {metodo} sem resposta.")
+        if "error" in espera[1]:
+            raise RuntimeError(f"CDP {metodo}: {espera[1]['error'].get('message')}")
+        return espera[1].get("result", {})
+
+    # ---------- downloads ----------
+    def iniciar(self, acionar, pasta, timeout: float = 60) -> DownloadCDP:
+        """
+        Direciona o próximo download para `pasta`, executa `acionar()` (o clique)
+        e devolve o download que ele disparou, já com GUID e nome sugerido.
+        A conclusão é aguardada à parte (DownloadCDP.aguardar), então vários
+        downloads podem correr ao mesmo tempo.
+        """
+        pasta = Path(pasta).resolve()
+        pasta.mkdir(parents=True, exist_ok=True)
+        with self._clique:
+            self._comando("Browser.setDownloadBehavior", behavior="allowAndName",
+                          downloadPath=str(pasta), eventsEnabled=True)
+            with self._novos:
+                self._pasta = pasta
+                self._iniciados.clear()
+            acionar()
+            with self._novos:
+                if not self._novos.wait_for(lambda: self._iniciados or not self.ativo, timeout):
+                    raise TimeoutError("Tempo limite aguardando o início do download.")
+                if not self._iniciados:
+                    raise IOError("Conexão CDP perdida antes do início do download.")
+                download = self._iniciados.pop(0)
+        logger.info(f"📥 Download {download.guid} iniciado: '{download.nome_sugerido}'")
+        return download
+
+    def fechar(self):
+        self.ativo = False
+        try:
+            self._ws.close()
+        except Exception:
+            pass
@@ -1,9 +1,132 @@
+import hashlib
+import json
+import logging
+import time
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
 from selenium.webdriver.chrome.options import Options
 from pathlib import Path
-from config import HEADLESS, DOWNLOADS_TEMP
+from config import HEADLESS, DOWNLOADS_TEMP, CACHE_DIR, INSTRUMENTAR_WEBDRIVER, PERFIL_NAVEGADOR
+from services.metricas_webdriver import ChromeInstrumentado
+from services.downloads_cdp import MonitorDownloads
+
+logger = logging.getLogger("robo-elaw")
+
+# Cache local: versão major do Chrome -> {"path": ..., "sha256": ...}
+DRIVER_CACHE_FILE = CACHE_DIR / "chromedriver.json"
+
+
+def _sha256(caminho: Path) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _chrome_major():
+    """Versão major do Chrome instalado (consulta local, sem rede) ou None."""
+    try:
+        versao = OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+        return versao.split(".")[0] if versao else None
+    except Exception:
+        return None
+
+
+def _carregar_cache() -> dict:
+    try:
+        return json.loads(DRIVER_CACHE_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _salvar_cache(cache: dict):
+    DRIVER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    DRIVER_CACHE_FILE.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+
+
+def _entrada_valida(entrada) -> bool:
+    if not entrada:
+        return False
+    caminho = Path(entrada.get("path", ""))
+    return caminho.is_file() and _sha256(caminho) == entrada.get("sha256")
+
+
+def _procurar_driver_local(major):
+    """Procura no cache do webdriver-manager (~/.wdm) um chromedriver da mesma versão major."""
+    raiz = Path.home() / ".wdm" / "drivers" / "chromedriver"
+    if not major or not raiz.exists():
+        return None
+    nomes = ("chromedriver.exe", "chromedriver")
+    for candidato in sorted(raiz.rglob("chromedriver*"), reverse=True):
+        if candidato.name in nomes and candidato.is_file() and f"{major}." in str(candidato.parent):
+            return str(candidato)
+    return None
+
+
+def resolver_chromedriver() -> str:
+    """
+    Resolve o caminho do chromedriver priorizando o cache local.
+    A rede (ChromeDriverManager) só é usada quando a versão major do Chrome muda
+    ou o binário em cache não confere com o checksum. Funciona offline se já
+    houver um driver compatível em disco.
+    """
+    inicio = time.perf_counter()
+    major = _chrome_major()
+    cache = _carregar_cache()
+    chave = major or cache.get("ultimo")
+    origem = "cache"
+
+    entrada = cache.get(chave) if chave else None
+    if _entrada_valida(entrada):
+        caminho = entrada["path"]
+    else:
+        try:
+            caminho = ChromeDriverManager().install()
+            origem = "download"
+        except Exception as e:
+            caminho = _procurar_driver_local(major)
+            if not caminho:
+                raise RuntimeError(f"❌ Não foi possível resolver o chromedriver (offline?): {e}")
+            origem = "disco (offline)"
+
+        chave = major or "desconhecido"
+        cache[chave] = {"path": caminho, "sha256": _sha256(Path(caminho))}
+        cache["ultimo"] = chave
+        _salvar_cache(cache)
+
+    logger.info(
+        f"🧩 chromedriver resolvido via {origem} em {time.perf_counter() - inicio:.2f}s "
+        f"(Chrome {major or '?'})"
+    )
+    return caminho
+
+
+def _monitor_downloads(driver):
+    """Eventos de download via CDP; None (fica o observador da pasta) se indisponível."""
+    endereco = (driver.capabilities.get("goog:chromeOptions") or {}).get("debuggerAddress")
+    try:
+        if not endereco:
+            raise RuntimeError("chromedriver não informou o debuggerAddress")
+        return MonitorDownloads(endereco)
+    except Exception as e:
+        logger.warning(f"⚠️ Eventos de download via CDP indisponíveis ({e}); usando o observador da pasta.")
+        return None
+
+
+def _aplicar_bloqueios(driver):
+    """Perfil enxuto: bloqueia por URL (CDP) o que o robô não usa."""
+    from services.navegador import padroes_bloqueados
+    padroes = padroes_bloqueados()
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+        logger.info(f"🪶 Perfil enxuto: {len(padroes)} padrão(ões) de URL bloqueado(s).")
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível aplicar os bloqueios do perfil enxuto: {e}")
+
 
 def create_driver():
     chrome_options = Options()
@@ -19,7 +142,17 @@ def create_driver():
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True,
     }
+    if PERFIL_NAVEGADOR == "enxuto":
+        prefs["profile.managed_default_content_settings.images"] = 2
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.page_load_strategy = "eager"
     chrome_options.add_experimental_option("prefs", prefs)
 
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=chrome_options)
+    service = Service(resolver_chromedriver())
+    classe = ChromeInstrumentado if INSTRUMENTAR_WEBDRIVER else webdriver.Chrome
+    driver = classe(service=service, options=chrome_options)
+    if PERFIL_NAVEGADOR == "enxuto":
+        _aplicar_bloqueios(driver)
+    # Downloads por evento do navegador (GUID, nome sugerido, bytes, estado)
+    driver.monitor_downloads = _monitor_downloads(driver)
+    return driver
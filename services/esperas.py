@@ -0,0 +1,206 @@
+# services/esperas.py
+"""
+Esperas orientadas a condição, escritas como scripts na página para valerem
+em qualquer backend de services/navegador.py (`nav`).
+"""
+
+import time
+
+# Página "ociosa" = documento carregado, sem AJAX pendente (jQuery/PrimeFaces)
+# e sem overlay de bloqueio visível.
+_JS_PAGINA_OCIOSA = """
+    return (function(){
+        if (document.readyState !== 'complete') return false;
+        if (window.jQuery && window.jQuery.active > 0) return false;
+        try {
+            if (window.PrimeFaces && PrimeFaces.ajax && PrimeFaces.ajax.Queue
+                && !PrimeFaces.ajax.Queue.isEmpty()) return false;
+        } catch (e) {}
+        var overlays = document.querySelectorAll(
+            '.ui-blockui, .ui-blockui-content, .ui-ajaxstatus-loading, .ui-ajax-loader'
+        );
+        for (var i = 0; i < overlays.length; i++) {
+            var el = overlays[i];
+            var st = window.getComputedStyle(el);
+            if (st.display !== 'none' && st.visibility !== 'hidden'
+                && el.offsetWidth > 0 && el.offsetHeight > 0) return false;
+        }
+        return true;
+    })();
+"""
+
+# Mesmo teste acima + posição/tamanho do elemento alvo (para checar estabilidade).
+_JS_OCIOSA_E_RETANGULO = """
+    var ociosa = (function(){ %s })();
+    var el = arguments[0];
+    if (!el || !el.isConnected) return [ociosa, null];
+    var r = el.getBoundingClientRect();
+    return [ociosa, [r.x, r.y, r.width, r.height]];
+""" % _JS_PAGINA_OCIOSA
+
+
+def pagina_ociosa(nav) -> bool:
+    """Retorna True se não houver AJAX pendente nem overlay de bloqueio."""
+    try:
+        return bool(nav.avaliar(_JS_PAGINA_OCIOSA))
+    except Exception:
+        return False
+
+
+def aguardar_ocioso(nav, teto: float, intervalo: float = 0.1) -> bool:
+    """
+    Espera a página ficar ociosa, retornando assim que isso acontecer.
+    `teto` é o tempo máximo (em segundos) — nunca espera mais que isso.
+    Retorna False se o teto foi atingido (o fluxo segue, como no sleep fixo).
+    """
+    deadline = time.monotonic() + teto
+    while True:
+        if pagina_ociosa(nav):
+            return True
+        restante = deadline - time.monotonic()
+        if restante <= 0:
+            return False
+        time.sleep(min(intervalo, restante))
+
+
+def aguardar_estavel(nav, elemento, teto: float, intervalo: float = 0.1) -> bool:
+    """
+    Espera a página ficar ociosa e o elemento parar de se mover
+    (mesmo retângulo em duas leituras seguidas), com teto em segundos.
+    Útil depois de scrollIntoView / abertura de painéis animados.
+    """
+    deadline = time.monotonic() + teto
+    anterior = None
+    while True:
+        try:
+            ociosa, retangulo = nav.avaliar(_JS_OCIOSA_E_RETANGULO, elemento)
+        except Exception:
+            ociosa, retangulo = False, None
+
+        if ociosa and retangulo is not None and retangulo == anterior:
+            return True
+        anterior = retangulo
+
+        restante = deadline - time.monotonic()
+        if restante <= 0:
+            return False
+        time.sleep(min(intervalo, restante))
+
+
+# Observa o DOM (MutationObserver) e resolve assim que o iframe dentro de
+# `container_id` tiver `src` contendo o trecho esperado e documento carregado.
+_JS_OBSERVAR_IFRAME = """
+    var containerId = arguments[0], trecho = arguments[1], timeoutMs = arguments[2];
+    var done = arguments[arguments.length - 1];
+    var finalizado = false, observer = null, timer = null;
+
+    function concluir(valor) {
+        if (finalizado) return;
+        finalizado = true;
+        if (observer) observer.disconnect();
+        if (timer) clearTimeout(timer);
+        done(valor);
+    }
+
+    function verificar() {
+        var container = document.getElementById(containerId);
+        if (!container) return;
+        var iframe = container.querySelector('iframe');
+        if (!iframe) return;
+        var src = iframe.getAttribute('src') || '';
+        if (src.indexOf(trecho) === -1) return;
+
+        var doc = null;
+        try { doc = iframe.contentDocument; } catch (e) {}
+        if (doc && doc.readyState === 'complete'
+            && String(doc.location && doc.location.href).indexOf(trecho) !== -1) {
+            concluir(iframe);
+            return;
+        }
+        if (iframe.__roboAguardandoLoad !== verificar) {   // um listener por chamada
+            iframe.__roboAguardandoLoad = verificar;
+            iframe.addEventListener('load', verificar);
+        }
+    }
+
+    observer = new MutationObserver(verificar);
+    observer.observe(document.body, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['src']
+    });
+    timer = setTimeout(function(){ concluir(null); }, timeoutMs);
+    verificar();
+"""
+
+
+# Teto de cada script assíncrono: o cliente HTTP do chromedriver desiste de um
+# comando após 120s, então esperas longas são feitas em fatias
+FATIA_ASYNC_S = 60
+
+
+def aguardar_iframe(nav, container_id: str, trecho_src: str, timeout: float):
+    """
+    Espera (orientado a eventos, dentro da página) o iframe de `container_id`
+    com `src` contendo `trecho_src` terminar de carregar.
+    Retorna o elemento do iframe ou None se estourar `timeout` (segundos).
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        fatia = min(FATIA_ASYNC_S, deadline - time.monotonic())
+        if fatia <= 0:
+            return None
+        iframe = nav.avaliar_async(
+            _JS_OBSERVAR_IFRAME, container_id, trecho_src, int(fatia * 1000), timeout=fatia + 5
+        )
+        if iframe:
+            return iframe
+
+
+# Aciona o gatilho (clique, ou digitação se `valor` vier preenchido — filtros de
+# coluna) e resolve na primeira mutação do DOM dentro do elemento pai de `alvo_id`
+# (o PrimeFaces pode trocar o próprio tbody). Resolve false se a página não tiver
+# os elementos ou estourar o tempo.
+_JS_CLICAR_E_AGUARDAR_ATUALIZACAO = """
+    var gatilho = arguments[0], alvoId = arguments[1], timeoutMs = arguments[2], valor = arguments[3];
+    var done = arguments[arguments.length - 1];
+    if (typeof gatilho === 'string') gatilho = document.getElementById(gatilho) || document.querySelector(gatilho);
+    var alvo = document.getElementById(alvoId);
+    if (!gatilho || !alvo || !alvo.parentNode) { done(false); return; }
+
+    var finalizado = false;
+    var observer = new MutationObserver(function(){ concluir(true); });
+    var timer = setTimeout(function(){ concluir(false); }, timeoutMs);
+
+    function concluir(valor) {
+        if (finalizado) return;
+        finalizado = true;
+        observer.disconnect();
+        clearTimeout(timer);
+        done(valor);
+    }
+
+    observer.observe(alvo.parentNode, {childList: true, subtree: true, characterData: true});
+    if (valor === null || valor === undefined) {
+        gatilho.click();
+    } else {
+        gatilho.value = valor;
+        ['input', 'keyup', 'change'].forEach(function(tipo){
+            gatilho.dispatchEvent(new Event(tipo, {bubbles: true}));
+        });
+    }
+"""
+
+
+def aguardar_atualizacao(nav, gatilho, alvo_id: str, timeout: float, valor: str = None) -> bool:
+    """
+    Dispara o clique em `gatilho` (id, seletor CSS ou elemento) — ou preenche `valor` nele,
+    para filtros — e espera o conteúdo de `alvo_id` ser atualizado (AJAX), sem
+    recarregar a página.
+    Retorna False se os elementos não existirem, se nada mudar em `timeout`
+    segundos ou se a página navegar no meio (sessão/ViewState expirado).
+    """
+    try:
+        return bool(nav.avaliar_async(
+            _JS_CLICAR_E_AGUARDAR_ATUALIZACAO, gatilho, alvo_id, int(timeout * 1000), valor, timeout=timeout + 5
+        ))
+    except Exception:
+        return False
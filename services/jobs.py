@@ -0,0 +1,120 @@
+# services/jobs.py
+"""
+Relatórios a gerar, declarados em JSON (RELATORIOS_PATH). Exemplo:
+
+    [
+      {"nome": "tarefas", "status": ["4", "8", "1"], "modelo": "Tarefas",
+       "arquivo": "relatorio_recebimentos.xlsx"},
+      {"nome": "concluidas", "status": ["2"], "modelo": "Tarefas",
+       "data_inicial": "2025-01-01", "data_final": "2025-06-30",
+       "arquivo": "concluidas_1sem.xlsx"}
+    ]
+
+Campos (todos opcionais, com os defaults de JOB_PADRAO):
+    nome          -> identificação nos logs/spans/checkpoint
+    pagina        -> página de pesquisa (relativa a ELAW_URL_BASE)
+    periodo       -> "ano" (1º de janeiro até hoje) ou "dias:N" (últimos N dias)
+    data_inicial / data_final -> "AAAA-MM-DD" (têm prioridade sobre `periodo`)
+    status        -> data-item-value dos status de tarefa
+    modelo        -> nome do modelo pré-configurado no diálogo Excel
+    arquivo       -> nome do arquivo em FINAL_DIR
+    pasta         -> pasta de destino (default FINAL_DIR)
+    particionar   -> "mes": um relatório por mês do período, com cache dos meses
+                     fechados, montados num único arquivo (services/particoes.py)
+    modo          -> "delta": pede só a janela móvel e faz upsert num banco local
+                     que guarda o período completo (services/delta.py); exige `chave`
+    janela_dias / futuro_dias -> janela do delta: N dias atrás até M dias à frente
+    chave         -> colunas do cabeçalho que identificam a linha (ex.: ["ID Tarefa"])
+    coluna_data   -> coluna de data do filtro, para reconciliar a janela do delta
+    formatos      -> saídas publicadas: "xlsx", "csv", "parquet" (services/conversao.py)
+    colunas_texto -> colunas sempre gravadas como texto no CSV/Parquet (além de COLUNAS_TEXTO)
+
+Sem arquivo de jobs, roda um único relatório equivalente ao fluxo original.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from config import OUTPUT_NAME, RELATORIOS_PATH, STATUS_TAREFAS, URL_BASE
+
+JOB_PADRAO = {
+    "nome": "tarefas",
+    "pagina": "agendamentoContenciosoList.elaw",
+    "periodo": "ano",
+    "data_inicial": None,
+    "data_final": None,
+    "status": STATUS_TAREFAS,
+    "modelo": "Tarefas",
+    "arquivo": OUTPUT_NAME,
+    "pasta": None,
+    "particionar": None,
+    "particao": None,   # preenchido internamente nos jobs de cada mês
+    "modo": None,
+    "janela_dias": 30,
+    "futuro_dias": 365,
+    "chave": None,
+    "coluna_data": None,
+    "delta": None,      # preenchido internamente no pedido do dia
+    "formatos": ["xlsx"],
+    "colunas_texto": [],
+}
+
+
+def normalizar_job(job: dict = None) -> dict:
+    """Completa o job com os defaults e valida os campos."""
+    job = dict(JOB_PADRAO, **(job or {}))
+    job["status"] = [str(v).strip() for v in job["status"] if str(v).strip()]
+    if job["particionar"] not in (None, "mes"):
+        raise ValueError(f"❌ Job '{job['nome']}': particionar deve ser \"mes\" ou vazio.")
+    invalidos = [f for f in job["formatos"] if f not in ("xlsx", "csv", "parquet")]
+    if invalidos or not job["formatos"]:
+        raise ValueError(f"❌ Job '{job['nome']}': formatos inválidos {invalidos or job['formatos']}.")
+    if job["modo"] not in (None, "delta"):
+        raise ValueError(f"❌ Job '{job['nome']}': modo deve ser \"delta\" ou vazio.")
+    if job["modo"] == "delta":
+        if job["particionar"]:
+            raise ValueError(f"❌ Job '{job['nome']}': modo delta e particionar não se combinam.")
+        if not job["chave"]:
+            raise ValueError(f"❌ Job '{job['nome']}': modo delta exige `chave`.")
+        if isinstance(job["chave"], str):
+            job["chave"] = [job["chave"]]
+    desconhecidos = set(job) - set(JOB_PADRAO)
+    if desconhecidos:
+        raise ValueError(f"❌ Job '{job['nome']}' com campos desconhecidos: {sorted(desconhecidos)}")
+    return job
+
+
+def carregar_jobs(caminho=RELATORIOS_PATH) -> list:
+    """Lê a lista de jobs do JSON (ou o job padrão, se o arquivo não existir)."""
+    if not caminho.exists():
+        return [normalizar_job()]
+    jobs = [normalizar_job(j) for j in json.loads(caminho.read_text(encoding="utf-8"))]
+    nomes = [j["nome"] for j in jobs]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError(f"❌ Nomes de jobs repetidos em {caminho}: {nomes}")
+    arquivos = [j["arquivo"] for j in jobs]
+    if len(set(arquivos)) != len(arquivos):
+        raise ValueError(f"❌ Jobs gravando no mesmo arquivo em {caminho}: {arquivos}")
+    return jobs
+
+
+def url_do_job(job: dict) -> str:
+    return f"{URL_BASE}/{job['pagina'].lstrip('/')}"
+
+
+def periodo_do_job(job: dict, hoje: datetime = None):
+    """(inicio, fim) do filtro de datas: inicio às 00:00, fim às 23:59."""
+    hoje = hoje or datetime.now()
+    if job.get("data_inicial"):
+        inicio = datetime.strptime(job["data_inicial"], "%Y-%m-%d")
+    elif str(job["periodo"]).startswith("dias:"):
+        inicio = hoje - timedelta(days=int(job["periodo"].split(":", 1)[1]))
+    elif job["periodo"] == "ano":
+        inicio = datetime(hoje.year, 1, 1)
+    else:
+        raise ValueError(f"❌ Período inválido no job '{job['nome']}': {job['periodo']}")
+
+    fim = datetime.strptime(job["data_final"], "%Y-%m-%d") if job.get("data_final") else hoje
+    inicio = inicio.replace(hour=0, minute=0, second=0, microsecond=0)
+    fim = fim.replace(hour=23, minute=59, second=0, microsecond=0)
+    return inicio, fim
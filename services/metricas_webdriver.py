@@ -0,0 +1,108 @@
+# services/metricas_webdriver.py
+"""
+Contagem e latência de comandos WebDriver (cada find_element, .text,
+get_attribute, execute_script... é uma ida e volta HTTP ao chromedriver).
+
+ChromeInstrumentado intercepta WebDriver.execute — por onde passam também os
+comandos dos WebElements — e acumula, por tipo de comando e por função
+chamadora do robô, a quantidade, o tempo total e um histograma de latência.
+"""
+
+import os
+import sys
+import threading
+import time
+
+from selenium import webdriver
+
+# Limites (ms) das faixas do histograma de latência
+FAIXAS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+_RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Frames ignorados ao atribuir o comando a uma função do robô (helpers genéricos
+# e a camada de navegador, por onde passam todos os comandos)
+_IGNORAR = (
+    os.path.abspath(__file__),
+    os.path.join(_RAIZ_PROJETO, "services", "esperas.py"),
+    os.path.join(_RAIZ_PROJETO, "services", "navegador.py"),
+    os.path.join(_RAIZ_PROJETO, "services", "navegador_playwright.py"),
+)
+
+_lock = threading.Lock()
+_por_comando = {}
+_por_chamador = {}
+
+
+def _novo_acumulador():
+    return {"n": 0, "total_s": 0.0, "histograma": [0] * len(FAIXAS_MS)}
+
+
+def _acumular(acc, duracao):
+    acc["n"] += 1
+    acc["total_s"] += duracao
+    ms = duracao * 1000
+    for i, limite in enumerate(FAIXAS_MS):
+        if ms <= limite:
+            acc["histograma"][i] += 1
+            break
+
+
+def _chamador():
+    """Primeira função do projeto (fora do selenium e dos helpers) na pilha de chamadas."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        arquivo = os.path.abspath(frame.f_code.co_filename)
+        if arquivo.startswith(_RAIZ_PROJETO) and arquivo not in _IGNORAR and "site-packages" not in arquivo:
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "?"
+
+
+def registrar_comando(comando, chamador, duracao):
+    with _lock:
+        _acumular(_por_comando.setdefault(comando, _novo_acumulador()), duracao)
+        acc = _por_chamador.setdefault(chamador, dict(_novo_acumulador(), comandos={}))
+        _acumular(acc, duracao)
+        acc["comandos"][comando] = acc["comandos"].get(comando, 0) + 1
+
+
+def total_comandos() -> int:
+    with _lock:
+        return sum(acc["n"] for acc in _por_comando.values())
+
+
+def zerar():
+    with _lock:
+        _por_comando.clear()
+        _por_chamador.clear()
+
+
+def exportar() -> dict:
+    """Snapshot serializável (para o histórico de execuções / benchmark)."""
+    with _lock:
+        def arred(acc):
+            return dict(acc, total_s=round(acc["total_s"], 4))
+        return {
+            "faixas_ms": [str(f) for f in FAIXAS_MS],
+            "total": sum(acc["n"] for acc in _por_comando.values()),
+            "por_comando": {k: arred(v) for k, v in _por_comando.items()},
+            "por_chamador": {k: arred(v) for k, v in _por_chamador.items()},
+        }
+
+
+def resumo_texto(limite=8):
+    """Linhas legíveis: as funções que mais gastaram tempo em comandos WebDriver."""
+    dados = exportar()["por_chamador"]
+    ordenado = sorted(dados.items(), key=lambda kv: kv[1]["total_s"], reverse=True)[:limite]
+    return [f"{nome}: {acc['n']} comandos em {acc['total_s']:.2f}s" for nome, acc in ordenado]
+
+
+class ChromeInstrumentado(webdriver.Chrome):
+    """webdriver.Chrome que mede cada comando enviado ao chromedriver."""
+
+    def execute(self, driver_command, params=None):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(driver_command, params)
+        finally:
+            registrar_comando(driver_command, _chamador(), time.perf_counter() - inicio)
@@ -0,0 +1,538 @@
+# services/motor_http.py
+"""
+Motor sem navegador: o mesmo fluxo de services/reports_iniciais.py e
+services/baixar_relatorio.py feito só com requisições HTTP, na sessão
+requests com pool de conexões já usada pelos downloads.
+
+O portal é JSF/PrimeFaces. Cada página traz o `javax.faces.ViewState` (e os
+links o `etoken`); cada clique vira um POST parcial (Faces-Request:
+partial/ajax) com javax.faces.source/execute/render e os campos do form, e a
+resposta é um <partial-response> XML com os trechos re-renderizados e o
+ViewState novo. O ViewState é mantido por página; ViewExpiredException
+recarrega a página e repete o POST uma vez, e sessão expirada refaz o login.
+
+IDs de componentes e nomes de campos ficam em RECEITA_PADRAO e podem ser
+sobrescritos por um JSON em MOTOR_HTTP_RECEITA, sem mexer no código, quando o
+portal mudar. Qualquer resposta fora do previsto — e também falhas de rede/HTTP
+— sai das operações do MotorHTTP como MotorHTTPErro; com MOTOR=auto, main.py
+segue a execução no Chrome.
+"""
+
+import functools
+import json
+import re
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+from config import MOTOR_HTTP_RECEITA, PASSWORD, URL_BASE, URL_LOGIN, USER
+from services import auth
+from services.download_http import _sessao_http, baixar_url, href_baixavel
+from services.jobs import normalizar_job, periodo_do_job, url_do_job
+from services.tracing import anotar, span
+
+RECEITA_PADRAO = {
+    # pesquisa de agendamentos (página do job)
+    "form_pesquisa": "tabSearchTab",
+    "campo_data_inicial": "tabSearchTab:dataFrom_input",
+    "campo_data_final": "tabSearchTab:dataTo_input",
+    "campo_status": "tabSearchTab:status",
+    # campos fixos a mais no form: o checkbox "Tarefa" que o fluxo do navegador marca
+    "campos_extras": {"tabSearchTab:tipoTarefa_input": "on"},
+    "botao_pesquisar": "tabSearchTab:btnPesquisar",
+    "botao_excel": "btnExcel",
+    # diálogo Excel (iframe)
+    "pagina_dialogo": "elawReportGerarDialog.elaw",
+    "form_dialogo": "elawReportForm",
+    "campo_opcao": "elawReportForm:elawReportOption",
+    "valor_opcao": "0",     # Modelos pré-configurados
+    "botao_continuar": "elawReportForm:continuarBtn",
+    "campo_modelo": "elawReportForm:selectElawReport_input",
+    "botao_gerar": "elawReportForm:elawReportGerarBtn",
+    "regex_id": r"<span[^>]*>\s*ID\s*</span>.*?<div[^>]*>\s*(\d+)\s*</div>",
+    # Meus relatórios
+    "pagina_lista": "userElawReportRequestList.elaw",
+    "form_lista": "formElawReportRequest",
+    "tabela_lista": "tableElawReportRequest",
+    "filtro_id": "tableElawReportRequest:colId:filter",   # vazio = só paginação
+    "col_download": 2,
+    "col_id": 3,
+}
+
+_RE_ETOKEN = re.compile(r"etoken=([\w-]+)|data-etoken=\"([\w-]+)\"")
+
+
+class MotorHTTPErro(Exception):
+    """O portal respondeu algo que a receita não prevê (mudou?): use o navegador."""
+
+
+class _ViewExpirada(MotorHTTPErro):
+    pass
+
+
+class _SessaoExpirada(MotorHTTPErro):
+    pass
+
+
+def carregar_receita(caminho=MOTOR_HTTP_RECEITA) -> dict:
+    """RECEITA_PADRAO com as chaves sobrescritas pelo JSON (se existir)."""
+    receita = dict(RECEITA_PADRAO)
+    if Path(caminho).exists():
+        extra = json.loads(Path(caminho).read_text(encoding="utf-8"))
+        desconhecidas = set(extra) - set(RECEITA_PADRAO)
+        if desconhecidas:
+            raise ValueError(f"❌ Chaves desconhecidas em {caminho}: {sorted(desconhecidas)}")
+        receita.update(extra)
+    return receita
+
+
+# ============================ HTML / XML ============================
+
+class _Html(HTMLParser):
+    """
+    Extrai de uma página (ou trecho de partial-response) só o que o motor usa:
+    inputs por form, opções de <select>, linhas de <tbody> (células com texto,
+    href e id do link) e o action de cada form.
+    """
+
+    def __init__(self, html):
+        super().__init__(convert_charrefs=True)
+        self.forms = {}         # id -> action
+        self.inputs = []        # (form_id, attrs)
+        self.opcoes = {}        # id/name do select -> [(rótulo, valor)]
+        self.linhas = {}        # id do tbody ("" fora de tbody) -> [[célula, ...], ...]
+        self._form = None
+        self._select = None
+        self._opcao = None
+        self._tbody = ""
+        self._linha = None
+        self._celula = None
+        self.feed(html)
+        self.close()
+
+    def handle_starttag(self, tag, attrs):
+        a = {k: (v or "") for k, v in attrs}
+        if tag == "form":
+            self._form = a.get("id") or a.get("name")
+            self.forms[self._form] = a.get("action", "")
+        elif tag == "input":
+            self.inputs.append((self._form, a))
+        elif tag == "select":
+            self._select = []
+            for chave in {a.get("id"), a.get("name")} - {None, ""}:
+                self.opcoes[chave] = self._select
+        elif tag == "option" and self._select is not None:
+            self._opcao = [a.get("value"), ""]
+        elif tag == "tbody":
+            self._tbody = a.get("id", "")
+        elif tag == "tr":
+            self._linha = []
+        elif tag == "td" and self._linha is not None:
+            self._celula = {"texto": "", "href": None, "link_id": None, "form": self._form}
+        elif tag == "a" and self._celula is not None and self._celula["href"] is None:
+            self._celula["href"] = a.get("href", "")
+            self._celula["link_id"] = a.get("id")
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._form = None
+        elif tag == "select":
+            self._select = None
+        elif tag == "option" and self._opcao is not None:
+            valor, rotulo = self._opcao
+            self._select.append((rotulo.strip(), rotulo.strip() if valor is None else valor))
+            self._opcao = None
+        elif tag == "tbody":
+            self._tbody = ""
+        elif tag == "td" and self._celula is not None:
+            self._celula["texto"] = self._celula["texto"].strip()
+            self._linha.append(self._celula)
+            self._celula = None
+        elif tag == "tr" and self._linha is not None:
+            if self._linha:
+                self.linhas.setdefault(self._tbody, []).append(self._linha)
+            self._linha = None
+
+    def handle_data(self, data):
+        if self._opcao is not None:
+            self._opcao[1] += data
+        if self._celula is not None:
+            self._celula["texto"] += data
+
+    def view_state(self):
+        for _, a in self.inputs:
+            if a.get("name") == "javax.faces.ViewState":
+                return a.get("value")
+        return None
+
+    def campos_do_form(self, contendo):
+        """(action, campos) do form que tem o input `contendo` (hidden e preenchidos)."""
+        form = next((f for f, a in self.inputs if a.get("name") == contendo), False)
+        if form is False:
+            return None, None
+        campos = {
+            a["name"]: a.get("value", "")
+            for f, a in self.inputs
+            if f == form and a.get("name") and a.get("type", "text") not in ("submit", "button", "image")
+        }
+        return self.forms.get(form, ""), campos
+
+
+def _resposta_parcial(texto) -> dict:
+    """{id: conteúdo} dos <update> (mais "extension"/"eval") de um partial-response JSF."""
+    if "fieldPassword" in texto:
+        raise _SessaoExpirada("portal devolveu a tela de login")
+    try:
+        raiz = ET.fromstring(texto.strip())
+    except ET.ParseError:
+        raise MotorHTTPErro(f"resposta parcial inválida: {texto[:120]!r}")
+    if raiz.tag != "partial-response":
+        raise MotorHTTPErro(f"esperado <partial-response>, veio <{raiz.tag}>")
+
+    erro = raiz.find(".//error")
+    if erro is not None:
+        nome = erro.findtext("error-name") or ""
+        if "ViewExpired" in nome:
+            raise _ViewExpirada(nome)
+        raise MotorHTTPErro(f"{nome}: {erro.findtext('error-message')}")
+    redirecionar = raiz.find(".//redirect")
+    if redirecionar is not None:
+        url = redirecionar.get("url", "")
+        if "login" in url.lower():
+            raise _SessaoExpirada(f"redirecionado para {url}")
+        raise MotorHTTPErro(f"redirecionamento inesperado para {url}")
+
+    partes = {u.get("id"): u.text or "" for u in raiz.iter("update")}
+    for tag in ("extension", "eval"):
+        textos = [e.text or "" for e in raiz.iter(tag)]
+        if textos:
+            partes[tag] = "\n".join(textos)
+    return partes
+
+
+def _abaixo_do_alvo(ids, relatorio_id) -> bool:
+    """Lista em ordem decrescente de ID e a página já passou do ID procurado."""
+    try:
+        return bool(ids) and min(int(i) for i in ids) < int(relatorio_id)
+    except ValueError:
+        return False
+
+
+# ============================ CLIENTE JSF ============================
+
+class ClienteJSF:
+    """Sessão HTTP no portal, com o ViewState de cada página e o etoken."""
+
+    def __init__(self, receita=None, sessao=None, timeout=60):
+        self.receita = receita or carregar_receita()
+        self.sessao = sessao or _sessao_http()
+        self.timeout = timeout
+        self.view_state = {}    # URL (sem query) -> ViewState atual
+        self.etoken = None
+        self.requisicoes = 0
+
+    # ---------- login ----------
+    def entrar(self, forcar=False):
+        """Reaproveita os cookies salvos (se válidos) ou faz o POST do form de login."""
+        self.view_state.clear()
+        cookies = None if forcar else auth.carregar_cookies()
+        if cookies and auth.sessao_valida(cookies):
+            for c in cookies:
+                self.sessao.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+            print("🍪 Motor HTTP: sessão reaproveitada dos cookies salvos.")
+            return
+
+        with span("login", motor="http"):
+            self.sessao.cookies.clear()
+            resp = self._get(URL_LOGIN)
+            action, campos = _Html(resp.text).campos_do_form("fieldPassword")
+            if campos is None:
+                raise MotorHTTPErro("form de login (fieldPassword) não encontrado")
+            campos.update(fieldUser=USER, fieldPassword=PASSWORD)
+            resp = self.sessao.post(urljoin(resp.url, action or resp.url), data=campos, timeout=self.timeout)
+            self.requisicoes += 1
+            resp.raise_for_status()
+            if "fieldPassword" in resp.text:
+                raise MotorHTTPErro("login recusado (a tela de login voltou)")
+            self._ler_etoken(resp.text)
+
+        auth.gravar_cookies([
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+            for c in self.sessao.cookies
+        ])
+        print("🔐 Motor HTTP: login feito.")
+
+    # ---------- requisições ----------
+    def _get(self, url):
+        resp = self.sessao.get(url, timeout=self.timeout)
+        self.requisicoes += 1
+        resp.raise_for_status()
+        return resp
+
+    def _ler_etoken(self, html):
+        m = _RE_ETOKEN.search(html)
+        if m:
+            self.etoken = m.group(1) or m.group(2)
+
+    def abrir(self, url, _de_novo=True) -> _Html:
+        """GET da página; guarda o ViewState dela e o etoken."""
+        resp = self._get(url)
+        if "fieldPassword" in resp.text:
+            if not _de_novo:
+                raise _SessaoExpirada(f"login pedido de novo ao abrir {url}")
+            self.entrar(forcar=True)
+            return self.abrir(url, _de_novo=False)
+        pagina = _Html(resp.text)
+        chave = url.split("?")[0]
+        if pagina.view_state():
+            self.view_state[chave] = pagina.view_state()
+        self._ler_etoken(resp.text)
+        return pagina
+
+    def _dados_parciais(self, url, form, fonte, campos, execute, render):
+        dados = [
+            ("javax.faces.partial.ajax", "true"),
+            ("javax.faces.source", fonte),
+            ("javax.faces.partial.execute", execute or fonte),
+            ("javax.faces.partial.render", render or "@form"),
+            (fonte, fonte),
+            (form, form),
+        ]
+        for nome, valor in (campos or {}).items():
+            for v in (valor if isinstance(valor, (list, tuple)) else [valor]):
+                dados.append((nome, v))
+        dados.append(("javax.faces.ViewState", self.view_state.get(url.split("?")[0], "")))
+        return dados
+
+    def parcial(self, url, form, fonte, campos=None, execute=None, render=None, _de_novo=True) -> dict:
+        """POST parcial JSF (um "clique" em `fonte`). Retorna {id: html} dos trechos atualizados."""
+        chave = url.split("?")[0]
+        if chave not in self.view_state:
+            self.abrir(url)
+        resp = self.sessao.post(
+            url,
+            data=self._dados_parciais(url, form, fonte, campos, execute, render),
+            headers={"Faces-Request": "partial/ajax", "X-Requested-With": "XMLHttpRequest", "Referer": url},
+            timeout=self.timeout,
+        )
+        self.requisicoes += 1
+        resp.raise_for_status()
+        try:
+            partes = _resposta_parcial(resp.text)
+        except _ViewExpirada:
+            if not _de_novo:
+                raise
+            print(f"♻️ ViewState expirado em {urlsplit(url).path}; recarregando a página.")
+            self.view_state.pop(chave, None)
+            return self.parcial(url, form, fonte, campos, execute, render, _de_novo=False)
+        except _SessaoExpirada:
+            if not _de_novo:
+                raise
+            print("🔐 Sessão expirada no motor HTTP; refazendo login.")
+            self.entrar(forcar=True)
+            return self.parcial(url, form, fonte, campos, execute, render, _de_novo=False)
+
+        for id_, conteudo in partes.items():
+            if id_ and "javax.faces.ViewState" in id_:
+                self.view_state[chave] = conteudo.strip()
+        return partes
+
+
+# ============================ FLUXO ============================
+
+def gerar_relatorio_http(cliente: ClienteJSF, job=None, antes_de_gerar=None) -> str:
+    """
+    Mesmo fluxo de reports_iniciais.gerar_relatorio, por POSTs JSF. Retorna o ID.
+    `antes_de_gerar()`, se dado, roda imediatamente antes do POST do "Gerar".
+    """
+    job = normalizar_job(job)
+    r = cliente.receita
+    with span("gerar_relatorio", job=job["nome"], motor="http"):
+        url = url_do_job(job)
+        with span("carregar_pagina"):
+            cliente.abrir(url)
+
+        inicio, fim = periodo_do_job(job)
+        campos = {
+            r["campo_data_inicial"]: inicio.strftime("%d/%m/%Y %H:%M"),
+            r["campo_data_final"]: fim.strftime("%d/%m/%Y %H:%M"),
+            r["campo_status"]: job["status"],
+            **r["campos_extras"],
+        }
+        form = r["form_pesquisa"]
+        with span("pesquisar"):
+            cliente.parcial(url, form, r["botao_pesquisar"], campos, execute=form, render=form)
+        print(f"🔎 Pesquisa enviada (job '{job['nome']}'): {campos[r['campo_data_inicial']]} → "
+              f"{campos[r['campo_data_final']]}, status {job['status']}.")
+
+        with span("dialogo_excel"):
+            partes = cliente.parcial(url, form, r["botao_excel"], campos, execute=form, render="@none")
+            # o dialog framework do PrimeFaces devolve a URL do iframe (com pfdlgcid) na resposta
+            m = re.search(re.escape(r["pagina_dialogo"]) + r"[^\"'<>\s]*", " ".join(partes.values()))
+            url_dialogo = urljoin(url, m.group(0).replace("&amp;", "&") if m else r["pagina_dialogo"])
+            cliente.abrir(url_dialogo)
+
+        with span("modelo"):
+            form_dlg = r["form_dialogo"]
+            opcao = {r["campo_opcao"]: r["valor_opcao"]}
+            partes = cliente.parcial(url_dialogo, form_dlg, r["botao_continuar"], opcao,
+                                     execute=form_dlg, render=form_dlg)
+            opcoes = []
+            for html in partes.values():
+                opcoes += _Html(html).opcoes.get(r["campo_modelo"], [])
+            valor = next((v for rotulo, v in opcoes if rotulo.lower() == job["modelo"].strip().lower()), None)
+            if valor is None:
+                raise MotorHTTPErro(f"opção '{job['modelo']}' não encontrada em {[o for o, _ in opcoes]}")
+            if antes_de_gerar:
+                antes_de_gerar()
+            partes = cliente.parcial(url_dialogo, form_dlg, r["botao_gerar"],
+                                     {**opcao, r["campo_modelo"]: valor}, execute=form_dlg, render=form_dlg)
+
+        with span("captura_id"):
+            m = re.search(r["regex_id"], " ".join(partes.values()), re.S)
+            if not m:
+                raise MotorHTTPErro("ID do relatório não encontrado na resposta do 'Gerar'")
+            relatorio_id = m.group(1)
+    anotar(relatorio_id=relatorio_id)
+    print(f"🆔 Relatório solicitado com ID: {relatorio_id} (motor HTTP, {cliente.requisicoes} requisições até aqui)")
+    return relatorio_id
+
+
+def _url_lista(cliente) -> str:
+    return urljoin(URL_BASE + "/", cliente.receita["pagina_lista"])
+
+
+def _pagina_da_lista(cliente: ClienteJSF, vistos=0, filtro="") -> list:
+    """Linhas de uma página de "Meus relatórios" (filtro vazio limpa o filtro de ID)."""
+    r = cliente.receita
+    tabela = r["tabela_lista"]
+    campos = {f"{tabela}_pagination": "true", f"{tabela}_first": str(vistos)}
+    if r["filtro_id"]:
+        campos.update({f"{tabela}_filtering": "true", r["filtro_id"]: str(filtro)})
+    partes = cliente.parcial(_url_lista(cliente), r["form_lista"], tabela, campos, execute=tabela, render=tabela)
+
+    linhas = []
+    for id_, html in partes.items():
+        if id_ and id_.startswith(tabela):
+            p = _Html(html)
+            linhas += p.linhas.get(f"{tabela}_data") or p.linhas.get("", [])
+    return [l for l in linhas if len(l) > r["col_id"]]
+
+
+def _alvo_da_linha(cliente: ClienteJSF, linha) -> dict:
+    r = cliente.receita
+    cel = linha[r["col_download"]]
+    return {
+        "id": linha[r["col_id"]]["texto"],
+        "status": linha[-1]["texto"],
+        "tem_link": cel["href"] is not None,
+        "href": urljoin(_url_lista(cliente), cel["href"]) if cel["href"] else None,
+        "link_id": cel["link_id"],
+        "form": cel["form"] or r["form_lista"],
+    }
+
+
+def listar_relatorios_http(cliente: ClienteJSF) -> list:
+    """Primeira página de "Meus relatórios", sem filtro: todas as pendências recentes numa leitura."""
+    return [_alvo_da_linha(cliente, linha) for linha in _pagina_da_lista(cliente)]
+
+
+def localizar_relatorio_http(cliente: ClienteJSF, relatorio_id, max_paginas=50):
+    """
+    Procura o ID em "Meus relatórios" (filtro da coluna ID ou paginação).
+    Retorna {id, status, tem_link, href, link_id, form} ou None.
+    """
+    r = cliente.receita
+    vistos = 0
+    for _ in range(max_paginas):
+        linhas = _pagina_da_lista(cliente, vistos, relatorio_id)
+        for linha in linhas:
+            if linha[r["col_id"]]["texto"] == str(relatorio_id):
+                return _alvo_da_linha(cliente, linha)
+        ids = [l[r["col_id"]]["texto"] for l in linhas]
+        # filtro aplicado (só IDs que casam) e o alvo não veio: não está na lista
+        filtrado = r["filtro_id"] and all(str(relatorio_id) in i for i in ids)
+        if not linhas or filtrado or _abaixo_do_alvo(ids, relatorio_id):
+            return None
+        vistos += len(linhas)
+    return None
+
+
+def baixar_relatorio_http(cliente: ClienteJSF, alvo, pasta_final, nome_arquivo) -> Path:
+    """Baixa o arquivo do relatório pronto: GET no href ou POST do commandLink JSF."""
+    url = _url_lista(cliente)
+    destino = Path(pasta_final) / nome_arquivo
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    if href_baixavel(alvo["href"]):
+        destino, sha256 = baixar_url(cliente.sessao, alvo["href"], destino, {"Referer": url})
+    elif alvo["link_id"]:
+        dados = {alvo["form"]: alvo["form"], alvo["link_id"]: alvo["link_id"],
+                 "javax.faces.ViewState": cliente.view_state.get(url, "")}
+        destino, sha256 = baixar_url(cliente.sessao, url, destino, {"Referer": url}, dados=dados)
+    else:
+        raise MotorHTTPErro(f"link de download do relatório {alvo['id']} sem URL nem id")
+    cliente.requisicoes += 1
+    print(f"📦 Relatório {alvo['id']} baixado por HTTP (sha256 {sha256[:12]}…) → {destino}")
+    return destino
+
+
+# Falhas que, vindas de qualquer ponto do fluxo HTTP, significam "use o navegador":
+# rede/status HTTP (requests) e páginas que o parser não reconhece
+_FALHAS_DO_MOTOR = (requests.RequestException, ValueError, IndexError, KeyError)
+
+
+def _como_erro_do_motor(operacao):
+    """Converte _FALHAS_DO_MOTOR em MotorHTTPErro (o erro fatal que aciona o fallback)."""
+    @functools.wraps(operacao)
+    def envolvida(*args, **kwargs):
+        try:
+            return operacao(*args, **kwargs)
+        except MotorHTTPErro:
+            raise
+        except _FALHAS_DO_MOTOR as e:
+            raise MotorHTTPErro(f"{operacao.__name__}: {type(e).__name__}: {e}") from e
+    return envolvida
+
+
+class MotorHTTP:
+    """Operações do pipeline (services/pipeline.py) sem navegador."""
+
+    nome = "http"
+    erros_fatais = (MotorHTTPErro,)
+
+    def __init__(self, cliente: ClienteJSF = None, antes_de_gerar=None):
+        self.antes_de_gerar = antes_de_gerar
+        self.cliente = cliente or ClienteJSF()
+        try:
+            self.cliente.entrar()
+        except MotorHTTPErro:
+            raise
+        except _FALHAS_DO_MOTOR as e:
+            raise MotorHTTPErro(f"portal inacessível para o motor HTTP: {e}") from e
+
+    @_como_erro_do_motor
+    def gerar(self, job):
+        return gerar_relatorio_http(self.cliente, job, self.antes_de_gerar)
+
+    @_como_erro_do_motor
+    def consultar(self, navegar):
+        if navegar:
+            lista = _url_lista(self.cliente)
+            if self.cliente.etoken:
+                lista += f"?faces-redirect=true&etoken={self.cliente.etoken}"
+            self.cliente.abrir(lista)
+
+    @_como_erro_do_motor
+    def listar(self):
+        return listar_relatorios_http(self.cliente)
+
+    @_como_erro_do_motor
+    def localizar(self, relatorio_id):
+        return localizar_relatorio_http(self.cliente, relatorio_id)
+
+    @_como_erro_do_motor
+    def baixar(self, alvo, pasta, arquivo):
+        return baixar_relatorio_http(self.cliente, alvo, pasta, arquivo)
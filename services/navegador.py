@@ -0,0 +1,314 @@
+# services/navegador.py
+"""
+Interface fina sobre o navegador, para os services não dependerem do
+Selenium (WebDriverWait/By/EC) diretamente.
+
+Backends (NAVEGADOR_BACKEND):
+    selenium   -> NavegadorSelenium (chromedriver, abaixo)
+    playwright -> NavegadorPlaywright (services/navegador_playwright.py, API
+                  async do Playwright numa thread própria, conexão CDP
+                  persistente e eventos nativos de download)
+
+Convenções comuns aos backends:
+    seletores -> "id=<id>" (aceita ':' dos IDs JSF), "xpath=<expr>" ou CSS
+    scripts   -> corpo de função no estilo do WebDriver (`arguments[i]`); em
+                 avaliar_async o último argumento é o callback de conclusão
+    elementos -> o handle nativo do backend (WebElement / ElementHandle),
+                 que pode ser passado de volta como argumento de script
+"""
+
+import os
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from config import BLOQUEAR_TIPOS, BLOQUEAR_URLS, DOWNLOADS_TEMP, NAVEGADOR_BACKEND, PERFIL_NAVEGADOR
+from services.download_watcher import ObservadorDownload
+from services.tracing import span
+from services.utils import esperar_download
+
+ESTADOS = ("presente", "visivel", "clicavel")
+
+# Tipos de recurso (BLOQUEAR_TIPOS) -> padrões de URL, para o bloqueio via
+# Network.setBlockedURLs (que só filtra por URL). O "*" final cobre os recursos
+# JSF servidos como "<nome>.png.xhtml?ln=..."
+_PADROES_POR_TIPO = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.svg*", "*.ico*", "*.webp*"],
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*"],
+    "stylesheet": ["*.css*"],
+}
+
+
+def padroes_bloqueados() -> list:
+    """Padrões de URL bloqueados no perfil enxuto (BLOQUEAR_URLS + tipos)."""
+    padroes = list(BLOQUEAR_URLS)
+    for tipo in BLOQUEAR_TIPOS:
+        padroes += _PADROES_POR_TIPO.get(tipo, [])
+    return padroes
+
+
+def carregamento(url):
+    """Span de carregamento de página: mesma etapa comparável entre perfis."""
+    pagina = urlsplit(url).path.rsplit("/", 1)[-1] or "/"
+    return span("carregamento", pagina=pagina, perfil=PERFIL_NAVEGADOR)
+
+
+class Navegador:
+    """Operações que os services usam; cada backend implementa todas."""
+
+    nome = "?"
+
+    def ir(self, url):
+        raise NotImplementedError
+
+    @property
+    def url(self) -> str:
+        raise NotImplementedError
+
+    def esperar(self, seletor, timeout=30, estado="presente"):
+        """Primeiro elemento de `seletor` no `estado` pedido; TimeoutError se não vier."""
+        raise NotImplementedError
+
+    def esperar_todos(self, seletor, timeout=30) -> list:
+        raise NotImplementedError
+
+    def buscar(self, seletor, raiz=None) -> list:
+        """Elementos de `seletor` agora (sem esperar), opcionalmente dentro de `raiz`."""
+        raise NotImplementedError
+
+    def clicar(self, alvo, js=False):
+        raise NotImplementedError
+
+    def preencher(self, alvo, texto):
+        raise NotImplementedError
+
+    def texto(self, alvo) -> str:
+        raise NotImplementedError
+
+    def visivel(self, alvo) -> bool:
+        raise NotImplementedError
+
+    def tecla(self, tecla, alvo=None):
+        """Pressiona `tecla` ("Escape", "Enter"...) no elemento ou no foco atual."""
+        raise NotImplementedError
+
+    def avaliar(self, script, *args):
+        raise NotImplementedError
+
+    def avaliar_async(self, script, *args, timeout=30):
+        raise NotImplementedError
+
+    def frame(self, alvo=None):
+        """Entra no iframe `alvo` (seletor ou elemento); None volta ao documento principal."""
+        raise NotImplementedError
+
+    def cookies(self) -> list:
+        """Cookies no formato do WebDriver: [{name, value, domain, path, ...}]."""
+        raise NotImplementedError
+
+    def definir_cookies(self, cookies):
+        raise NotImplementedError
+
+    def baixar(self, acionar, pasta, nome_arquivo, timeout=300) -> Path:
+        """
+        Executa `acionar()` (o clique que dispara o download) e devolve o
+        arquivo concluído em pasta/nome_arquivo.
+        """
+        raise NotImplementedError
+
+    def saudavel(self) -> bool:
+        raise NotImplementedError
+
+    def pid(self):
+        """PID do processo raiz do navegador/driver (para medir memória) ou None."""
+        return None
+
+    def fechar(self):
+        raise NotImplementedError
+
+
+# ============================ SELENIUM ============================
+
+def _by(seletor):
+    if seletor.startswith("id="):
+        return By.ID, seletor[3:]
+    if seletor.startswith("xpath="):
+        return By.XPATH, seletor[6:]
+    return By.CSS_SELECTOR, seletor[4:] if seletor.startswith("css=") else seletor
+
+
+_CONDICOES = {
+    "presente": EC.presence_of_element_located,
+    "visivel": EC.visibility_of_element_located,
+    "clicavel": EC.element_to_be_clickable,
+}
+
+
+class NavegadorSelenium(Navegador):
+    """Backend Selenium: chromedriver (create_driver) por trás da interface."""
+
+    nome = "selenium"
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def _elemento(self, alvo, estado="presente"):
+        return self.esperar(alvo, estado=estado) if isinstance(alvo, str) else alvo
+
+    def ir(self, url):
+        with carregamento(url):
+            self.driver.get(url)
+
+    @property
+    def url(self) -> str:
+        return self.driver.current_url
+
+    def esperar(self, seletor, timeout=30, estado="presente"):
+        try:
+            return WebDriverWait(self.driver, timeout).until(_CONDICOES[estado](_by(seletor)))
+        except TimeoutException:
+            raise TimeoutError(f"'{seletor}' não ficou {estado} em {timeout}s")
+
+    def esperar_todos(self, seletor, timeout=30) -> list:
+        try:
+            return WebDriverWait(self.driver, timeout).until(EC.presence_of_all_elements_located(_by(seletor)))
+        except TimeoutException:
+            raise TimeoutError(f"'{seletor}' não apareceu em {timeout}s")
+
+    def buscar(self, seletor, raiz=None) -> list:
+        return (raiz or self.driver).find_elements(*_by(seletor))
+
+    def clicar(self, alvo, js=False):
+        el = self._elemento(alvo, "presente" if js else "clicavel")
+        if js:
+            self.driver.execute_script("arguments[0].click();", el)
+        else:
+            el.click()
+
+    def preencher(self, alvo, texto):
+        el = self._elemento(alvo)
+        el.clear()
+        el.send_keys(texto)
+
+    def texto(self, alvo) -> str:
+        return self._elemento(alvo).text
+
+    def visivel(self, alvo) -> bool:
+        return self._elemento(alvo).is_displayed()
+
+    def tecla(self, tecla, alvo=None):
+        el = self._elemento(alvo) if alvo is not None else self.driver.switch_to.active_element
+        el.send_keys(getattr(Keys, tecla.upper()))
+
+    def avaliar(self, script, *args):
+        return self.driver.execute_script(script, *args)
+
+    def avaliar_async(self, script, *args, timeout=30):
+        anterior = self.driver.timeouts.script
+        self.driver.set_script_timeout(timeout)
+        try:
+            return self.driver.execute_async_script(script, *args)
+        finally:
+            self.driver.set_script_timeout(anterior)
+
+    def frame(self, alvo=None):
+        if alvo is None:
+            self.driver.switch_to.default_content()
+        else:
+            self.driver.switch_to.frame(self._elemento(alvo))
+
+    def cookies(self) -> list:
+        return self.driver.get_cookies()
+
+    def definir_cookies(self, cookies):
+        """Via CDP (Network.setCookie): não exige navegar antes até o domínio."""
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        for c in cookies:
+            cookie = {
+                "name": c["name"],
+                "value": c["value"],
+                "domain": c.get("domain"),
+                "path": c.get("path", "/"),
+                "secure": c.get("secure", False),
+                "httpOnly": c.get("httpOnly", False),
+            }
+            if "expiry" in c:
+                cookie["expires"] = c["expiry"]
+            if c.get("sameSite"):
+                cookie["sameSite"] = c["sameSite"]
+            self.driver.execute_cdp_cmd("Network.setCookie", cookie)
+
+    def _direcionar_downloads(self, pasta) -> Path:
+        """
+        Pasta onde o Chrome vai gravar o próximo download sem o monitor CDP:
+        `pasta`, se a aba aceitar Page.setDownloadBehavior; senão a
+        download.default_directory do perfil (DOWNLOADS_TEMP), que é onde o
+        arquivo de fato cai (o inotify não observa subpastas).
+        """
+        pasta = Path(pasta).resolve()
+        pasta.mkdir(parents=True, exist_ok=True)
+        try:
+            self.driver.execute_cdp_cmd("Page.setDownloadBehavior",
+                                        {"behavior": "allow", "downloadPath": str(pasta)})
+            return pasta
+        except Exception as e:
+            print(f"⚠️ Não foi possível direcionar o download para {pasta} ({e}); observando {DOWNLOADS_TEMP}.")
+            return Path(DOWNLOADS_TEMP)
+
+    def baixar(self, acionar, pasta, nome_arquivo, timeout=300) -> Path:
+        """Eventos CDP do Chrome (services/downloads_cdp.py); sem eles, observa a pasta."""
+        monitor = getattr(self.driver, "monitor_downloads", None)
+        if monitor is None or not monitor.ativo:
+            pasta = self._direcionar_downloads(pasta)
+            # Observador criado antes do clique: rastreia só este download
+            with ObservadorDownload(pasta) as observador:
+                acionar()
+                return esperar_download(pasta, nome_arquivo, timeout=timeout, observador=observador)
+
+        download = monitor.iniciar(acionar, pasta)
+        arquivo = download.aguardar(timeout)
+        destino = Path(pasta) / nome_arquivo
+        os.replace(arquivo, destino)
+        print(f"📥 Download '{download.nome_sugerido}' concluído ({download.recebidos} bytes, "
+              f"evento do navegador) → {destino.name}")
+        return destino
+
+    def saudavel(self) -> bool:
+        try:
+            self.driver.switch_to.default_content()
+            return bool(self.driver.window_handles) and self.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def pid(self):
+        try:
+            return self.driver.service.process.pid
+        except Exception:
+            return None
+
+    def fechar(self):
+        monitor = getattr(self.driver, "monitor_downloads", None)
+        if monitor is not None:
+            monitor.fechar()
+        self.driver.quit()
+
+
+def criar_navegador(backend=None) -> Navegador:
+    """Abre um navegador do backend configurado (NAVEGADOR_BACKEND)."""
+    backend = backend or NAVEGADOR_BACKEND
+    inicio = time.perf_counter()
+    if backend == "playwright":
+        from services.navegador_playwright import NavegadorPlaywright
+        nav = NavegadorPlaywright()
+    else:
+        from services.driver_factory import create_driver
+        nav = NavegadorSelenium(create_driver())
+    print(f"🌐 Navegador '{nav.nome}' pronto em {time.perf_counter() - inicio:.2f}s.")
+    return nav
@@ -0,0 +1,250 @@
+# services/navegador_playwright.py
+"""
+Backend Playwright (API async) da interface de services/navegador.py.
+
+O Playwright fala com o Chromium por uma conexão CDP persistente (pipe do
+processo lançado, ou PLAYWRIGHT_CDP_URL para se conectar a um Chrome já
+aberto) e entrega os downloads como eventos nativos — sem pasta observada.
+O event loop roda numa thread própria; os métodos da interface continuam
+síncronos para os services (cada um agenda a corrotina e espera o resultado).
+"""
+
+import asyncio
+import fnmatch
+import threading
+from pathlib import Path
+
+from config import BLOQUEAR_TIPOS, BLOQUEAR_URLS, HEADLESS, PERFIL_NAVEGADOR, PLAYWRIGHT_CDP_URL
+from services.navegador import ESTADOS, Navegador, carregamento
+
+try:
+    from playwright.async_api import Error as ErroPlaywright
+    from playwright.async_api import TimeoutError as TimeoutPlaywright
+    from playwright.async_api import async_playwright
+except ImportError:  # backend opcional
+    async_playwright = None
+
+# Scripts no estilo do WebDriver (corpo com `arguments`) viram funções do Playwright
+_SINCRONO = "(args) => (function(){ %s }).apply(null, args)"
+_ASSINCRONO = "(args) => new Promise(function(done){ (function(){ %s }).apply(null, args.concat([done])); })"
+
+
+def _para_webdriver(c):
+    cookie = {k: c[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly") if k in c}
+    if c.get("expires", -1) > 0:
+        cookie["expiry"] = int(c["expires"])
+    if c.get("sameSite"):
+        cookie["sameSite"] = c["sameSite"]
+    return cookie
+
+
+def _para_playwright(c):
+    cookie = {"name": c["name"], "value": c["value"], "domain": c.get("domain"), "path": c.get("path", "/"),
+              "secure": c.get("secure", False), "httpOnly": c.get("httpOnly", False)}
+    if "expiry" in c:
+        cookie["expires"] = c["expiry"]
+    if c.get("sameSite") in ("Strict", "Lax", "None"):
+        cookie["sameSite"] = c["sameSite"]
+    return cookie
+
+
+class NavegadorPlaywright(Navegador):
+    nome = "playwright"
+
+    def __init__(self, headless=HEADLESS, cdp_url=PLAYWRIGHT_CDP_URL):
+        if async_playwright is None:
+            raise RuntimeError("❌ Backend playwright pedido, mas o pacote não está instalado "
+                               "(pip install playwright && playwright install chromium).")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="playwright", daemon=True)
+        self._thread.start()
+        self._rodar(self._iniciar(headless, cdp_url))
+
+    # ---------- infraestrutura ----------
+    def _rodar(self, coro, timeout=None):
+        try:
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+        except TimeoutPlaywright as e:
+            raise TimeoutError(str(e)) from None
+
+    async def _iniciar(self, headless, cdp_url):
+        self._pw = await async_playwright().start()
+        if cdp_url:
+            self._browser = await self._pw.chromium.connect_over_cdp(cdp_url)
+            contextos = self._browser.contexts
+            self._contexto = contextos[0] if contextos else await self._browser.new_context(accept_downloads=True)
+        else:
+            self._browser = await self._pw.chromium.launch(
+                headless=headless, args=["--disable-dev-shm-usage", "--no-sandbox"]
+            )
+            self._contexto = await self._browser.new_context(
+                accept_downloads=True, viewport={"width": 1920, "height": 1080}
+            )
+        if PERFIL_NAVEGADOR == "enxuto":
+            await self._contexto.route("**/*", self._filtrar)
+        self.page = await self._contexto.new_page()
+        self._alvo = self.page   # página ou frame atual (frame())
+
+    async def _filtrar(self, route):
+        """Perfil enxuto: aqui o tipo do recurso vem do próprio navegador."""
+        pedido = route.request
+        if pedido.resource_type in BLOQUEAR_TIPOS or any(fnmatch.fnmatch(pedido.url, p) for p in BLOQUEAR_URLS):
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    async def _handle(self, alvo, estado="presente", timeout=30):
+        return await self._esperar(alvo, timeout, estado) if isinstance(alvo, str) else alvo
+
+    async def _esperar(self, seletor, timeout, estado):
+        if estado not in ESTADOS:
+            raise ValueError(f"estado inválido: {estado}")
+        el = await self._alvo.wait_for_selector(
+            seletor, state="attached" if estado == "presente" else "visible", timeout=timeout * 1000
+        )
+        if estado == "clicavel":
+            limite = self._loop.time() + timeout
+            while not await el.is_enabled():
+                if self._loop.time() > limite:
+                    raise TimeoutError(f"'{seletor}' não ficou clicável em {timeout}s")
+                await asyncio.sleep(0.05)
+        return el
+
+    async def _valor(self, handle):
+        """Elemento vira ElementHandle; o resto, valor JSON (como no WebDriver)."""
+        el = handle.as_element()
+        if el is not None:
+            return el
+        valor = await handle.json_value()
+        await handle.dispose()
+        return valor
+
+    async def _avaliar(self, modelo, script, args, timeout):
+        handle = await asyncio.wait_for(self._alvo.evaluate_handle(modelo % script, list(args)), timeout)
+        return await self._valor(handle)
+
+    # ---------- interface ----------
+    def ir(self, url):
+        # perfil enxuto: equivalente ao pageLoadStrategy "eager" do Selenium
+        espera = "domcontentloaded" if PERFIL_NAVEGADOR == "enxuto" else "load"
+
+        async def ir():
+            self._alvo = self.page
+            await self.page.goto(url, wait_until=espera)
+        with carregamento(url):
+            self._rodar(ir())
+
+    @property
+    def url(self) -> str:
+        return self.page.url
+
+    def esperar(self, seletor, timeout=30, estado="presente"):
+        return self._rodar(self._esperar(seletor, timeout, estado))
+
+    def esperar_todos(self, seletor, timeout=30) -> list:
+        async def todos():
+            await self._esperar(seletor, timeout, "presente")
+            return await self._alvo.query_selector_all(seletor)
+        return self._rodar(todos())
+
+    def buscar(self, seletor, raiz=None) -> list:
+        return self._rodar((raiz or self._alvo).query_selector_all(seletor))
+
+    def clicar(self, alvo, js=False):
+        async def clicar():
+            el = await self._handle(alvo, "presente" if js else "clicavel")
+            if js:
+                await el.evaluate("e => e.click()")
+            else:
+                await el.click()
+        self._rodar(clicar())
+
+    def preencher(self, alvo, texto):
+        async def preencher():
+            await (await self._handle(alvo)).fill(texto)
+        self._rodar(preencher())
+
+    def texto(self, alvo) -> str:
+        async def texto():
+            return await (await self._handle(alvo)).inner_text()
+        return self._rodar(texto())
+
+    def visivel(self, alvo) -> bool:
+        async def visivel():
+            return await (await self._handle(alvo)).is_visible()
+        return self._rodar(visivel())
+
+    def tecla(self, tecla, alvo=None):
+        async def tecla_():
+            if alvo is None:
+                await self.page.keyboard.press(tecla)
+            else:
+                await (await self._handle(alvo)).press(tecla)
+        self._rodar(tecla_())
+
+    def avaliar(self, script, *args):
+        return self._rodar(self._avaliar(_SINCRONO, script, args, None))
+
+    def avaliar_async(self, script, *args, timeout=30):
+        try:
+            return self._rodar(self._avaliar(_ASSINCRONO, script, args, timeout))
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"script assíncrono não concluiu em {timeout}s") from None
+
+    def frame(self, alvo=None):
+        async def frame():
+            if alvo is None:
+                self._alvo = self.page
+                return
+            conteudo = await (await self._handle(alvo)).content_frame()
+            if conteudo is None:
+                raise ErroPlaywright("elemento não é um iframe")
+            self._alvo = conteudo
+        self._rodar(frame())
+
+    def cookies(self) -> list:
+        return [_para_webdriver(c) for c in self._rodar(self._contexto.cookies())]
+
+    def definir_cookies(self, cookies):
+        self._rodar(self._contexto.add_cookies([_para_playwright(c) for c in cookies]))
+
+    def baixar(self, acionar, pasta, nome_arquivo, timeout=300) -> Path:
+        """Evento nativo de download: nome sugerido, conclusão e falha vêm do navegador."""
+        pasta = Path(pasta)
+        pasta.mkdir(parents=True, exist_ok=True)
+        evento = asyncio.run_coroutine_threadsafe(
+            self.page.wait_for_event("download", timeout=timeout * 1000), self._loop
+        )
+        acionar()
+        try:
+            download = evento.result(timeout + 5)
+        except TimeoutPlaywright:
+            raise TimeoutError("Tempo limite aguardando o início do download.") from None
+
+        async def salvar():
+            destino = pasta / nome_arquivo
+            await download.save_as(destino)     # espera o fim do download
+            falha = await download.failure()
+            if falha:
+                raise IOError(f"Download de '{download.suggested_filename}' falhou: {falha}")
+            return destino
+        destino = self._rodar(salvar(), timeout)
+        print(f"📥 Download '{download.suggested_filename}' concluído (evento do navegador) → {destino.name}")
+        return destino
+
+    def saudavel(self) -> bool:
+        try:
+            self.frame(None)
+            return not self.page.is_closed() and self.avaliar("return 1;") == 1
+        except Exception:
+            return False
+
+    def fechar(self):
+        async def fechar():
+            await self._contexto.close()
+            await self._browser.close()
+            await self._pw.stop()
+        try:
+            self._rodar(fechar(), 30)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
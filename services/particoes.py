@@ -0,0 +1,173 @@
+# services/particoes.py
+"""
+Relatórios particionados por mês (job com "particionar": "mes").
+
+Em vez de um relatório de 01/01 até hoje — que cresce o ano todo —, cada mês
+do período vira um job próprio ("tarefas@2026-03"), solicitado junto com os
+demais pelo pipeline e gerado em paralelo no servidor. Meses já fechados ficam
+em cache (PARTICOES_DIR, com sha256 no índice) e só são pedidos de novo a
+cada PARTICAO_REVALIDAR_DIAS. O arquivo publicado é montado a partir das
+partições (cache + recém-baixadas) com services/xlsx.py.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from config import PARTICOES_DIR, PARTICAO_REVALIDAR_DIAS
+from services.jobs import periodo_do_job
+from services.tracing import span
+from services.validacao import xlsx_completo
+from services import xlsx
+
+INDICE_FILE = PARTICOES_DIR / "indice.json"
+
+
+def _sha256(caminho) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _carregar_indice() -> dict:
+    try:
+        return json.loads(INDICE_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _salvar_indice(indice: dict):
+    PARTICOES_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = INDICE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(indice, indent=2), encoding="utf-8")
+    os.replace(tmp, INDICE_FILE)
+
+
+def assinatura(job: dict) -> str:
+    """Hash dos filtros que definem o conteúdo (mudou o filtro, o cache não vale)."""
+    chave = json.dumps([job["pagina"], sorted(job["status"]), job["modelo"]])
+    return hashlib.sha1(chave.encode("utf-8")).hexdigest()[:12]
+
+
+def meses(inicio: datetime, fim: datetime) -> list:
+    """[(inicio_mes, fim_mes), ...] cobrindo [inicio, fim], recortados nas pontas."""
+    partes = []
+    atual = inicio
+    while atual <= fim:
+        proximo = (atual.replace(day=1) + timedelta(days=32)).replace(day=1)
+        partes.append((atual, min(fim, proximo - timedelta(days=1))))
+        atual = proximo
+    return partes
+
+
+def _arquivo_particao(job: dict, mes: str) -> str:
+    return f"{job['nome']}_{mes}.xlsx"
+
+
+def _reaproveitavel(entrada, assinatura_atual, agora) -> bool:
+    if not entrada or not entrada.get("fechado") or entrada.get("assinatura") != assinatura_atual:
+        return False
+    caminho = PARTICOES_DIR / entrada["arquivo"]
+    if not caminho.is_file() or _sha256(caminho) != entrada.get("sha256"):
+        return False
+    if PARTICAO_REVALIDAR_DIAS > 0:
+        gerado_em = datetime.fromisoformat(entrada["gerado_em"])
+        return agora - gerado_em < timedelta(days=PARTICAO_REVALIDAR_DIAS)
+    return True
+
+
+def expandir_particoes(jobs: list, hoje: datetime = None) -> list:
+    """
+    Substitui cada job particionado por um job por mês, omitindo os meses
+    fechados que já estão no cache (e ainda válidos). Jobs comuns passam direto.
+    """
+    hoje = hoje or datetime.now()
+    inicio_mes_atual = hoje.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    indice = _carregar_indice()
+    expandidos = []
+    for job in jobs:
+        if job.get("particionar") != "mes":
+            expandidos.append(job)
+            continue
+        assin = assinatura(job)
+        reaproveitados = []
+        for inicio, fim in meses(*periodo_do_job(job, hoje)):
+            mes = inicio.strftime("%Y-%m")
+            nome = f"{job['nome']}@{mes}"
+            if _reaproveitavel(indice.get(nome), assin, hoje):
+                reaproveitados.append(mes)
+                continue
+            expandidos.append(dict(
+                job,
+                nome=nome,
+                data_inicial=inicio.strftime("%Y-%m-%d"),
+                data_final=fim.strftime("%Y-%m-%d"),
+                particionar=None,
+                arquivo=_arquivo_particao(job, mes),
+                pasta=str(PARTICOES_DIR),
+                particao={"mes": mes, "fechado": fim < inicio_mes_atual, "assinatura": assin},
+            ))
+        if reaproveitados:
+            print(f"🗃️ Job '{job['nome']}': {len(reaproveitados)} mês(es) fechado(s) do cache ({', '.join(reaproveitados)}).")
+    return expandidos
+
+
+def registrar_particao(pendencia: dict, caminho):
+    """Grava no índice a partição recém-baixada (sha256, se o mês estava fechado, quando)."""
+    particao = pendencia["particao"]
+    indice = _carregar_indice()
+    indice[pendencia["nome"]] = {
+        "arquivo": pendencia["arquivo"],
+        "sha256": _sha256(caminho),
+        "fechado": particao["fechado"],
+        "assinatura": particao["assinatura"],
+        "gerado_em": datetime.fromtimestamp(pendencia["solicitado_em"]).isoformat(timespec="seconds"),
+    }
+    _salvar_indice(indice)
+
+
+def _linhas_concatenadas(arquivos, linhas_cabecalho=1):
+    """Linhas de todas as partições, com o cabeçalho só da primeira (e conferido nas demais)."""
+    cabecalho = None
+    for n, arquivo in enumerate(arquivos):
+        for i, linha in enumerate(xlsx.ler_linhas(arquivo)):
+            if i < linhas_cabecalho:
+                valores = [c.valor if c else None for c in linha]
+                if n == 0:
+                    cabecalho = (cabecalho or []) + [valores]
+                    yield linha
+                elif valores != cabecalho[i]:
+                    raise ValueError(f"❌ Cabeçalho diferente em {arquivo.name}: {valores}")
+                continue
+            yield linha
+
+
+def montar_particionados(jobs: list, pasta_final, hoje: datetime = None):
+    """Monta o arquivo final de cada job particionado a partir das partições do período."""
+    hoje = hoje or datetime.now()
+    for job in jobs:
+        if job.get("particionar") != "mes":
+            continue
+        arquivos = [
+            PARTICOES_DIR / _arquivo_particao(job, inicio.strftime("%Y-%m"))
+            for inicio, _ in meses(*periodo_do_job(job, hoje))
+        ]
+        faltando = [a.name for a in arquivos if not a.is_file()]
+        if faltando:
+            raise FileNotFoundError(f"❌ Partições ausentes para '{job['nome']}': {faltando}")
+
+        destino = Path(job.get("pasta") or pasta_final) / job["arquivo"]
+        tmp = destino.with_name(destino.name + ".montando.xlsx")
+        with span("montar_particoes", job=job["nome"], particoes=len(arquivos)):
+            total = xlsx.escrever_xlsx(
+                tmp, _linhas_concatenadas(arquivos), estilos=xlsx.ler_estilos(arquivos[0])
+            )
+            if not xlsx_completo(tmp):
+                os.remove(tmp)
+                raise ValueError(f"❌ Arquivo montado de '{job['nome']}' ficou inválido.")
+            os.replace(tmp, destino)
+        print(f"🧩 '{job['nome']}' montado de {len(arquivos)} partição(ões): {total} linhas → {destino}")
@@ -0,0 +1,173 @@
+# services/pipeline.py
+"""
+Motor de vários relatórios em pipeline.
+
+1) submeter_jobs: solicita TODOS os relatórios (services/jobs.py) em sequência,
+   sem esperar nenhum ficar pronto;
+2) baixar_jobs: consulta a lista compartilhada de "Meus relatórios" e baixa
+   cada arquivo assim que o seu link aparece.
+
+Como a geração acontece em paralelo no servidor, o tempo total para K
+relatórios tende a max(tempo de geração) + K submissões, e não à soma.
+
+As operações no portal vêm de um "motor": MotorNavegador (navegador de
+services/navegador.py, abaixo) ou MotorHTTP (services/motor_http.py, sem navegador). Exceções em
+`motor.erros_fatais` não são repetidas: sobem para quem chamou (fallback).
+"""
+
+import time
+
+from config import INTERVALO_BAIXAR as CFG_INTERVALO
+from services.baixar_relatorio import baixar_pronto, consultar_lista, ler_lista, localizar_relatorio
+from services.polling import estimar_geracao, proximo_intervalo, registrar_geracao
+from services.delta import aplicar_delta
+from services.particoes import registrar_particao
+from services.reports_iniciais import gerar_relatorio
+from services.tracing import span
+
+
+class MotorNavegador:
+    """Operações do pipeline no navegador (backend Selenium ou Playwright)."""
+
+    nome = "navegador"
+    erros_fatais = ()
+
+    def __init__(self, nav, antes_de_gerar=None):
+        self.nav = nav
+        self.antes_de_gerar = antes_de_gerar
+
+    def gerar(self, job):
+        return gerar_relatorio(self.nav, job, self.antes_de_gerar)
+
+    def consultar(self, navegar):
+        consultar_lista(self.nav, navegar)
+
+    def listar(self):
+        return ler_lista(self.nav)
+
+    def localizar(self, relatorio_id):
+        return localizar_relatorio(self.nav, relatorio_id)
+
+    def baixar(self, alvo, pasta, arquivo):
+        return baixar_pronto(self.nav, alvo, pasta, arquivo)
+
+
+def submeter_jobs(motor, jobs, ao_submeter=None, pendencias=None) -> list:
+    """
+    Solicita cada job e devolve as pendências:
+    [{"nome", "arquivo", "pasta", "particao", "delta", "relatorio_id", "solicitado_em",
+      "baixado", "ultimo_nao_pronto"}, ...].
+    Jobs que já constam em `pendencias` (retomada) não são solicitados de novo.
+    `ao_submeter(pendencias)` é chamado após cada solicitação (ex.: checkpoint).
+    """
+    pendencias = list(pendencias or [])
+    ja_solicitados = {p["nome"] for p in pendencias}
+    jobs = [j for j in jobs if j["nome"] not in ja_solicitados]
+    with span("submeter_jobs", jobs=len(jobs)):
+        for job in jobs:
+            relatorio_id = motor.gerar(job)
+            pendencias.append({
+                "nome": job["nome"],
+                "arquivo": job["arquivo"],
+                "pasta": job.get("pasta"),
+                "particao": job.get("particao"),
+                "delta": job.get("delta"),
+                "relatorio_id": relatorio_id,
+                "solicitado_em": time.time(),
+                "baixado": False,
+                "ultimo_nao_pronto": None,
+            })
+            print(f"📨 Job '{job['nome']}' solicitado (ID {relatorio_id}).")
+            if ao_submeter:
+                ao_submeter(pendencias)
+    return pendencias
+
+
+def baixar_jobs(motor, pendencias, pasta_final, intervalo_baixar=None, ao_baixar=None):
+    """
+    Consulta "Meus relatórios" até todas as pendências serem baixadas.
+    Em cada rodada a tabela é atualizada e lida uma vez, sem filtro, e todas
+    as pendências são casadas com essa leitura; só as que não aparecem nela
+    são procuradas uma a uma (filtro de ID/paginação). O intervalo até a
+    próxima rodada é o menor
+    entre os sugeridos (services/polling) para cada pendência.
+    `ao_baixar(pendencias)` é chamado após cada download (ex.: checkpoint).
+    """
+    intervalo_baixar = intervalo_baixar or CFG_INTERVALO
+    estimativa = estimar_geracao()
+
+    with span("baixar_jobs", jobs=len(pendencias)):
+        tentativa = 0
+        navegar = True
+        while True:
+            faltando = [p for p in pendencias if not p["baixado"]]
+            if not faltando:
+                break
+            tentativa += 1
+            try:
+                with span("poll", tentativa=tentativa, pendentes=len(faltando)):
+                    motor.consultar(navegar)
+                    navegar = False
+                    visiveis = {str(r["id"]): r for r in motor.listar()}
+                    ausentes = [p for p in faltando if str(p["relatorio_id"]) not in visiveis]
+                    # primeiro as que estão na página lida (a busca individual muda a tabela)
+                    for p in faltando:
+                        if str(p["relatorio_id"]) in visiveis:
+                            _verificar(motor, p, visiveis[str(p["relatorio_id"])], pasta_final, ao_baixar, pendencias)
+                    for p in ausentes:
+                        _verificar(motor, p, motor.localizar(p["relatorio_id"]), pasta_final, ao_baixar, pendencias)
+            except motor.erros_fatais:
+                raise
+            except Exception as e:
+                navegar = True
+                print(f"⚠️ Erro ao consultar 'Meus relatórios': {type(e).__name__} → {e}")
+                print(f"🔁 Repetindo em {intervalo_baixar} minutos...")
+                time.sleep(intervalo_baixar * 60)
+                continue
+
+            faltando = [p for p in pendencias if not p["baixado"]]
+            if not faltando:
+                break
+            agora = time.time()
+            espera = min(
+                proximo_intervalo(agora - p["solicitado_em"], tentativa, intervalo_baixar * 60, estimativa)
+                for p in faltando
+            )
+            nomes = ", ".join(p["nome"] for p in faltando)
+            print(f"⏳ {len(faltando)} relatório(s) ainda em geração ({nomes}). Nova consulta em {espera:.0f}s...")
+            time.sleep(espera)
+
+    print(f"✅ {len(pendencias)} relatório(s) baixado(s).")
+
+
+def _verificar(motor, pendencia, alvo, pasta_final, ao_baixar, pendencias):
+    """Baixa a pendência se a sua linha (`alvo`) estiver pronta (erros de download não param as demais)."""
+    relatorio_id = pendencia["relatorio_id"]
+    decorrido = time.time() - pendencia["solicitado_em"]
+
+    if not alvo:
+        print(f"⚠️ Relatório {relatorio_id} ('{pendencia['nome']}') ainda não aparece na lista.")
+        pendencia["ultimo_nao_pronto"] = decorrido
+        return
+    if not alvo["tem_link"]:
+        pendencia["ultimo_nao_pronto"] = decorrido
+        return
+
+    try:
+        with span("baixar_relatorio", relatorio_id=str(relatorio_id), job=pendencia["nome"]):
+            destino = motor.baixar(alvo, pendencia.get("pasta") or pasta_final, pendencia["arquivo"])
+            if pendencia.get("particao"):
+                registrar_particao(pendencia, destino)
+            if pendencia.get("delta"):
+                aplicar_delta(pendencia, destino)
+    except motor.erros_fatais:
+        raise
+    except Exception as e:
+        print(f"⚠️ Falha ao baixar '{pendencia['nome']}' (ID {relatorio_id}): {type(e).__name__} → {e}")
+        return
+
+    pendencia["baixado"] = True
+    registrar_geracao(relatorio_id, decorrido, pendencia["ultimo_nao_pronto"])
+    print(f"✅ Job '{pendencia['nome']}' concluído após {decorrido:.0f}s.")
+    if ao_baixar:
+        ao_baixar(pendencias)
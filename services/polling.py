@@ -0,0 +1,64 @@
+# services/polling.py
+"""
+Agenda das consultas a "Meus relatórios" baseada no histórico de geração.
+
+Cada relatório baixado grava no histórico (tracing) quanto tempo levou para
+ficar pronto: o maior tempo em que ainda NÃO estava pronto e o primeiro em que
+estava. Com isso estimamos a janela provável de conclusão e consultamos de
+forma densa dentro dela; longe dela, o intervalo cresce exponencialmente (com
+jitter) até o teto INTERVALO_BAIXAR.
+"""
+
+import random
+
+from config import POLL_DENSO_S, POLL_INICIAL_S
+from services.tracing import ler_historico, percentil, registrar
+
+TIPO_REGISTRO = "relatorio_pronto"
+
+
+def registrar_geracao(relatorio_id, pronto_s: float, ultimo_nao_pronto_s: float = None):
+    """Grava quanto tempo (desde a solicitação) o relatório levou para ficar pronto."""
+    registrar(
+        TIPO_REGISTRO,
+        relatorio_id=str(relatorio_id),
+        pronto_s=round(pronto_s, 1),
+        ultimo_nao_pronto_s=None if ultimo_nao_pronto_s is None else round(ultimo_nao_pronto_s, 1),
+    )
+
+
+def estimar_geracao(dias: float = 30, minimo_amostras: int = 3):
+    """
+    (p50, p90) estimados do tempo de geração, em segundos, ou None sem histórico suficiente.
+    Cada amostra é o ponto médio entre a última consulta "não pronto" e a primeira "pronto".
+    """
+    amostras = []
+    for r in ler_historico(dias, tipo=TIPO_REGISTRO):
+        inferior = r.get("ultimo_nao_pronto_s")
+        superior = r["pronto_s"]
+        amostras.append(superior if inferior is None else (inferior + superior) / 2)
+    if len(amostras) < minimo_amostras:
+        return None
+    return percentil(amostras, 50), percentil(amostras, 90)
+
+
+def proximo_intervalo(decorrido_s: float, tentativa: int, intervalo_max_s: float, estimativa=None) -> float:
+    """
+    Segundos até a próxima consulta.
+    - dentro da janela estimada [0,8*p50, 1,2*p90]: POLL_DENSO_S;
+    - antes dela: backoff exponencial com jitter, sem ultrapassar o início da janela;
+    - sem estimativa (ou depois da janela): backoff exponencial com jitter.
+    Sempre limitado a [POLL_DENSO_S, intervalo_max_s].
+    """
+    backoff = min(intervalo_max_s, POLL_INICIAL_S * (2 ** max(0, tentativa - 1)))
+    backoff *= random.uniform(0.8, 1.2)
+
+    if estimativa is not None:
+        p50, p90 = estimativa
+        inicio_janela, fim_janela = 0.8 * p50, 1.2 * p90
+        if inicio_janela <= decorrido_s <= fim_janela:
+            return max(1.0, min(POLL_DENSO_S, intervalo_max_s))
+        if decorrido_s < inicio_janela:
+            backoff = min(backoff, inicio_janela - decorrido_s)
+
+    return max(min(POLL_DENSO_S, intervalo_max_s), min(backoff, intervalo_max_s))
@@ -1,331 +1,303 @@
 # services/reports_agendamentos.py
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.action_chains import ActionChains
-
-from datetime import datetime
 import time
 
-def _abrir_dialog_excel(driver, wait):
+from services.esperas import aguardar_ocioso, aguardar_estavel, aguardar_iframe
+from services.tracing import span, anotar
+from services.jobs import normalizar_job, periodo_do_job, url_do_job
+
+_JS_ROLAR_CENTRO = "arguments[0].scrollIntoView({block:'center'});"
+
+def _abrir_dialog_excel(nav):
     """
     Abre o diálogo de exportação para Excel e muda para o iframe.
     Aguarda até o iframe real ser carregado (src válido), mesmo que demore vários minutos.
     """
     try:
         # Aguarda o botão Excel aparecer
-        btn_excel = WebDriverWait(driver, 120).until(
-            EC.element_to_be_clickable((By.ID, "btnExcel"))
-        )
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn_excel)
-        time.sleep(0.5)
-        driver.execute_script("arguments[0].click();", btn_excel)
+        btn_excel = nav.esperar("id=btnExcel", 120, "clicavel")
+        nav.avaliar(_JS_ROLAR_CENTRO, btn_excel)
+        aguardar_estavel(nav, btn_excel, teto=0.5)
+        nav.clicar(btn_excel, js=True)
         print("📥 Botão Excel clicado. Aguardando diálogo abrir...")
 
         # Detecta o diálogo
-        dialog = WebDriverWait(driver, 300).until(
-            EC.presence_of_element_located((By.ID, "btnExcel_dlg"))
-        )
+        nav.esperar("id=btnExcel_dlg", 300)
         print("🪟 Diálogo Excel detectado: #btnExcel_dlg")
 
-        # Espera o iframe real ser carregado
-        iframe = None
+        # Espera o iframe real ser carregado (observador na própria página)
         max_wait = 600  # até 10 minutos
-        step = 10
-        elapsed = 0
-
-        while elapsed < max_wait:
-            try:
-                iframe = dialog.find_element(By.TAG_NAME, "iframe")
-                src = iframe.get_attribute("src") or ""
-                if "elawReportGerarDialog.elaw" in src and src.strip() != "":
-                    print(f"📄 Iframe detectado com src válido após {elapsed}s.")
-                    break
-            except Exception:
-                pass
-            time.sleep(step)
-            elapsed += step
-            print(f"⏳ Aguardando iframe carregar ({elapsed}/{max_wait}s)...")
+        inicio = time.monotonic()
+        iframe = aguardar_iframe(nav, "btnExcel_dlg", "elawReportGerarDialog.elaw", max_wait)
+        if iframe:
+            print(f"📄 Iframe detectado com src válido após {time.monotonic() - inicio:.2f}s.")
 
         if not iframe:
             raise Exception("Iframe do diálogo Excel não apareceu dentro do tempo limite.")
 
         # Agora muda pro iframe
-        driver.switch_to.frame(iframe)
+        nav.frame(iframe)
         print("🔄 Mudamos para o iframe do relatório com sucesso.")
 
     except Exception as e:
         raise Exception(f"❌ Falha ao abrir diálogo Excel: {e}")
 
-def _configurar_modelo(driver, wait):
-    """Seleciona modelo pré-configurado e relatório 'Tarefas'."""
+def _configurar_modelo(nav, modelo="Tarefas", antes_de_gerar=None):
+    """
+    Seleciona modelo pré-configurado e o relatório `modelo` (ex.: 'Tarefas').
+    `antes_de_gerar()` roda logo antes do clique final (ex.: esperar o horário agendado).
+    """
     try:
-        lbl = wait.until(EC.element_to_be_clickable(
-            (By.XPATH, "//label[@for='elawReportForm:elawReportOption:0']"))
-        )
-        lbl.click()
+        nav.clicar("xpath=//label[@for='elawReportForm:elawReportOption:0']")
         print("☑️ Selecionado: Modelos pré-configurados")
 
-        btn_continuar = wait.until(EC.element_to_be_clickable((By.ID, "elawReportForm:continuarBtn")))
-        btn_continuar.click()
+        nav.clicar("id=elawReportForm:continuarBtn")
         print("➡️ Continuar clicado.")
 
         # Dropdown de relatórios
-        dd = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[id$='selectElawReport_label']")))
-        dd.click()
+        nav.clicar("[id$='selectElawReport_label']")
 
-        opcoes = WebDriverWait(driver, 20).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "ul[id$='selectElawReport_items'] li"))
-        )
-        time.sleep(1)
+        opcoes = nav.esperar_todos("ul[id$='selectElawReport_items'] li", 20)
+        aguardar_estavel(nav, opcoes[-1], teto=1)
 
-        alvo = next((o for o in opcoes if o.text.strip().lower() == "tarefas"), None)
+        alvo = next((o for o in opcoes if nav.texto(o).strip().lower() == modelo.strip().lower()), None)
         if not alvo:
-            raise Exception("❌ Opção 'Tarefas' não encontrada no dropdown!")
+            raise Exception(f"❌ Opção '{modelo}' não encontrada no dropdown!")
 
-        wait.until(EC.element_to_be_clickable(alvo)).click()
-        print("✔️ Relatório selecionado: Tarefas")
+        nav.clicar(alvo)
+        print(f"✔️ Relatório selecionado: {modelo}")
 
-        btn_gerar = wait.until(EC.element_to_be_clickable((By.ID, "elawReportForm:elawReportGerarBtn")))
-        btn_gerar.click()
+        if antes_de_gerar:
+            antes_de_gerar()
+        nav.clicar("id=elawReportForm:elawReportGerarBtn")
         print("📊 Gerar relatório clicado.")
     except Exception as e:
         raise Exception(f"❌ Falha ao configurar modelo de relatório: {e}")
 
 
-def _capturar_id(driver, wait):
+def _capturar_id(nav):
     """Captura o ID do relatório gerado."""
     try:
-        id_elem = wait.until(EC.presence_of_element_located((
-            By.XPATH, "//span[normalize-space()='ID']/ancestor::div[contains(@class,'ui-g')]/div[last()]"
-        )))
-        relatorio_id = id_elem.text.strip()
+        id_elem = nav.esperar(
+            "xpath=//span[normalize-space()='ID']/ancestor::div[contains(@class,'ui-g')]/div[last()]"
+        )
+        relatorio_id = nav.texto(id_elem).strip()
         print(f"🆔 Relatório solicitado com ID: {relatorio_id}")
         return relatorio_id
     except Exception as e:
         raise Exception(f"❌ Falha ao capturar ID do relatório: {e}")
 
-def gerar_relatorio(driver):
+def gerar_relatorio(nav, job=None, antes_de_gerar=None):
     """
-    Gera o relatório de agendamentos (Tarefas Concluídas e Concluídas em atraso)
-    com pausas e lógica robusta de seleção.
+    Gera o relatório de agendamentos descrito por `job` (services/jobs.py:
+    página, período, status e modelo) e retorna o ID da solicitação.
+    Sem `job`, usa o padrão: Tarefas do ano corrente com STATUS_TAREFAS.
+    `nav` é um navegador de services/navegador.py (Selenium ou Playwright).
+    `antes_de_gerar()`, se dado, roda imediatamente antes do clique em "Gerar".
     """
-    wait = WebDriverWait(driver, 30)
-    url = "https://sicredi.elaw.com.br/agendamentoContenciosoList.elaw"
-    driver.get(url)
-    time.sleep(2)
-    print("📄 Página de Agendamentos carregada.")
+    job = normalizar_job(job)
+    with span("gerar_relatorio", job=job["nome"]):
+        return _gerar_relatorio(nav, job, antes_de_gerar)
+
+
+def _gerar_relatorio(nav, job, antes_de_gerar=None):
+    with span("carregar_pagina"):
+        nav.ir(url_do_job(job))
+        aguardar_ocioso(nav, teto=2)
+    print(f"📄 Página de Agendamentos carregada (job '{job['nome']}').")
 
     # 🗓️ Preencher datas
-    hoje = datetime.now()
-    data_inicial = datetime(hoje.year, 1, 1).strftime("%d/%m/%Y 00:00")
-    data_final = hoje.strftime("%d/%m/%Y 23:59")
-
-    campo_data_ini = wait.until(EC.presence_of_element_located((By.ID, "tabSearchTab:dataFrom_input")))
-    campo_data_fim = wait.until(EC.presence_of_element_located((By.ID, "tabSearchTab:dataTo_input")))
-
-    campo_data_ini.clear()
-    #campo_data_ini.send_keys(data_final)
-    campo_data_ini.send_keys(data_inicial)
-    campo_data_fim.clear()
-    campo_data_fim.send_keys(data_final)
-   
-    print(f"🗓️ Período definido: {data_inicial} → {data_final}")
-    time.sleep(2)
+    inicio, fim = periodo_do_job(job)
+    data_inicial = inicio.strftime("%d/%m/%Y %H:%M")
+    data_final = fim.strftime("%d/%m/%Y %H:%M")
+
+    with span("datas"):
+        nav.preencher("id=tabSearchTab:dataFrom_input", data_inicial)
+        nav.preencher("id=tabSearchTab:dataTo_input", data_final)
+
+        print(f"🗓️ Período definido: {data_inicial} → {data_final}")
+        aguardar_ocioso(nav, teto=2)
 
     # FECHA o datepicker de forma garantida ANTES de qualquer outra interação
-    _ok = _fechar_datepicker(driver, wait)
-    if not _ok:
-        print("⚠️ Aviso: datepicker pode ainda estar visível, seguindo com fallback...")
+    with span("datepicker"):
+        _ok = _fechar_datepicker(nav)
+        if not _ok:
+            print("⚠️ Aviso: datepicker pode ainda estar visível, seguindo com fallback...")
 
-    time.sleep(1)
+        aguardar_ocioso(nav, teto=1)
 
     # ☑️ Marcar "Tarefa" clicando no label (após garantir overlay fechado)
-    try:
-        label_tarefa = wait.until(EC.element_to_be_clickable((By.XPATH, "//label[normalize-space()='Tarefa']")))
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", label_tarefa)
-        time.sleep(0.5)
-        driver.execute_script("arguments[0].click();", label_tarefa)
-        print("☑️ Checkbox 'Tarefa' marcado com sucesso.")
-    except Exception as e:
-        print(f"⚠️ Falha ao marcar 'Tarefa': {e}")
+    with span("tipo_tarefa"):
+        try:
+            label_tarefa = nav.esperar("xpath=//label[normalize-space()='Tarefa']", estado="clicavel")
+            nav.avaliar(_JS_ROLAR_CENTRO, label_tarefa)
+            aguardar_estavel(nav, label_tarefa, teto=0.5)
+            nav.clicar(label_tarefa, js=True)
+            print("☑️ Checkbox 'Tarefa' marcado com sucesso.")
+        except Exception as e:
+            print(f"⚠️ Falha ao marcar 'Tarefa': {e}")
 
-    time.sleep(2)
+        aguardar_ocioso(nav, teto=2)
 
-     # 🔹 Fecha janela "Escolher colunas" se estiver aberta
-    try:
-        dialogo = WebDriverWait(driver, 3).until(
-            EC.presence_of_element_located((By.ID, "escolherColumnDialog"))
-        )
-        if dialogo.is_displayed():
-            print("🪟 Janela 'Escolher colunas' detectada — fechando...")
-            btn_fechar = dialogo.find_element(By.CSS_SELECTOR, "a.ui-dialog-titlebar-close")
-            driver.execute_script("arguments[0].click();", btn_fechar)
-            time.sleep(1)
-            print("✅ Janela 'Escolher colunas' fechada com sucesso.")
-    except Exception:
-        pass
-
-        
-    # --- STATUS: abrir pelo triângulo, limpar tokens, marcar 1, 3 e 4 com scroll interno e fechar no X ---
-    try:
-        print("⏳ Abrindo seletor de status...")
-        # 1) abre pelo triângulo (seta)
-        tri = wait.until(EC.element_to_be_clickable((
-            By.CSS_SELECTOR, "#tabSearchTab\\:status .ui-icon-triangle-1-s"
-        )))
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", tri)
-        time.sleep(0.4)
-        tri.click()
-        print("📂 Painel de status aberto pela seta.")
-        time.sleep(1)
-
-        # 2) limpa tokens (Pendentes etc.) fora do painel
-        close_icons = driver.find_elements(
-            By.CSS_SELECTOR, "#tabSearchTab\\:status .ui-selectcheckboxmenu-token-icon"
-        )
-        for icon in close_icons:
-            try:
-                driver.execute_script("arguments[0].click();", icon)
-                time.sleep(0.2)
-            except Exception:
-                pass
-        print("🔄 Tokens anteriores removidos.")
-        time.sleep(0.5)
-
-        # 3) garante painel visível e pega o wrapper de itens (área rolável)
-        panel = wait.until(EC.visibility_of_element_located(
-            (By.ID, "tabSearchTab:status_panel")
-        ))
-        wrapper = panel.find_element(By.CSS_SELECTOR, ".ui-selectcheckboxmenu-items-wrapper")
-
-        # helper JS: rola até o li e clica no .ui-chkbox-box via JS (evita not interactable)
-        js_click_by_value = """
-            (function(panel, value){
-                const li = panel.querySelector("li.ui-selectcheckboxmenu-item[data-item-value='" + value + "']");
-                if (!li) return "LI_NAO_ENCONTRADO:" + value;
-                const box = li.querySelector(".ui-chkbox-box");
-                if (!box) return "BOX_NAO_ENCONTRADO:" + value;
-                const wrapper = panel.querySelector(".ui-selectcheckboxmenu-items-wrapper");
-                if (wrapper && li.offsetTop != null) {
-                    wrapper.scrollTop = li.offsetTop - 10;
-                }
-                // forçar reflow antes do clique
-                box.getBoundingClientRect();
-                box.click();
-                return "OK:" + value;
-            })(arguments[0], arguments[1]);
-        """
-
-         # 4) marca “Atrasadas” (4), “A vencer” (8) e “Pendentes” (1)
-        for value in ["4", "8", "1"]:
-            res = driver.execute_script(js_click_by_value, panel, value)
-            print(f"🧪 Clique em data-item-value={value}: {res}")
-            time.sleep(0.5)
-
-        # 5) valida visualmente: tokens devem aparecer no container de tokens
-        tokens_text = [el.text.strip() for el in driver.find_elements(
-            By.CSS_SELECTOR, "#tabSearchTab\\:status .ui-selectcheckboxmenu-token-label"
-        )]
-        print(f"🔍 Tokens atuais: {tokens_text}")
-        if not all(x in tokens_text for x in ["Atrasadas", "A vencer", "Pendentes"]):
-            # fallback extra: tenta clicar pelos labels -> .ui-chkbox-box anterior ao label
-            for nome in ["Atrasadas", "A vencer", "Pendentes"]:
-                try:
-                    lbl = panel.find_element(By.XPATH, f".//label[normalize-space()='{nome}']")
-                    box = lbl.find_element(By.XPATH, "./preceding-sibling::div[contains(@class,'ui-chkbox')]/div")
-                    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", box)
-                    time.sleep(0.2)
-                    driver.execute_script("arguments[0].click();", box)
-                    print(f"↪️ Fallback: box de '{nome}' clicado.")
-                    time.sleep(0.4)
-                except Exception:
-                    pass
-
-            tokens_text = [el.text.strip() for el in driver.find_elements(
-                By.CSS_SELECTOR, "#tabSearchTab\\:status .ui-selectcheckboxmenu-token-label"
-            )]
-            print(f"🔁 Tokens após fallback: {tokens_text}")
-            
-        # 6) fecha no X do painel
-        fechar = panel.find_element(By.CSS_SELECTOR, ".ui-icon-circle-close")
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", fechar)
-        time.sleep(0.2)
-        fechar.click()
-        print("📁 Painel de status fechado (X).")
-
-    except Exception as e:
-        print(f"⚠️ Falha ao manipular status: {e}")
+        # 🔹 Fecha janela "Escolher colunas" se estiver aberta
+        try:
+            dialogo = nav.esperar("id=escolherColumnDialog", 3)
+            if nav.visivel(dialogo):
+                print("🪟 Janela 'Escolher colunas' detectada — fechando...")
+                btn_fechar = nav.buscar("a.ui-dialog-titlebar-close", raiz=dialogo)[0]
+                nav.clicar(btn_fechar, js=True)
+                aguardar_ocioso(nav, teto=1)
+                print("✅ Janela 'Escolher colunas' fechada com sucesso.")
+        except Exception:
+            pass
 
+    # --- STATUS: limpa tokens e marca os status configurados (uma única ida ao navegador) ---
+    with span("status"):
+        try:
+            print(f"⏳ Selecionando status {job['status']}...")
+            tokens_text = _selecionar_status(nav, job["status"])
+            print(f"🔍 Tokens atuais: {tokens_text}")
+            if len(tokens_text) < len(job["status"]):
+                print(f"⚠️ Esperados {len(job['status'])} status, marcados {len(tokens_text)}.")
+            print("📁 Painel de status fechado (X).")
 
-    time.sleep(2)
+        except Exception as e:
+            print(f"⚠️ Falha ao manipular status: {e}")
 
-        # 🔎 Clicar em "Pesquisar" após o painel de status
-    try:
-        time.sleep(1.5)  # aguarda painel fechar visualmente
-        btn_pesquisar = wait.until(EC.element_to_be_clickable((By.ID, "tabSearchTab:btnPesquisar")))
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn_pesquisar)
-        time.sleep(0.5)
-        btn_pesquisar.click()
-        print("🔎 Botão 'Pesquisar' clicado com sucesso.")
-    except Exception as e:
-        print(f"⚠️ Falha ao clicar em 'Pesquisar': {e}")
+    # 🔎 Clicar em "Pesquisar" após o painel de status
+    with span("pesquisar"):
+        try:
+            aguardar_ocioso(nav, teto=3.5)  # aguarda painel fechar visualmente
+            btn_pesquisar = nav.esperar("id=tabSearchTab:btnPesquisar", estado="clicavel")
+            nav.avaliar(_JS_ROLAR_CENTRO, btn_pesquisar)
+            aguardar_estavel(nav, btn_pesquisar, teto=0.5)
+            nav.clicar(btn_pesquisar)
+            print("🔎 Botão 'Pesquisar' clicado com sucesso.")
+        except Exception as e:
+            print(f"⚠️ Falha ao clicar em 'Pesquisar': {e}")
 
-    # ⏳ Aguardar tabela carregar
-    try:
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table[id*='dataTable']")))
-        print("✅ Resultados carregados com sucesso.")
-    except Exception:
-        print("⚠️ Não foi possível confirmar o carregamento da tabela.")
+        # ⏳ Aguardar tabela carregar
+        try:
+            nav.esperar("table[id*='dataTable']")
+            print("✅ Resultados carregados com sucesso.")
+        except Exception:
+            print("⚠️ Não foi possível confirmar o carregamento da tabela.")
 
-    time.sleep(2)
+        aguardar_ocioso(nav, teto=2)
 
-    # ⏳ Aguardar resultados
-    try:
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table[id*='dataTable']")))
-        print("✅ Resultados carregados com sucesso.")
-    except Exception:
-        print("⚠️ Não foi possível confirmar o carregamento da tabela.")
-    time.sleep(2)
+        # ⏳ Aguardar resultados
+        try:
+            nav.esperar("table[id*='dataTable']")
+            print("✅ Resultados carregados com sucesso.")
+        except Exception:
+            print("⚠️ Não foi possível confirmar o carregamento da tabela.")
+        aguardar_ocioso(nav, teto=2)
 
     # 📥 Excel + geração de relatório
-    _abrir_dialog_excel(driver, wait)
-    time.sleep(2)
-    _configurar_modelo(driver, wait)
-    time.sleep(2)
-    relatorio_id = _capturar_id(driver, wait)
+    with span("dialogo_excel"):
+        _abrir_dialog_excel(nav)
+        aguardar_ocioso(nav, teto=2)
+    with span("modelo"):
+        _configurar_modelo(nav, job["modelo"], antes_de_gerar)
+        aguardar_ocioso(nav, teto=2)
+    with span("captura_id"):
+        relatorio_id = _capturar_id(nav)
+    anotar(relatorio_id=relatorio_id)
 
     # 🔚 Finaliza execução com segurança
-    driver.switch_to.default_content()
+    nav.frame(None)
     print(f"🆔 Relatório solicitado com ID: {relatorio_id}")
     print("✅ Fluxo concluído com sucesso (sem refresh).")
 
     return relatorio_id
 
-def _fechar_datepicker(driver, wait, tentativas=3):
+# Abre o selectCheckboxMenu de status, remove os tokens atuais, marca os
+# data-item-value pedidos, espera os eventos de change do PrimeFaces
+# (fila AJAX vazia + tokens renderizados), fecha o painel e devolve os rótulos.
+_JS_SELECIONAR_STATUS = """
+    var valores = arguments[0], timeoutMs = arguments[1];
+    var done = arguments[arguments.length - 1];
+    var menu = document.getElementById('tabSearchTab:status');
+    var panel = document.getElementById('tabSearchTab:status_panel');
+    if (!menu || !panel) { done({erro: 'STATUS_NAO_ENCONTRADO', tokens: []}); return; }
+
+    function tokens() {
+        return Array.from(menu.querySelectorAll('.ui-selectcheckboxmenu-token-label'))
+            .map(function(el){ return el.textContent.trim(); });
+    }
+    function ajaxOcioso() {
+        if (window.jQuery && window.jQuery.active > 0) return false;
+        try {
+            if (window.PrimeFaces && PrimeFaces.ajax && PrimeFaces.ajax.Queue
+                && !PrimeFaces.ajax.Queue.isEmpty()) return false;
+        } catch (e) {}
+        return true;
+    }
+
+    // 1) abre o painel pela seta
+    if (panel.offsetWidth === 0) {
+        var trigger = menu.querySelector('.ui-selectcheckboxmenu-trigger')
+            || menu.querySelector('.ui-icon-triangle-1-s');
+        if (trigger) trigger.click();
+    }
+
+    // 2) limpa tokens existentes
+    Array.from(menu.querySelectorAll('.ui-selectcheckboxmenu-token-icon'))
+        .forEach(function(icon){ icon.click(); });
+
+    // 3) marca os valores pedidos (rolando a área interna até o item)
+    var wrapper = panel.querySelector('.ui-selectcheckboxmenu-items-wrapper');
+    var faltando = [];
+    valores.forEach(function(valor){
+        var li = panel.querySelector("li.ui-selectcheckboxmenu-item[data-item-value='" + valor + "']");
+        var box = li && li.querySelector('.ui-chkbox-box');
+        if (!box) { faltando.push(valor); return; }
+        if (wrapper && li.offsetTop != null) wrapper.scrollTop = li.offsetTop - 10;
+        if (!box.classList.contains('ui-state-active')) box.click();
+    });
+
+    // 4) espera os eventos de change terminarem e fecha no X
+    var limite = Date.now() + timeoutMs;
+    (function aguardar() {
+        var atuais = tokens();
+        var pronto = ajaxOcioso() && atuais.length >= valores.length - faltando.length;
+        if (!pronto && Date.now() < limite) { setTimeout(aguardar, 50); return; }
+        var fechar = panel.querySelector('.ui-icon-circle-close');
+        if (fechar) fechar.click();
+        done({erro: faltando.length ? 'NAO_ENCONTRADOS:' + faltando.join(',') : null, tokens: atuais});
+    })();
+"""
+
+
+def _selecionar_status(nav, valores, timeout=10):
+    """Seleciona os status (data-item-value) em uma única chamada e retorna os rótulos dos tokens."""
+    resultado = nav.avaliar_async(_JS_SELECIONAR_STATUS, list(valores), int(timeout * 1000), timeout=timeout + 5)
+    if resultado.get("erro"):
+        print(f"⚠️ Seleção de status: {resultado['erro']}")
+    return resultado.get("tokens", [])
+
+
+def _fechar_datepicker(nav, tentativas=3):
     """
     Fecha overlays de datepicker do PrimeFaces de forma robusta.
-    Tenta: ESC, blur + esconder via JS, clique fora com ActionChains.
+    Tenta: ESC, blur + esconder via JS, clique fora (mousedown no body).
     Só retorna quando não houver datepicker visível.
     """
     for _ in range(tentativas):
         # 1) ESC no elemento ativo e no body
         try:
-            driver.switch_to.default_content()
-            driver.switch_to.active_element.send_keys(Keys.ESCAPE)
+            nav.frame(None)
+            nav.tecla("Escape")
         except Exception:
             pass
         try:
-            body = driver.find_element(By.TAG_NAME, "body")
-            body.send_keys(Keys.ESCAPE)
+            nav.tecla("Escape", "body")
         except Exception:
             pass
 
         # 2) blur + esconder overlays via JS
         try:
-            driver.execute_script("""
+            nav.avaliar("""
                 if (document.activeElement) document.activeElement.blur();
                 var hide = el => { if (!el) return; el.style.display = 'none'; el.classList.add('force-hidden'); };
                 var els = Array.from(document.querySelectorAll('.ui-datepicker, .ui-datepicker-div, .ui-input-overlay'));
@@ -336,14 +308,17 @@ def _fechar_datepicker(driver, wait, tentativas=3):
 
         # 3) clique fora (canto superior esquerdo seguro)
         try:
-            body = driver.find_element(By.TAG_NAME, "body")
-            ActionChains(driver).move_to_element_with_offset(body, 10, 10).click().perform()
+            nav.avaliar("""
+                ['mousedown', 'mouseup', 'click'].forEach(function(tipo){
+                    document.body.dispatchEvent(new MouseEvent(tipo, {bubbles: true, clientX: 10, clientY: 10}));
+                });
+            """)
         except Exception:
             pass
 
         # 4) checa se ainda há overlays visíveis
         try:
-            visiveis = driver.execute_script("""
+            visiveis = nav.avaliar("""
                 return Array.from(document.querySelectorAll('.ui-datepicker, .ui-datepicker-div, .ui-input-overlay'))
                     .some(e => {
                         const st = window.getComputedStyle(e);
@@ -355,19 +330,18 @@ def _fechar_datepicker(driver, wait, tentativas=3):
         except Exception:
             return True
 
-        time.sleep(0.5)
+        aguardar_ocioso(nav, teto=0.5)
 
     return False
 
-def _safe_refresh(driver, retries=3, delay=15):
+def _safe_refresh(nav, retries=3, delay=15):
     for i in range(retries):
         try:
-            driver.switch_to.default_content()
-            driver.refresh()
+            nav.frame(None)
+            nav.ir(nav.url)
             print("🔄 Página recarregada com sucesso.")
             return
         except Exception as e:
             print(f"⚠️ Falha ao atualizar (tentativa {i+1}/{retries}): {e}")
             time.sleep(delay)
     raise Exception("❌ Não foi possível atualizar a página após várias tentativas.")
-
@@ -0,0 +1,112 @@
+# services/session_pool.py
+
+import logging
+import threading
+import time
+
+from config import POOL_TAMANHO, POOL_MAX_USOS, POOL_MAX_RSS_MB
+from services.navegador import criar_navegador
+from services.auth import garantir_login
+from services.tracing import span
+
+try:
+    import psutil
+except ImportError:  # opcional: sem psutil o limite de memória não é verificado
+    psutil = None
+
+logger = logging.getLogger("robo-elaw")
+
+# Navegadores já logados, prontos para reuso entre execuções/retentativas.
+# Cada item: {"nav": Navegador, "usos": int, "criado_em": float}
+_livres = []
+_em_uso = {}
+_lock = threading.Lock()
+
+
+def _rss_mb(nav):
+    """Memória residente (MB) do driver/navegador e processos filhos."""
+    pid = nav.pid()
+    if psutil is None or pid is None:
+        return None
+    try:
+        proc = psutil.Process(pid)
+        total = proc.memory_info().rss
+        for filho in proc.children(recursive=True):
+            try:
+                total += filho.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _descartar(item, motivo):
+    logger.info(f"♻️ Reciclando sessão do navegador ({motivo}).")
+    # Só fecha: a sessão do servidor e os cookies salvos continuam valendo
+    # para a próxima instância (logout explícito: services.auth.logout)
+    try:
+        item["nav"].fechar()
+    except Exception:
+        pass
+
+
+def obter_sessao():
+    """
+    Entrega um navegador logado. Reaproveita uma instância aquecida do pool
+    quando ela passa no health-check e não estourou usos/memória;
+    caso contrário cria uma nova (criar_navegador + login).
+    """
+    with _lock:
+        while _livres:
+            item = _livres.pop()
+            rss = _rss_mb(item["nav"])
+            if item["usos"] >= POOL_MAX_USOS:
+                _descartar(item, f"{item['usos']} usos")
+            elif rss is not None and rss > POOL_MAX_RSS_MB:
+                _descartar(item, f"RSS {rss:.0f} MB")
+            elif not item["nav"].saudavel():
+                _descartar(item, "health-check falhou")
+            else:
+                logger.info(f"🔥 Reutilizando navegador aquecido (uso {item['usos'] + 1}).")
+                break
+        else:
+            logger.info("🚀 Iniciando novo navegador...")
+            with span("driver_start"):
+                item = {"nav": criar_navegador(), "usos": 0, "criado_em": time.time()}
+
+        item["usos"] += 1
+        _em_uso[id(item["nav"])] = item
+
+    try:
+        with span("login"):
+            garantir_login(item["nav"])
+    except Exception:
+        devolver_sessao(item["nav"], saudavel=False)
+        raise
+    return item["nav"]
+
+
+def devolver_sessao(nav, saudavel=True):
+    """Devolve o navegador ao pool (ou encerra, se marcado como não saudável / pool cheio)."""
+    with _lock:
+        item = _em_uso.pop(id(nav), None)
+        if item is None:
+            item = {"nav": nav, "usos": POOL_MAX_USOS, "criado_em": time.time()}
+
+        if not saudavel:
+            _descartar(item, "marcada como não saudável")
+        elif len(_livres) >= POOL_TAMANHO:
+            _descartar(item, "pool cheio")
+        else:
+            _livres.append(item)
+
+
+def encerrar_pool():
+    """Fecha todas as instâncias (chamar ao encerrar o robô); a sessão salva é mantida."""
+    with _lock:
+        itens = _livres + list(_em_uso.values())
+        _livres.clear()
+        _em_uso.clear()
+    for item in itens:
+        _descartar(item, "encerrando")
@@ -0,0 +1,163 @@
+# services/tracing.py
+"""
+Spans de tempo aninhados por execução, gravados num histórico append-only (JSONL).
+
+    execucao_id = iniciar_execucao()
+    with span("gerar_relatorio"):
+        with span("datas"):
+            ...
+    anotar(relatorio_id="3612810")   # passa a constar nos spans seguintes
+
+Relatório p50/p95 por etapa:
+    py -m services.tracing --dias 7
+    py -m services.tracing --por perfil   (etapas separadas por atributo, ex. perfil do navegador)
+"""
+
+import argparse
+import contextvars
+import json
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from config import HISTORICO_PATH
+
+_execucao = contextvars.ContextVar("execucao", default=None)   # {"id": ..., "contexto": {...}}
+_pilha = contextvars.ContextVar("pilha_spans", default=())
+_lock = threading.Lock()
+
+
+def _gravar(registro: dict):
+    HISTORICO_PATH.parent.mkdir(parents=True, exist_ok=True)
+    linha = json.dumps(registro, ensure_ascii=False, default=str)
+    with _lock, open(HISTORICO_PATH, "a", encoding="utf-8") as f:
+        f.write(linha + "\n")
+
+
+def iniciar_execucao(**contexto) -> str:
+    """Abre uma nova execução (run); spans e registros seguintes ficam associados a ela."""
+    execucao_id = datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+    _execucao.set({"id": execucao_id, "contexto": dict(contexto)})
+    _pilha.set(())
+    return execucao_id
+
+
+def execucao_atual():
+    atual = _execucao.get()
+    return atual["id"] if atual else None
+
+
+def anotar(**contexto):
+    """Acrescenta atributos (ex.: relatorio_id) a todos os registros seguintes da execução."""
+    atual = _execucao.get()
+    if atual is not None:
+        atual["contexto"].update(contexto)
+
+
+def registrar(tipo: str, **dados):
+    """Grava um registro avulso (métricas, deriva etc.) associado à execução atual."""
+    atual = _execucao.get() or {"id": None, "contexto": {}}
+    _gravar({
+        "tipo": tipo,
+        "execucao": atual["id"],
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        **atual["contexto"],
+        **dados,
+    })
+
+
+@contextmanager
+def span(nome: str, **atributos):
+    """Mede o bloco e grava um span com o caminho completo (pai/filho) e o resultado."""
+    pilha = _pilha.get() + (nome,)
+    token = _pilha.set(pilha)
+    inicio_ts = datetime.now()
+    inicio = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio
+        _pilha.reset(token)
+        registrar(
+            "span",
+            nome=nome,
+            caminho="/".join(pilha),
+            inicio=inicio_ts.isoformat(timespec="milliseconds"),
+            duracao_s=round(duracao, 4),
+            ok=ok,
+            **atributos,
+        )
+
+
+def ler_historico(dias: float = None, tipo: str = None):
+    """Itera os registros do histórico (opcionalmente só dos últimos `dias` e de um `tipo`)."""
+    if not HISTORICO_PATH.exists():
+        return
+    limite = (datetime.now() - timedelta(days=dias)).isoformat() if dias else None
+    with open(HISTORICO_PATH, encoding="utf-8") as f:
+        for linha in f:
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                continue
+            if tipo and registro.get("tipo") != tipo:
+                continue
+            if limite and registro.get("ts", "") < limite:
+                continue
+            yield registro
+
+
+def percentil(valores, p):
+    """Percentil por posto mais próximo (valores não precisam estar ordenados)."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    k = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return ordenados[k]
+
+
+def resumo_por_etapa(dias: float = 7, por: str = None):
+    """
+    {caminho: {"n", "p50", "p95"}} dos spans dos últimos `dias`. Com `por`,
+    a chave ganha o valor desse atributo (ex.: "…/carregamento [enxuto]")
+    e spans sem ele ficam de fora.
+    """
+    por_etapa = {}
+    for r in ler_historico(dias, tipo="span"):
+        chave = r["caminho"]
+        if por:
+            if r.get(por) is None:
+                continue
+            chave = f"{chave} [{r[por]}]"
+        por_etapa.setdefault(chave, []).append(r["duracao_s"])
+    return {
+        caminho: {"n": len(v), "p50": percentil(v, 50), "p95": percentil(v, 95)}
+        for caminho, v in sorted(por_etapa.items())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p50/p95 por etapa do robô (histórico de spans).")
+    parser.add_argument("--dias", type=float, default=7)
+    parser.add_argument("--por", help="separa as etapas por um atributo do span (ex.: perfil)")
+    args = parser.parse_args()
+
+    resumo = resumo_por_etapa(args.dias, args.por)
+    if not resumo:
+        print(f"Nenhum span nos últimos {args.dias:g} dias em {HISTORICO_PATH}.")
+        return
+    largura = max(len(c) for c in resumo)
+    print(f"{'etapa'.ljust(largura)}  {'n':>5}  {'p50 (s)':>9}  {'p95 (s)':>9}")
+    for caminho, r in resumo.items():
+        print(f"{caminho.ljust(largura)}  {r['n']:>5}  {r['p50']:>9.2f}  {r['p95']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional
 
+from services.download_watcher import ObservadorDownload
+
 def dentro_horario(start_hour: int, end_hour: int) -> bool:
     now = datetime.now()
     return now.weekday() < 5 and start_hour <= now.hour < end_hour
@@ -17,45 +19,34 @@ def proximo_dia_util_at(start_hour: int) -> datetime:
         d += timedelta(days=1)
     return d.replace(hour=start_hour, minute=0, second=0, microsecond=0)
 
-def esperar_download(pasta: Path, nome_final: str, timeout: int = 300, estabilidade_s: int = 3) -> Path:
+def esperar_download(pasta: Path, nome_final: str, timeout: int = 300, estabilidade_s: int = 3,
+                     observador: Optional[ObservadorDownload] = None) -> Path:
     """
-    Espera sumir .crdownload e tamanho estabilizar.
-    Renomeia para nome_final (sobrescreve se existir).
+    Espera o download terminar e renomeia para nome_final (sobrescreve se existir).
+    Passe um `observador` criado ANTES do clique para rastrear exatamente aquele
+    download (inotify no Linux, polling nas demais plataformas); sem ele, considera
+    também o que já estava na pasta (comportamento antigo: arquivo mais recente).
     """
     pasta.mkdir(parents=True, exist_ok=True)
-    deadline = time.time() + timeout
     destino = pasta / nome_final
 
-    ultimo_ok: Optional[Path] = None
-    ultimo_tam = -1
-    ultimo_tam_igual_desde = None
-
-    while time.time() < deadline:
-        # pega o arquivo mais recente que NÃO termina com .crdownload
-        candidatos = sorted([p for p in pasta.glob("*") if p.is_file() and not p.name.endswith(".crdownload")],
-                            key=lambda p: p.stat().st_mtime, reverse=True)
-        if candidatos:
-            atual = candidatos[0]
-            tam = atual.stat().st_size
-            if tam == ultimo_tam:
-                # mesmo tamanho desde...
-                if ultimo_tam_igual_desde is None:
-                    ultimo_tam_igual_desde = time.time()
-                elif time.time() - ultimo_tam_igual_desde >= estabilidade_s:
-                    ultimo_ok = atual
-                    break
-            else:
-                ultimo_tam = tam
-                ultimo_tam_igual_desde = None
-
-        time.sleep(1)
-
-    if not ultimo_ok:
-    # fallback: se o destino já existir, usa ele mesmo
-        if destino.exists():
-             return destino
-        raise TimeoutError("Tempo limite aguardando conclusão do download.")
+    proprio = observador is None
+    if proprio:
+        observador = ObservadorDownload(pasta, ignorar_existentes=False)
 
+    try:
+        ultimo_ok = observador.aguardar(timeout, estabilidade_s=estabilidade_s)
+    except TimeoutError:
+        # fallback: se o destino já existir, usa ele mesmo
+        if destino.exists():
+            return destino
+        raise
+    finally:
+        if proprio:
+            observador.fechar()
+
+    if ultimo_ok == destino:
+        return destino
     if destino.exists():
         destino.unlink()
     ultimo_ok.rename(destino)
@@ -90,6 +81,14 @@ def perguntar_com_timeout(pergunta: str, timeout: int = 15) -> str:
     print("\n⏰ Tempo esgotado, prosseguindo automaticamente...")
     return "n"
 
+def aguardar_horario(alvo: datetime):
+    """Dorme até `alvo` (precisão de milissegundos); retorna na hora se já passou."""
+    while True:
+        falta = (alvo - datetime.now()).total_seconds()
+        if falta <= 0:
+            return
+        time.sleep(min(falta, 30))
+
 def proxima_execucao_agendada(hora, minuto):
     now = datetime.now()
     agendado = now.replace(hour=hora, minute=minuto, second=0, microsecond=0)
@@ -0,0 +1,109 @@
+# services/validacao.py
+
+import fnmatch
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+
+_EOCD_ASSINATURA = b"PK\x05\x06"
+_EOCD = struct.Struct("<4s4H2LH")  # assinatura, discos, entradas, tam. e offset do diretório central
+_EOCD_MAX_COMENTARIO = 0xFFFF
+
+# Partes do xlsx cujo CRC é conferido (os dados propriamente ditos)
+_PARTES_PLANILHA = ("xl/worksheets/*.xml", "xl/sharedStrings.xml")
+
+
+def _eocd_ok(caminho: Path) -> bool:
+    """Confere o registro End Of Central Directory do ZIP e os limites do diretório central."""
+    tamanho = caminho.stat().st_size
+    if tamanho < _EOCD.size:
+        return False
+    with open(caminho, "rb") as f:
+        inicio = max(0, tamanho - _EOCD.size - _EOCD_MAX_COMENTARIO)
+        f.seek(inicio)
+        cauda = f.read()
+    pos = cauda.rfind(_EOCD_ASSINATURA)
+    if pos < 0 or pos + _EOCD.size > len(cauda):
+        return False
+    _, _, _, _, _, tam_dir, offset_dir, _ = _EOCD.unpack_from(cauda, pos)
+    return offset_dir + tam_dir <= inicio + pos
+
+
+def xlsx_completo(caminho: Path) -> bool:
+    """
+    True se o .xlsx está estruturalmente completo: EOCD válido e CRC
+    das partes de planilha (worksheets + sharedStrings) conferindo.
+    """
+    try:
+        if not _eocd_ok(caminho):
+            return False
+        with zipfile.ZipFile(caminho) as zf:
+            partes = [
+                n for n in zf.namelist()
+                if any(fnmatch.fnmatch(n, padrao) for padrao in _PARTES_PLANILHA)
+            ]
+            if not partes:
+                return False
+            for nome in partes:
+                # ler até o fim faz o zipfile validar o CRC (BadZipFile se divergir)
+                with zf.open(nome) as parte:
+                    while parte.read(1024 * 1024):
+                        pass
+        return True
+    except (OSError, zipfile.BadZipFile, EOFError, zlib.error):
+        return False
+
+
+def csv_completo(caminho: Path, linhas_esperadas: int = None, trailer: str = None,
+                 tamanho_esperado: int = None) -> bool:
+    """
+    True se o .csv termina num registro completo (quebra de linha final ou
+    `trailer` esperado) e, se informados, tem exatamente `tamanho_esperado`
+    bytes (Content-Length/Content-Range do download) e ao menos
+    `linhas_esperadas` linhas.
+
+    Limitação: sem nenhuma dessas informações (resposta HTTP chunked, download
+    pelo clique no navegador), um CSV cortado exatamente numa quebra de linha
+    passa como completo — o formato não tem marca de fim.
+    """
+    try:
+        tamanho = caminho.stat().st_size
+        if tamanho == 0:
+            return False
+        if tamanho_esperado is not None and tamanho != tamanho_esperado:
+            return False
+        with open(caminho, "rb") as f:
+            f.seek(max(0, tamanho - 4096))
+            cauda = f.read()
+        if trailer is not None:
+            if not cauda.rstrip(b"\r\n").endswith(trailer.encode("utf-8")):
+                return False
+        elif not cauda.endswith(b"\n"):
+            return False
+        if linhas_esperadas is not None:
+            with open(caminho, "rb") as f:
+                if sum(1 for _ in f) < linhas_esperadas:
+                    return False
+        return True
+    except OSError:
+        return False
+
+
+def validavel(caminho: Path) -> bool:
+    return Path(caminho).suffix.lower() in (".xlsx", ".csv")
+
+
+def arquivo_completo(caminho: Path, sufixo: str = None, **kwargs) -> bool:
+    """
+    Checagem estrutural conforme a extensão (tipos desconhecidos são aceitos).
+    `sufixo` força o tipo quando o arquivo ainda tem nome temporário (.part).
+    `kwargs` vão para a checagem do CSV (ex.: tamanho_esperado).
+    """
+    caminho = Path(caminho)
+    sufixo = (sufixo or caminho.suffix).lower()
+    if sufixo == ".xlsx":
+        return xlsx_completo(caminho)
+    if sufixo == ".csv":
+        return csv_completo(caminho, **kwargs)
+    return True
@@ -0,0 +1,289 @@
+# services/xlsx.py
+"""
+Leitura e escrita de .xlsx em streaming, só com a biblioteca padrão.
+
+    for linha in ler_linhas("Relatorio.xlsx"):       # [Celula | None, ...]
+        ...
+    escrever_xlsx("saida.xlsx", linhas, estilos=ler_estilos("Relatorio.xlsx"))
+
+A planilha é lida linha a linha (iterparse, descartando o XML já processado)
+e escrita direto no ZIP, sem montar o documento em memória. Os valores
+mantêm o tipo e o índice de estilo do original, para que datas continuem
+formatadas como datas quando o styles.xml de origem é reaproveitado.
+"""
+
+import os
+import posixpath
+import re
+import tempfile
+import zipfile
+from array import array
+from collections import namedtuple
+from xml.etree.ElementTree import fromstring, iterparse
+from xml.sax.saxutils import escape
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# tipo: "s" (texto), "n" (número), "b" (booleano), "d" (data ISO), "e" (erro)
+# estilo: índice em styles.xml (cellXfs) ou None; valor: texto como está no XML
+Celula = namedtuple("Celula", "tipo estilo valor")
+
+_REF = re.compile(r"([A-Z]+)(\d+)")
+
+
+def coluna_indice(letras: str) -> int:
+    """'A' -> 0, 'Z' -> 25, 'AA' -> 26."""
+    n = 0
+    for ch in letras:
+        n = n * 26 + (ord(ch) - 64)
+    return n - 1
+
+
+def coluna_letras(indice: int) -> str:
+    """0 -> 'A', 26 -> 'AA'."""
+    letras = ""
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _caminho_aba(zf: zipfile.ZipFile, aba=0) -> str:
+    """Caminho da worksheet no ZIP pela posição (int) ou nome (str) da aba."""
+    rels = {}
+    with zf.open("xl/_rels/workbook.xml.rels") as f:
+        for _, el in iterparse(f):
+            if el.tag == _NS_PKG_REL + "Relationship":
+                alvo = el.get("Target")
+                rels[el.get("Id")] = alvo.lstrip("/") if alvo.startswith("/") else posixpath.join("xl", alvo)
+    abas = []
+    with zf.open("xl/workbook.xml") as f:
+        for _, el in iterparse(f):
+            if el.tag == _NS + "sheet":
+                abas.append((el.get("name"), rels[el.get(_NS_REL + "id")]))
+    if not abas:
+        raise ValueError("xlsx sem abas")
+    if isinstance(aba, int):
+        return abas[aba][1]
+    for nome, caminho in abas:
+        if nome == aba:
+            return caminho
+    raise ValueError(f"Aba '{aba}' não encontrada: {[n for n, _ in abas]}")
+
+
+def _texto_rico(el) -> str:
+    """Texto de <si>/<is>: <t> direto ou a concatenação dos <r><t> (rich text)."""
+    return "".join(t.text or "" for t in el.iter(_NS + "t"))
+
+
+# Acima deste tamanho (descompactado) as shared strings vão para um arquivo
+# temporário e só os offsets (8 bytes por string) ficam em memória.
+SHARED_STRINGS_EM_DISCO_BYTES = 16 * 1024 * 1024
+
+
+class SharedStringsEmDisco:
+    """Tabela de shared strings indexável, com os textos num arquivo temporário."""
+
+    def __init__(self):
+        self._arquivo = tempfile.TemporaryFile()
+        self._offsets = array("q", [0])
+
+    def append(self, texto: str):
+        self._arquivo.seek(0, os.SEEK_END)
+        self._arquivo.write(texto.encode("utf-8"))
+        self._offsets.append(self._arquivo.tell())
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        inicio, fim = self._offsets[i], self._offsets[i + 1]
+        self._arquivo.seek(inicio)
+        return self._arquivo.read(fim - inicio).decode("utf-8")
+
+    def close(self):
+        self._arquivo.close()
+
+
+def ler_shared_strings(zf: zipfile.ZipFile, em_disco: bool = None):
+    """
+    Lista das shared strings (ou SharedStringsEmDisco quando a parte passa de
+    SHARED_STRINGS_EM_DISCO_BYTES, ou se `em_disco` for True).
+    """
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    if em_disco is None:
+        em_disco = zf.getinfo("xl/sharedStrings.xml").file_size > SHARED_STRINGS_EM_DISCO_BYTES
+    textos = SharedStringsEmDisco() if em_disco else []
+    with zf.open("xl/sharedStrings.xml") as f:
+        raiz = None
+        for evento, el in iterparse(f, events=("start", "end")):
+            if evento == "start":
+                if raiz is None:
+                    raiz = el
+                continue
+            if el.tag == _NS + "si":
+                textos.append(_texto_rico(el))
+                raiz.clear()
+    return textos
+
+
+# numFmtId embutidos que são datas/horas (ECMA-376, 18.8.30)
+_NUMFMT_DATA_EMBUTIDOS = set(range(14, 23)) | {45, 46, 47}
+_TEXTO_ENTRE_ASPAS = re.compile(r'"[^"]*"|\\.|\[[^\]]*\]')
+
+
+def _codigo_e_data(codigo: str) -> bool:
+    """Formato numérico personalizado de data/hora (d, m, y, h, s fora de texto literal)."""
+    limpo = _TEXTO_ENTRE_ASPAS.sub("", codigo).lower()
+    return any(ch in limpo for ch in "dyhs")
+
+
+def estilos_de_data(estilos: bytes) -> set:
+    """Índices de cellXfs (atributo s das células) cujo formato numérico é data/hora."""
+    if not estilos:
+        return set()
+    raiz = fromstring(estilos)
+    personalizados = {
+        int(nf.get("numFmtId")) for nf in raiz.iter(_NS + "numFmt") if _codigo_e_data(nf.get("formatCode", ""))
+    }
+    cell_xfs = raiz.find(_NS + "cellXfs")
+    if cell_xfs is None:
+        return set()
+    return {
+        str(i) for i, xf in enumerate(cell_xfs.findall(_NS + "xf"))
+        if int(xf.get("numFmtId", "0")) in _NUMFMT_DATA_EMBUTIDOS | personalizados
+    }
+
+
+def ler_estilos(caminho) -> bytes:
+    """styles.xml bruto do arquivo (ou None), para reaproveitar na escrita."""
+    with zipfile.ZipFile(caminho) as zf:
+        return zf.read("xl/styles.xml") if "xl/styles.xml" in zf.namelist() else None
+
+
+def _celula(el, shared) -> Celula:
+    tipo = el.get("t", "n")
+    estilo = el.get("s")
+    if tipo == "inlineStr":
+        is_ = el.find(_NS + "is")
+        return Celula("s", estilo, _texto_rico(is_) if is_ is not None else "")
+    v = el.find(_NS + "v")
+    valor = v.text if v is not None and v.text is not None else None
+    if tipo == "s":
+        return Celula("s", estilo, shared[int(valor)] if valor is not None else "")
+    if tipo == "str":
+        return Celula("s", estilo, valor or "")
+    if valor is None:
+        return None
+    return Celula(tipo, estilo, valor)
+
+
+def ler_linhas(caminho, aba=0, shared=None):
+    """
+    Gera as linhas da aba como listas de Celula (None nas colunas vazias).
+    A memória usada não cresce com o número de linhas: cada <row> é
+    descartado após processado. `shared` permite passar uma tabela de
+    shared strings própria (qualquer objeto indexável).
+    """
+    with zipfile.ZipFile(caminho) as zf:
+        proprio = shared is None
+        if proprio:
+            shared = ler_shared_strings(zf)
+        try:
+            yield from _linhas_da_aba(zf, _caminho_aba(zf, aba), shared)
+        finally:
+            if proprio and isinstance(shared, SharedStringsEmDisco):
+                shared.close()
+
+
+def _linhas_da_aba(zf, caminho_aba, shared):
+    with zf.open(caminho_aba) as f:
+        sheet_data = None
+        for evento, el in iterparse(f, events=("start", "end")):
+            if evento == "start":
+                if el.tag == _NS + "sheetData":
+                    sheet_data = el
+                continue
+            if el.tag != _NS + "row":
+                continue
+            linha = []
+            for c in el.iter(_NS + "c"):
+                ref = c.get("r")
+                idx = coluna_indice(_REF.match(ref).group(1)) if ref else len(linha)
+                if idx > len(linha):
+                    linha.extend([None] * (idx - len(linha)))
+                linha.append(_celula(c, shared))
+            yield linha
+            el.clear()
+            if sheet_data is not None:
+                sheet_data.clear()
+
+
+def _xml_celula(ref: str, cel: Celula) -> str:
+    estilo = f' s="{cel.estilo}"' if cel.estilo is not None else ""
+    if cel.tipo == "s":
+        return (f'<c r="{ref}"{estilo} t="inlineStr"><is><t xml:space="preserve">'
+                f"{escape(cel.valor)}</t></is></c>")
+    tipo = "" if cel.tipo == "n" else f' t="{cel.tipo}"'
+    return f'<c r="{ref}"{estilo}{tipo}><v>{escape(cel.valor)}</v></c>'
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '{estilos}</Types>'
+)
+_OVERRIDE_ESTILOS = ('<Override PartName="/xl/styles.xml" '
+                     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>')
+
+
+def escrever_xlsx(caminho, linhas, estilos: bytes = None, nome_aba: str = "Dados") -> int:
+    """
+    Escreve `linhas` (iterável de listas de Celula/None) numa aba única, em
+    streaming. `estilos` é um styles.xml (ver ler_estilos) cujos índices as
+    células referenciam. Retorna o número de linhas escritas.
+    """
+    total = 0
+    with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES.format(estilos=_OVERRIDE_ESTILOS if estilos else ""))
+        zf.writestr("_rels/.rels",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                    'relationships/officeDocument" Target="xl/workbook.xml"/></Relationships>')
+        zf.writestr("xl/workbook.xml",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                    f'<sheets><sheet name="{escape(nome_aba)}" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        rel_estilos = ('<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                       'relationships/styles" Target="styles.xml"/>') if estilos else ""
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                    f'relationships/worksheet" Target="worksheets/sheet1.xml"/>{rel_estilos}</Relationships>')
+        if estilos:
+            zf.writestr("xl/styles.xml", estilos)
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            for linha in linhas:
+                total += 1
+                celulas = "".join(
+                    _xml_celula(f"{coluna_letras(i)}{total}", cel) for i, cel in enumerate(linha) if cel is not None
+                )
+                f.write(f'<row r="{total}">{celulas}</row>'.encode("utf-8"))
+            f.write(b"</sheetData></worksheet>")
+    return total
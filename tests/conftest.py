@@ -0,0 +1,20 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Dependências vendorizadas (Lib/site-packages) e o próprio projeto
+for caminho in (RAIZ / "Lib" / "site-packages", RAIZ):
+    if caminho.is_dir() and str(caminho) not in sys.path:
+        sys.path.insert(0, str(caminho))
+
+# config.py exige credenciais; histórico/cache vão para uma pasta temporária
+_TMP = Path(tempfile.mkdtemp(prefix="robo-testes-"))
+os.environ.setdefault("EUSER", "teste")
+os.environ.setdefault("EPASS", "teste")
+os.environ.setdefault("HISTORICO_PATH", str(_TMP / "historico.jsonl"))
+os.environ.setdefault("CACHE_DIR", str(_TMP / "cache"))
+os.environ.setdefault("FINAL_DIR", str(_TMP / "final"))
@@ -0,0 +1,47 @@
+# tests/test_agendamento.py
+from datetime import datetime
+
+import pytest
+
+import main
+
+
+def test_janela_agendada_antes_do_expediente(monkeypatch):
+    monkeypatch.setattr(main, "RUN_AT_HOUR", 8)
+    monkeypatch.setattr(main, "RUN_AT_MINUTE", 0)
+    monkeypatch.setattr(main, "PRE_AQUECER_MIN", 3)
+
+    agendado, falta = main._janela_agendada(datetime(2024, 3, 18, 7, 58))   # segunda-feira
+    assert agendado == datetime(2024, 3, 18, 8, 0)
+    assert falta == -60   # já dentro do pré-aquecimento, antes de WORK_START_HOUR
+
+    _, falta = main._janela_agendada(datetime(2024, 3, 18, 7, 30))
+    assert falta == 27 * 60
+
+
+def test_pre_aquecimento_antes_do_expediente_nao_cai_no_fora_do_horario(monkeypatch):
+    agora = datetime(2024, 3, 18, 7, 57, 30)
+
+    class _Relogio(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return agora
+
+    monkeypatch.setattr(main, "datetime", _Relogio)
+    monkeypatch.setattr(main, "RUN_AT_HOUR", 8)
+    monkeypatch.setattr(main, "RUN_AT_MINUTE", 0)
+    monkeypatch.setattr(main, "PRE_AQUECER_MIN", 3)
+    monkeypatch.setattr(main, "WORK_START_HOUR", 8)
+    monkeypatch.setattr(main, "dentro_horario", lambda *a: False)
+    monkeypatch.setattr(main, "perguntar_com_timeout", lambda *a, **k: pytest.fail("perguntou fora do horário"))
+    monkeypatch.setattr(main, "encerrar_pool", lambda: None)
+
+    execucoes = []
+
+    def run_once(agendado):
+        execucoes.append(agendado)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(main, "run_once", run_once)
+    main.main()
+    assert execucoes == [datetime(2024, 3, 18, 8, 0)]
@@ -0,0 +1,76 @@
+# tests/test_conversao.py
+import csv
+from datetime import date, datetime
+
+import pytest
+
+from services import conversao, xlsx
+from services.xlsx import Celula
+
+# cellXfs: 0 = geral, 1 = data (numFmtId 14)
+_ESTILOS = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    b'<fonts count="1"><font/></fonts><fills count="1"><fill/></fills>'
+    b'<borders count="1"><border/></borders><cellStyleXfs count="1"><xf/></cellStyleXfs>'
+    b'<cellXfs count="2"><xf numFmtId="0"/><xf numFmtId="14" applyNumberFormat="1"/></cellXfs>'
+    b'</styleSheet>'
+)
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    caminho = tmp_path / "Relatorio.xlsx"
+    s, n = (lambda v: Celula("s", None, v)), (lambda v: Celula("n", None, v))
+    xlsx.escrever_xlsx(caminho, [
+        [s("ID"), s("Abertura"), s("Prazo"), s("Valor"), s("Obs")],
+        [n("00123"), Celula("n", "1", "45366"), s("20/03/2024 14:30"), n("10"), s("a")],
+        [n("456"), Celula("n", "1", "45367.5"), s("21/03/2024"), n("2.5"), None],
+        [s("ABC-9"), None, s("sem prazo"), n("3"), Celula("b", None, "1")],
+    ], estilos=_ESTILOS)
+    return caminho
+
+
+def test_linhas_tipadas(planilha):
+    cabecalho, linhas = conversao.linhas_tipadas(planilha)
+    assert cabecalho == ["ID", "Abertura", "Prazo", "Valor", "Obs"]
+    assert list(linhas) == [
+        ["123", date(2024, 3, 15), datetime(2024, 3, 20, 14, 30), 10, "a"],
+        ["456", datetime(2024, 3, 16, 12, 0), date(2024, 3, 21), 2.5, None],
+        ["ABC-9", None, "sem prazo", 3, True],
+    ]
+
+
+def test_inferir_tipos_alarga_sobre_o_arquivo_todo(planilha):
+    _, linhas = conversao.linhas_tipadas(planilha)
+    tipos = conversao._inferir_tipos(linhas, 5)
+    assert tipos == [{str}, {date, datetime}, {datetime, date, str}, {int, float}, {str, bool}]
+
+
+def test_csv(planilha):
+    saidas = conversao.converter(planilha, ["csv"])
+    with open(saidas["csv"], encoding="utf-8", newline="") as f:
+        linhas = list(csv.reader(f, delimiter=conversao.CSV_SEPARADOR))
+    assert linhas == [
+        ["ID", "Abertura", "Prazo", "Valor", "Obs"],
+        ["123", "2024-03-15", "2024-03-20 14:30:00", "10", "a"],
+        ["456", "2024-03-16 12:00:00", "2024-03-21", "2.5", ""],
+        ["ABC-9", "", "sem prazo", "3", "true"],
+    ]
+
+
+def test_parquet_nao_descarta_valores(planilha):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    saidas = conversao.converter(planilha, ["parquet"], colunas_texto=())
+    tabela = pq.read_table(saidas["parquet"])
+    tipos = tabela.schema.types
+    assert pa.types.is_timestamp(tipos[1])   # o Parquet grava "s" como "ms"
+    assert [tipos[0], tipos[2], tipos[3], tipos[4]] == [pa.string(), pa.string(), pa.float64(), pa.string()]
+    assert tabela.to_pydict() == {
+        "ID": ["123", "456", "ABC-9"],
+        "Abertura": [datetime(2024, 3, 15), datetime(2024, 3, 16, 12, 0), None],
+        "Prazo": ["2024-03-20 14:30:00", "2024-03-21", "sem prazo"],
+        "Valor": [10.0, 2.5, 3.0],
+        "Obs": ["a", None, "true"],
+    }
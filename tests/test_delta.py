@@ -0,0 +1,79 @@
+# tests/test_delta.py
+from datetime import datetime
+
+import pytest
+
+from services import delta, xlsx
+from services.xlsx import Celula
+
+
+@pytest.fixture(autouse=True)
+def banco(tmp_path, monkeypatch):
+    monkeypatch.setattr(delta, "DELTA_DB", tmp_path / "delta.sqlite3")
+
+
+def _planilha(caminho, linhas):
+    cabecalho = [Celula("s", None, "ID Tarefa"), Celula("s", None, "Data"), Celula("s", None, "Status")]
+    xlsx.escrever_xlsx(caminho, [cabecalho] + [[Celula("s", None, v) for v in linha] for linha in linhas])
+    return caminho
+
+
+def _pendencia(completo, inicio=None, fim=None):
+    return {"delta": {"job": "tarefas", "completo": completo, "inicio": inicio, "fim": fim,
+                      "chave": ["ID Tarefa"], "coluna_data": "Data"}}
+
+
+def _publicado(tmp_path):
+    job = {"nome": "tarefas", "modo": "delta", "arquivo": "tarefas.xlsx", "pasta": str(tmp_path)}
+    delta.publicar_delta([job], tmp_path)
+    return [[c.valor for c in linha] for linha in xlsx.ler_linhas(tmp_path / "tarefas.xlsx")][1:]
+
+
+def test_upsert_e_remocao_na_janela(tmp_path):
+    completo = _planilha(tmp_path / "completo.xlsx", [
+        ["1", "01/01/2024", "aberta"],
+        ["2", "10/03/2024", "aberta"],
+        ["3", "12/03/2024", "aberta"],
+    ])
+    assert delta.aplicar_delta(_pendencia(True), completo) == {"linhas": 3, "removidas": 0}
+
+    # 2 mudou de status; 3 saiu do filtro (some da janela); 1 está fora da janela
+    parcial = _planilha(tmp_path / "parcial.xlsx", [
+        ["2", "10/03/2024", "fechada"],
+        ["4", "15/03/2024", "aberta"],
+    ])
+    resultado = delta.aplicar_delta(_pendencia(False, "2024-03-01", "2024-03-31"), parcial)
+    assert resultado == {"linhas": 2, "removidas": 1}
+
+    assert _publicado(tmp_path) == [
+        ["1", "01/01/2024", "aberta"],
+        ["2", "10/03/2024", "fechada"],
+        ["4", "15/03/2024", "aberta"],
+    ]
+
+
+def test_refresh_completo_apaga_o_que_nao_veio(tmp_path):
+    delta.aplicar_delta(_pendencia(True), _planilha(tmp_path / "a.xlsx", [["1", "01/01/2024", "x"],
+                                                                          ["2", "02/01/2024", "x"]]))
+    resultado = delta.aplicar_delta(_pendencia(True), _planilha(tmp_path / "b.xlsx", [["2", "02/01/2024", "y"]]))
+    assert resultado == {"linhas": 1, "removidas": 1}
+    assert _publicado(tmp_path) == [["2", "02/01/2024", "y"]]
+
+
+def test_expandir_pede_completo_com_banco_vazio_e_janela_depois(tmp_path):
+    job = {"nome": "tarefas", "modo": "delta", "janela_dias": 30, "futuro_dias": 0,
+           "chave": ["ID Tarefa"], "coluna_data": "Data"}
+    hoje = datetime(2024, 3, 20)
+    assert delta.expandir_delta([job], hoje)[0]["delta"]["completo"] is True
+
+    delta.aplicar_delta(_pendencia(True), _planilha(tmp_path / "a.xlsx", [["1", "01/01/2024", "x"]]))
+    sub = delta.expandir_delta([job], datetime.now())[0]
+    assert sub["delta"]["completo"] is False
+    assert sub["nome"] == "tarefas@delta"
+
+
+def test_data_iso():
+    assert delta._data_iso(Celula("n", "1", "45366")) == "2024-03-15"
+    assert delta._data_iso(Celula("s", None, "15/03/2024 10:30")) == "2024-03-15"
+    assert delta._data_iso(Celula("s", None, "sem data")) is None
+    assert delta._data_iso(None) is None
@@ -0,0 +1,31 @@
+# tests/test_esperas.py
+import time
+
+from services import esperas
+
+
+class _Nav:
+    def __init__(self, pronto_na=None):
+        self.chamadas = []
+        self.pronto_na = pronto_na
+
+    def avaliar_async(self, script, *args, timeout=30):
+        self.chamadas.append((args[-1], timeout))
+        time.sleep(args[-1] / 1000)   # o script só resolve no próprio timeout
+        return "iframe" if len(self.chamadas) == self.pronto_na else None
+
+
+def test_aguardar_iframe_fatia_a_espera_longa(monkeypatch):
+    monkeypatch.setattr(esperas, "FATIA_ASYNC_S", 0.05)
+    nav = _Nav(pronto_na=3)
+    assert esperas.aguardar_iframe(nav, "dlg", "pagina.elaw", timeout=5) == "iframe"
+    assert len(nav.chamadas) == 3
+    assert all(ms <= 50 for ms, _ in nav.chamadas)
+
+
+def test_aguardar_iframe_respeita_o_tempo_total(monkeypatch):
+    monkeypatch.setattr(esperas, "FATIA_ASYNC_S", 0.05)
+    nav = _Nav()
+    assert esperas.aguardar_iframe(nav, "dlg", "pagina.elaw", timeout=0.2) is None
+    assert 150 <= sum(ms for ms, _ in nav.chamadas) <= 200
+    assert max(t for _, t in nav.chamadas) <= esperas.FATIA_ASYNC_S + 5
@@ -0,0 +1,19 @@
+# tests/test_metricas_webdriver.py
+from selenium import webdriver
+
+from services import metricas_webdriver
+from services.baixar_relatorio import ler_pagina
+from services.navegador import NavegadorSelenium
+
+
+def test_comando_via_navegador_e_atribuido_ao_service(monkeypatch):
+    # Sem chromedriver: o comando "responde" direto, mas passa pela instrumentação
+    monkeypatch.setattr(webdriver.Chrome, "execute", lambda self, comando, params=None: {"value": None})
+    driver = object.__new__(metricas_webdriver.ChromeInstrumentado)
+    metricas_webdriver.zerar()
+
+    ler_pagina(NavegadorSelenium(driver))
+
+    por_chamador = metricas_webdriver.exportar()["por_chamador"]
+    assert list(por_chamador) == ["ler_pagina"]
+    assert por_chamador["ler_pagina"]["n"] == 1
@@ -0,0 +1,71 @@
+# tests/test_motor_http.py
+import pytest
+
+from services.motor_http import MotorHTTPErro, _Html, _resposta_parcial, _SessaoExpirada, _ViewExpirada
+
+
+def _parcial(corpo):
+    return f'<?xml version="1.0" encoding="UTF-8"?><partial-response id="j_id1">{corpo}</partial-response>'
+
+
+def test_resposta_parcial_updates_e_extension():
+    partes = _resposta_parcial(_parcial(
+        '<changes><update id="tabela"><![CDATA[<tr><td>1</td></tr>]]></update>'
+        '<update id="j_id1:javax.faces.ViewState:0"><![CDATA[vs-2]]></update>'
+        '<extension ln="primefaces" type="args">{"validationFailed":false}</extension></changes>'
+    ))
+    assert partes == {
+        "tabela": "<tr><td>1</td></tr>",
+        "j_id1:javax.faces.ViewState:0": "vs-2",
+        "extension": '{"validationFailed":false}',
+    }
+
+
+@pytest.mark.parametrize("texto, erro", [
+    (_parcial("<error><error-name>javax.faces.application.ViewExpiredException</error-name>"
+              "<error-message>expirou</error-message></error>"), _ViewExpirada),
+    (_parcial('<redirect url="/elaw/login.elaw"/>'), _SessaoExpirada),
+    ('<html><input id="fieldPassword" type="password"/></html>', _SessaoExpirada),
+])
+def test_resposta_parcial_sessao_e_view(texto, erro):
+    with pytest.raises(erro):
+        _resposta_parcial(texto)
+
+
+@pytest.mark.parametrize("texto", [
+    _parcial("<error><error-name>java.lang.NullPointerException</error-name></error>"),
+    _parcial('<redirect url="/elaw/outra.elaw"/>'),
+    "<html><body>erro 500</body></html>",
+    "não é xml",
+])
+def test_resposta_parcial_inesperada_vira_motor_erro(texto):
+    with pytest.raises(MotorHTTPErro) as exc:
+        _resposta_parcial(texto)
+    assert type(exc.value) is MotorHTTPErro
+
+
+def test_html_forms_selects_e_linhas():
+    html = _Html(
+        '<form id="frm" action="/elaw/relatorio.elaw">'
+        '<input type="hidden" name="frm" value="frm"/>'
+        '<input type="text" name="frm:filtro" value="abc"/>'
+        '<input type="submit" name="frm:ok" value="OK"/>'
+        '<select id="frm:status" name="frm:status_input">'
+        '<option value="1">Ativo</option><option> Encerrado </option></select>'
+        '<table><tbody id="frm:tabela_data">'
+        '<tr><td> 42 </td><td><a id="frm:tabela:0:dl" href="/baixar?id=42">Baixar</a></td></tr>'
+        '<tr></tr></tbody></table>'
+        '<input type="hidden" name="javax.faces.ViewState" value="vs-1"/></form>'
+    )
+    assert html.view_state() == "vs-1"
+    assert html.campos_do_form("frm:filtro") == (
+        "/elaw/relatorio.elaw", {"frm": "frm", "frm:filtro": "abc", "javax.faces.ViewState": "vs-1"}
+    )
+    assert html.campos_do_form("inexistente") == (None, None)
+    assert html.opcoes["frm:status"] == html.opcoes["frm:status_input"] == [("Ativo", "1"), ("Encerrado", "Encerrado")]
+
+    (linha,) = html.linhas["frm:tabela_data"]
+    assert [c["texto"] for c in linha] == ["42", "Baixar"]
+    assert linha[1]["href"] == "/baixar?id=42"
+    assert linha[1]["link_id"] == "frm:tabela:0:dl"
+    assert linha[0]["form"] == "frm"
@@ -0,0 +1,51 @@
+# tests/test_navegador_download.py
+from pathlib import Path
+
+from services import navegador
+from services.navegador import NavegadorSelenium
+
+
+class _Driver:
+    """Chrome sem monitor CDP: grava o download onde o setDownloadBehavior mandou."""
+
+    monitor_downloads = None
+
+    def __init__(self, padrao, aceita_cdp=True):
+        self.pasta_download = padrao
+        self.aceita_cdp = aceita_cdp
+
+    def execute_cdp_cmd(self, metodo, params):
+        if not self.aceita_cdp:
+            raise RuntimeError("CDP indisponível")
+        assert metodo == "Page.setDownloadBehavior"
+        self.pasta_download = Path(params["downloadPath"])
+        return {}
+
+
+def _clicar(driver):
+    def acionar():
+        (driver.pasta_download / "Relatorio.csv").write_text("id\n1\n", encoding="utf-8")
+    return acionar
+
+
+def test_sem_monitor_direciona_para_a_pasta_do_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(navegador, "DOWNLOADS_TEMP", tmp_path / "temp")
+    driver = _Driver(tmp_path / "temp")
+    pasta_job = tmp_path / "temp" / "job"
+
+    destino = NavegadorSelenium(driver).baixar(_clicar(driver), pasta_job, "final.csv", timeout=5)
+
+    assert destino == pasta_job.resolve() / "final.csv"
+    assert destino.read_text(encoding="utf-8") == "id\n1\n"
+
+
+def test_sem_cdp_observa_a_pasta_padrao_do_chrome(tmp_path, monkeypatch):
+    temp = tmp_path / "temp"
+    temp.mkdir()
+    monkeypatch.setattr(navegador, "DOWNLOADS_TEMP", temp)
+    driver = _Driver(temp, aceita_cdp=False)
+
+    destino = NavegadorSelenium(driver).baixar(_clicar(driver), temp / "job", "final.csv", timeout=5)
+
+    assert destino == temp / "final.csv"
+    assert destino.exists()
@@ -0,0 +1,66 @@
+# tests/test_validacao.py
+import pytest
+
+from services import download_http
+from services.validacao import arquivo_completo, csv_completo
+
+_CSV = "id,nome\n1,a\n2,b\n3,c\n".encode("utf-8")
+
+
+def test_csv_cortado_numa_quebra_de_linha(tmp_path):
+    cortado = tmp_path / "rel.csv"
+    cortado.write_bytes(_CSV[:_CSV.index(b"2,b")])
+
+    assert not csv_completo(cortado, tamanho_esperado=len(_CSV))
+    assert not csv_completo(cortado, linhas_esperadas=4)
+    assert not csv_completo(cortado, trailer="3,c")
+    # sem tamanho/linhas/trailer o corte não é detectável (ver docstring)
+    assert csv_completo(cortado)
+
+
+def test_csv_inteiro(tmp_path):
+    inteiro = tmp_path / "rel.csv"
+    inteiro.write_bytes(_CSV)
+    assert arquivo_completo(inteiro, tamanho_esperado=len(_CSV), linhas_esperadas=4)
+    assert not csv_completo(tmp_path / "nao_existe.csv")
+
+
+class _Resposta:
+    def __init__(self, corpo, headers):
+        self.corpo, self.headers, self.status_code = corpo, headers, 200
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield self.corpo
+
+
+class _Sessao:
+    def __init__(self, corpo, headers):
+        self.corpo, self.headers = corpo, headers
+
+    def get(self, url, **kwargs):
+        return _Resposta(self.corpo, self.headers)
+
+
+def test_baixar_url_nao_publica_csv_menor_que_o_content_length(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_http.time, "sleep", lambda s: None)
+    cortado = _CSV[:_CSV.index(b"2,b")]
+    sessao = _Sessao(cortado, {"Content-Type": "text/csv", "Content-Length": str(len(_CSV))})
+
+    with pytest.raises(download_http.requests.ConnectionError):
+        download_http.baixar_url(sessao, "http://portal/rel.csv", tmp_path / "rel.csv")
+    assert not (tmp_path / "rel.csv").exists()
+
+
+def test_baixar_url_csv_completo(tmp_path):
+    sessao = _Sessao(_CSV, {"Content-Type": "text/csv", "Content-Length": str(len(_CSV))})
+    destino, _ = download_http.baixar_url(sessao, "http://portal/rel.csv", tmp_path / "rel.csv")
+    assert destino.read_bytes() == _CSV
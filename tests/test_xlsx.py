@@ -0,0 +1,26 @@
+# tests/test_xlsx.py
+from services import xlsx
+from services.xlsx import Celula
+
+
+def test_colunas_ida_e_volta():
+    for i in (0, 25, 26, 701, 702):
+        assert xlsx.coluna_indice(xlsx.coluna_letras(i)) == i
+    assert xlsx.coluna_letras(26) == "AA"
+
+
+def test_le_de_volta_colunas_esparsas(tmp_path):
+    arquivo = tmp_path / "esparso.xlsx"
+    linhas = [
+        [Celula("s", None, "ID"), Celula("s", None, "Nome"), Celula("s", None, "Valor")],
+        [Celula("n", None, "1"), None, Celula("n", None, "2.5")],
+        [None, Celula("s", None, "só o meio & <xml>")],
+        [],
+    ]
+    assert xlsx.escrever_xlsx(arquivo, linhas) == 4
+
+    lidas = list(xlsx.ler_linhas(arquivo))
+    assert lidas[0] == linhas[0]
+    assert lidas[1] == [Celula("n", None, "1"), None, Celula("n", None, "2.5")]
+    assert lidas[2] == [None, Celula("s", None, "só o meio & <xml>")]
+    assert lidas[3] == []
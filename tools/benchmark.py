@@ -0,0 +1,204 @@
+# tools/benchmark.py
+"""
+Benchmark ponta a ponta do robô contra o portal simulado (tools/mock_elaw.py).
+
+Mede o tempo de parede e o número de comandos WebDriver por etapa (driver,
+login, gerar, baixar, total) em N execuções e compara as medianas com uma
+baseline salva; sai com código 1 se alguma etapa regredir além da tolerância.
+
+Uso:
+    py -m tools.benchmark --execucoes 5
+    py -m tools.benchmark --execucoes 5 --salvar-baseline
+    py -m tools.benchmark --relatorios 3     (3 jobs em pipeline por execução)
+    py -m tools.benchmark --motor http       (sem navegador, services/motor_http.py)
+    py -m tools.benchmark --backend playwright   (navegador via Playwright/CDP)
+    py -m tools.benchmark --perfil enxuto    (bloqueio de recursos; compara o carregamento por página)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from tools.mock_elaw import OPCOES_PADRAO, iniciar_servidor
+
+BASELINE_PADRAO = Path(__file__).with_name("benchmark_baseline.json")
+ETAPAS = ["driver", "login", "gerar", "baixar", "total"]
+
+
+def _preparar_ambiente(url_base, pasta_trabalho, perfil="padrao"):
+    """Aponta o robô para o mock ANTES de importar config/services."""
+    os.environ["ELAW_URL_BASE"] = url_base
+    os.environ.setdefault("EUSER", "benchmark")
+    os.environ.setdefault("EPASS", "benchmark")
+    os.environ["FINAL_DIR"] = str(pasta_trabalho / "final")
+    os.environ["CACHE_DIR"] = str(pasta_trabalho / "cache")
+    os.environ["HISTORICO_PATH"] = str(pasta_trabalho / "historico.jsonl")
+    os.environ["PERFIL_NAVEGADOR"] = perfil
+    os.environ.setdefault("HEADLESS", "true")
+
+
+def carregamentos_por_pagina() -> dict:
+    """Mediana (s) dos spans "carregamento" por página, de todas as execuções."""
+    from services.tracing import ler_historico
+
+    por_pagina = {}
+    for r in ler_historico(tipo="span"):
+        if r.get("nome") == "carregamento":
+            por_pagina.setdefault(r["pagina"], []).append(r["duracao_s"])
+    return {p: statistics.median(v) for p, v in sorted(por_pagina.items())}
+
+
+def executar_uma(pasta_final, intervalo_baixar, relatorios=1, motor="navegador", backend="selenium"):
+    from services.navegador import criar_navegador
+    from services.auth import garantir_login
+    from services.jobs import normalizar_job
+    from services.motor_http import ClienteJSF, MotorHTTP
+    from services.pipeline import MotorNavegador, submeter_jobs, baixar_jobs
+    from services.metricas_webdriver import total_comandos, zerar
+
+    jobs = [normalizar_job({"nome": f"job{i}", "arquivo": f"benchmark_{i}.xlsx"}) for i in range(relatorios)]
+
+    tempos, comandos = {}, {}
+    zerar()
+    inicio_total = time.perf_counter()
+
+    def medir(etapa, funcao, *args):
+        t, c = time.perf_counter(), total_comandos()
+        resultado = funcao(*args)
+        tempos[etapa] = time.perf_counter() - t
+        comandos[etapa] = total_comandos() - c
+        return resultado
+
+    nav = None
+    try:
+        if motor == "http":
+            cliente = medir("driver", ClienteJSF)
+            m = medir("login", MotorHTTP, cliente)
+        else:
+            nav = medir("driver", criar_navegador, backend)
+            medir("login", garantir_login, nav)
+            m = MotorNavegador(nav)
+        pendencias = medir("gerar", submeter_jobs, m, jobs)
+        medir("baixar", baixar_jobs, m, pendencias, pasta_final, intervalo_baixar)
+    finally:
+        if nav is not None:
+            nav.fechar()
+
+    tempos["total"] = time.perf_counter() - inicio_total
+    comandos["total"] = total_comandos()
+    return tempos, comandos
+
+
+def comparar(medianas, baseline, tolerancia, folga, unidade="s"):
+    """Lista de regressões: etapas cuja mediana passou de baseline*(1+tolerancia)+folga."""
+    regressoes = []
+    for etapa, atual in medianas.items():
+        ref = baseline.get(etapa)
+        if ref is None:
+            continue
+        limite = ref * (1 + tolerancia) + folga
+        if atual > limite:
+            regressoes.append(
+                f"{etapa}: {atual:.2f}{unidade} > limite {limite:.2f}{unidade} (baseline {ref:.2f}{unidade})"
+            )
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do robô contra o portal simulado.")
+    parser.add_argument("--execucoes", type=int, default=3)
+    parser.add_argument("--relatorios", type=int, default=1, help="relatórios (jobs) por execução, em pipeline")
+    parser.add_argument("--motor", choices=["navegador", "http"], default="navegador")
+    parser.add_argument("--backend", choices=["selenium", "playwright"], default="selenium",
+                        help="backend do navegador (motor navegador); comandos WebDriver só no selenium")
+    parser.add_argument("--perfil", choices=["padrao", "enxuto"], default="padrao",
+                        help="perfil do navegador (PERFIL_NAVEGADOR)")
+    parser.add_argument("--baseline", type=Path, default=None,
+                        help="default: benchmark_baseline.json (ou benchmark_baseline_<motor|backend>[_enxuto].json)")
+    parser.add_argument("--salvar-baseline", action="store_true")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="regressão relativa aceita (0.25 = 25%%)")
+    parser.add_argument("--folga", type=float, default=0.5, help="folga absoluta (s) por etapa")
+    parser.add_argument("--tolerancia-comandos", type=float, default=0.1,
+                        help="aumento relativo aceito no nº de comandos WebDriver por etapa")
+    parser.add_argument("--saida", type=Path, default=Path("logs/benchmark.json"))
+    for nome, padrao in OPCOES_PADRAO.items():
+        parser.add_argument("--" + nome.replace("_", "-"), type=type(padrao), default=padrao)
+    args = parser.parse_args()
+
+    if args.baseline is None:
+        if args.motor == "http":
+            sufixo = "_http"
+        else:
+            sufixo = "" if args.backend == "selenium" else f"_{args.backend}"
+            if args.perfil != "padrao":
+                sufixo += f"_{args.perfil}"
+        args.baseline = BASELINE_PADRAO.with_name(f"benchmark_baseline{sufixo}.json")
+
+    opcoes = {k: getattr(args, k) for k in OPCOES_PADRAO}
+    servidor, url = iniciar_servidor(**opcoes)
+    pasta_trabalho = Path(tempfile.mkdtemp(prefix="robo-bench-"))
+    _preparar_ambiente(url, pasta_trabalho, args.perfil)
+    rotulo = args.motor if args.motor == "http" else f"{args.motor}/{args.backend}/{args.perfil}"
+    print(f"🧪 Portal simulado em {url} — {args.execucoes} execução(ões), motor {rotulo}")
+
+    # consulta a lista de relatórios ~4x durante o tempo de geração simulado
+    intervalo_baixar = max(args.pronto_apos / 4, 1) / 60
+
+    execucoes = []
+    try:
+        for i in range(args.execucoes):
+            tempos, comandos = executar_uma(pasta_trabalho / "final", intervalo_baixar, args.relatorios, args.motor,
+                                            args.backend)
+            execucoes.append({"tempos": tempos, "comandos": comandos})
+            print(f"⏱️ Execução {i + 1}: " + ", ".join(
+                f"{k}={tempos[k]:.2f}s/{comandos[k]}cmd" for k in ETAPAS
+            ))
+    finally:
+        servidor.shutdown()
+
+    medianas = {
+        tipo: {e: statistics.median(x[tipo][e] for x in execucoes) for e in ETAPAS}
+        for tipo in ("tempos", "comandos")
+    }
+    print("📊 Medianas: " + ", ".join(
+        f"{e}={medianas['tempos'][e]:.2f}s/{medianas['comandos'][e]:.0f}cmd" for e in ETAPAS
+    ))
+    medianas["carregamentos"] = carregamentos_por_pagina()
+    if medianas["carregamentos"]:
+        print(f"🪶 Carregamento por página (perfil {args.perfil}): " + ", ".join(
+            f"{p}={t:.2f}s" for p, t in medianas["carregamentos"].items()
+        ))
+
+    args.saida.parent.mkdir(parents=True, exist_ok=True)
+    args.saida.write_text(json.dumps(
+        {"opcoes": opcoes, "motor": args.motor, "backend": args.backend, "perfil": args.perfil, "relatorios": args.relatorios, "execucoes": execucoes, "medianas": medianas}, indent=2
+    ), encoding="utf-8")
+
+    if args.salvar_baseline:
+        args.baseline.write_text(json.dumps(medianas, indent=2), encoding="utf-8")
+        print(f"💾 Baseline salva em {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("⚠️ Sem baseline para comparar (use --salvar-baseline).")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressoes = comparar(medianas["tempos"], baseline.get("tempos", {}), args.tolerancia, args.folga)
+    regressoes += comparar(medianas["carregamentos"], baseline.get("carregamentos", {}), args.tolerancia, args.folga)
+    regressoes += comparar(medianas["comandos"], baseline.get("comandos", {}),
+                           args.tolerancia_comandos, 0, unidade=" cmd")
+    if regressoes:
+        print("❌ Regressões detectadas:\n  " + "\n  ".join(regressoes))
+        return 1
+    print("✅ Sem regressões em relação à baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
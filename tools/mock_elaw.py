@@ -0,0 +1,606 @@
+# tools/mock_elaw.py
+"""
+Portal eLaw simulado (local) para testes ponta a ponta e benchmark do robô.
+
+Reproduz apenas o que o robô usa: login (fieldUser/fieldPassword),
+processoView.elaw com o menu da maleta, agendamentoContenciosoList.elaw
+(tabSearchTab:*), o diálogo #btnExcel_dlg com o iframe elawReportGerarDialog.elaw,
+userElawReportRequestList.elaw (tableElawReportRequest_data, paginada e com
+filtro na coluna ID) e o download do .xlsx.
+A fila AJAX do PrimeFaces é emulada (PrimeFaces.ajax.Queue.isEmpty) para
+exercitar as esperas do robô.
+
+Para o motor HTTP (services/motor_http.py) as mesmas páginas trazem o
+javax.faces.ViewState e aceitam POSTs parciais JSF (Faces-Request:
+partial/ajax), respondendo <partial-response> com ViewState rotativo
+(ViewExpiredException se vier um ViewState velho).
+
+Uso:
+    py -m tools.mock_elaw --porta 8765 --pronto-apos 20
+    (no .env do robô: ELAW_URL_BASE=http://127.0.0.1:8765)
+"""
+
+import argparse
+import io
+import json
+import re
+import secrets
+import threading
+import time
+import zipfile
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+OPCOES_PADRAO = {
+    "latencia": 0.05,       # atraso (s) de toda resposta HTTP
+    "latencia_ajax": 0.2,   # atraso (s) extra das chamadas AJAX
+    "iframe_atraso": 1.0,   # atraso (s) até o iframe do diálogo Excel receber o src
+    "pronto_apos": 10.0,    # tempo (s) até um relatório solicitado ficar pronto
+    "linhas": 2000,         # linhas do .xlsx gerado
+    "por_pagina": 10,       # linhas por página em "Meus relatórios"
+    "filtro_id": 1,         # 1 = coluna ID com filtro (ui-column-filter); 0 = só paginação
+    "historico": 0,         # relatórios antigos pré-existentes na lista
+}
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# valor da opção -> rótulo do <select> de modelos no diálogo Excel
+_MODELOS = {"1": "Processos", "2": "Tarefas"}
+
+# ============================ PÁGINAS ============================
+
+_JS_COMUM = """
+<script>
+window.PrimeFaces = {ajax: {Queue: {pendentes: 0, isEmpty: function(){ return this.pendentes === 0; }}}};
+function ajax(url, opcoes, callback) {
+    PrimeFaces.ajax.Queue.pendentes++;
+    fetch(url, opcoes || {})
+        .then(function(r){ return r.json(); })
+        .then(function(dados){ if (callback) callback(dados); })
+        .finally(function(){ PrimeFaces.ajax.Queue.pendentes--; });
+}
+function ajaxFalso(ms, callback) {
+    PrimeFaces.ajax.Queue.pendentes++;
+    setTimeout(function(){ try { if (callback) callback(); } finally { PrimeFaces.ajax.Queue.pendentes--; } }, ms);
+}
+</script>
+"""
+
+
+def _pagina(titulo, corpo, etoken=""):
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{titulo}</title>
+<style>body{{font-family:sans-serif;min-height:900px}} .oculto{{display:none}}
+li.ui-selectcheckboxmenu-item{{height:28px}}</style>
+{_JS_COMUM}</head>
+<body data-etoken="{etoken}">
+<ul class="topbar">
+  <li class="profile-item"><span class="profile-name">Usuário Mock</span></li>
+  <li class="notifications-item"><a href="#" onclick="document.getElementById('menuMaleta').classList.toggle('oculto');return false;"><i class="pi pi-briefcase"></i></a>
+    <ul id="menuMaleta" class="oculto">
+      <li><a href="userElawReportRequestList.elaw?faces-redirect=true&amp;etoken={etoken}">Meus relatórios</a></li>
+    </ul>
+  </li>
+</ul>
+{corpo}
+</body></html>"""
+
+
+def _pagina_login():
+    return """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Login</title></head><body>
+<form id="loginForm" method="post" action="login.elaw">
+  <input id="fieldUser" name="fieldUser" type="text">
+  <input id="fieldPassword" name="fieldPassword" type="password">
+  <button type="submit">Entrar</button>
+</form></body></html>"""
+
+
+def _pagina_processo(etoken):
+    return _pagina("Processos", "<h1>processoView</h1>", etoken)
+
+
+_STATUS_ITENS = [("1", "Pendentes"), ("2", "Concluídas"), ("4", "Atrasadas"), ("8", "A vencer")]
+
+
+def _pagina_agendamentos(etoken, iframe_atraso):
+    itens = "".join(
+        f"""<li class="ui-selectcheckboxmenu-item" data-item-value="{v}">
+              <div class="ui-chkbox"><div class="ui-chkbox-box"></div></div><label>{rotulo}</label></li>"""
+        for v, rotulo in _STATUS_ITENS
+    )
+    corpo = f"""
+<form id="tabSearchTab">
+  <input id="tabSearchTab:dataFrom_input" type="text">
+  <input id="tabSearchTab:dataTo_input" type="text">
+  <div><input id="tabSearchTab:tipoTarefa_input" name="tabSearchTab:tipoTarefa_input" type="checkbox"><label for="tabSearchTab:tipoTarefa_input">Tarefa</label></div>
+
+  <div id="tabSearchTab:status" class="ui-selectcheckboxmenu">
+    <ul class="ui-selectcheckboxmenu-tokens"></ul>
+    <div class="ui-selectcheckboxmenu-trigger"><span class="ui-icon ui-icon-triangle-1-s">▼</span></div>
+  </div>
+  <div id="tabSearchTab:status_panel" class="ui-selectcheckboxmenu-panel oculto">
+    <a href="#" onclick="return false;"><span class="ui-icon ui-icon-circle-close">x</span></a>
+    <div class="ui-selectcheckboxmenu-items-wrapper" style="max-height:60px;overflow:auto">
+      <ul>{itens}</ul>
+    </div>
+  </div>
+
+  <button id="tabSearchTab:btnPesquisar" type="button">Pesquisar</button>
+</form>
+<div id="escolherColumnDialog" style="display:none"></div>
+<div id="resultado"></div>
+<button id="btnExcel" type="button">Excel</button>
+
+<script>
+(function(){{
+    var menu = document.getElementById('tabSearchTab:status');
+    var panel = document.getElementById('tabSearchTab:status_panel');
+    var tokens = menu.querySelector('.ui-selectcheckboxmenu-tokens');
+
+    function renderTokens() {{
+        tokens.innerHTML = '';
+        panel.querySelectorAll('li.ui-selectcheckboxmenu-item').forEach(function(li){{
+            if (!li.querySelector('.ui-chkbox-box').classList.contains('ui-state-active')) return;
+            var t = document.createElement('li');
+            t.className = 'ui-selectcheckboxmenu-token';
+            t.innerHTML = '<span class="ui-selectcheckboxmenu-token-icon">x</span>'
+                + '<span class="ui-selectcheckboxmenu-token-label">' + li.querySelector('label').textContent + '</span>';
+            t.querySelector('.ui-selectcheckboxmenu-token-icon').addEventListener('click', function(){{
+                li.querySelector('.ui-chkbox-box').classList.remove('ui-state-active');
+                ajaxFalso(100, renderTokens);
+            }});
+            tokens.appendChild(t);
+        }});
+    }}
+
+    panel.querySelectorAll('.ui-chkbox-box').forEach(function(box){{
+        box.addEventListener('click', function(){{
+            box.classList.toggle('ui-state-active');
+            ajaxFalso(100, renderTokens);
+        }});
+    }});
+    menu.querySelector('.ui-selectcheckboxmenu-trigger').addEventListener('click', function(){{
+        panel.classList.remove('oculto');
+    }});
+    panel.querySelector('.ui-icon-circle-close').addEventListener('click', function(){{
+        panel.classList.add('oculto');
+    }});
+
+    // estado inicial do portal: "Pendentes" já marcado
+    panel.querySelector("li[data-item-value='1'] .ui-chkbox-box").classList.add('ui-state-active');
+    renderTokens();
+
+    document.getElementById('tabSearchTab:btnPesquisar').addEventListener('click', function(){{
+        ajax('api/agendamentos', {{method: 'POST'}}, function(dados){{
+            document.getElementById('resultado').innerHTML =
+                '<table id="tabSearchTab:dataTable"><tbody>' +
+                dados.linhas.map(function(l){{ return '<tr><td>' + l.join('</td><td>') + '</td></tr>'; }}).join('') +
+                '</tbody></table>';
+        }});
+    }});
+
+    document.getElementById('btnExcel').addEventListener('click', function(){{
+        ajaxFalso(100, function(){{
+            var dlg = document.createElement('div');
+            dlg.id = 'btnExcel_dlg';
+            dlg.innerHTML = '<iframe style="width:800px;height:400px"></iframe>';
+            document.body.appendChild(dlg);
+            setTimeout(function(){{
+                dlg.querySelector('iframe').src = 'elawReportGerarDialog.elaw?pfdlgcid=' + Date.now();
+            }}, {int(iframe_atraso * 1000)});
+        }});
+    }});
+}})();
+</script>"""
+    return _pagina("Agendamentos", corpo, etoken)
+
+
+def _pagina_dialogo_relatorio():
+    return """<!DOCTYPE html>
+<html><head><meta charset="utf-8">""" + _JS_COMUM + """</head><body>
+<form id="elawReportForm">
+  <input type="radio" id="elawReportForm:elawReportOption:0" name="opcao">
+  <label for="elawReportForm:elawReportOption:0">Modelos pré-configurados</label>
+  <button id="elawReportForm:continuarBtn" type="button">Continuar</button>
+
+  <div id="passo2" style="display:none">
+    <label id="elawReportForm:selectElawReport_label">Selecione</label>
+    <ul id="elawReportForm:selectElawReport_items" style="display:none">
+      <li>Processos</li><li>Tarefas</li>
+    </ul>
+    <button id="elawReportForm:elawReportGerarBtn" type="button">Gerar</button>
+  </div>
+  <div id="resultadoId"></div>
+</form>
+<script>
+document.getElementById('elawReportForm:continuarBtn').addEventListener('click', function(){
+    ajaxFalso(150, function(){ document.getElementById('passo2').style.display = 'block'; });
+});
+document.getElementById('elawReportForm:selectElawReport_label').addEventListener('click', function(){
+    document.getElementById('elawReportForm:selectElawReport_items').style.display = 'block';
+});
+document.querySelectorAll('#elawReportForm\\\\:selectElawReport_items li').forEach(function(li){
+    li.addEventListener('click', function(){
+        document.getElementById('elawReportForm:selectElawReport_label').textContent = li.textContent;
+        document.getElementById('elawReportForm:selectElawReport_items').style.display = 'none';
+    });
+});
+document.getElementById('elawReportForm:elawReportGerarBtn').addEventListener('click', function(){
+    var modelo = document.getElementById('elawReportForm:selectElawReport_label').textContent;
+    ajax('api/relatorios', {method: 'POST', body: JSON.stringify({modelo: modelo})}, function(dados){
+        document.getElementById('resultadoId').innerHTML =
+            '<div class="ui-g"><div><span>ID</span></div><div>' + dados.id + '</div></div>';
+    });
+});
+</script></body></html>"""
+
+
+def _pagina_meus_relatorios(etoken, filtro_id):
+    filtro = '<input id="filtroId" class="ui-column-filter" type="text">' if filtro_id else ""
+    corpo = f"""
+<button id="btnPesquisar" type="button">Pesquisar</button>
+<table id="tableElawReportRequest">
+  <thead><tr><th>Data</th><th>Relatório</th><th>Download</th><th>ID {filtro}</th><th>Status</th></tr></thead>
+  <tbody id="tableElawReportRequest_data"></tbody>
+</table>
+<div class="ui-paginator"><a href="#" class="ui-paginator-next ui-state-disabled">Próxima</a></div>
+<script>
+var pagina = 0, atrasoFiltro = null;
+function carregar() {{
+    var filtro = document.getElementById('filtroId');
+    var q = '?pagina=' + pagina + (filtro && filtro.value ? '&id=' + encodeURIComponent(filtro.value) : '');
+    ajax('api/relatorios' + q, {{}}, function(dados){{
+        document.getElementById('tableElawReportRequest_data').innerHTML = dados.relatorios.map(function(r){{
+            var link = r.pronto ? '<a href="download/' + r.id + '">Baixar</a>' : 'Processando';
+            return '<tr><td>' + r.data + '</td><td>' + r.modelo + '</td><td>' + link + '</td><td>'
+                + r.id + '</td><td>' + (r.pronto ? 'Concluído' : 'Em processamento') + '</td></tr>';
+        }}).join('');
+        document.querySelector('.ui-paginator-next').classList.toggle('ui-state-disabled', !dados.proxima);
+    }});
+}}
+document.getElementById('btnPesquisar').addEventListener('click', function(){{ pagina = 0; carregar(); }});
+document.querySelector('.ui-paginator-next').addEventListener('click', function(ev){{
+    ev.preventDefault();
+    if (this.classList.contains('ui-state-disabled')) return;
+    pagina++; carregar();
+}});
+if (document.getElementById('filtroId')) {{
+    document.getElementById('filtroId').addEventListener('keyup', function(){{
+        clearTimeout(atrasoFiltro);
+        atrasoFiltro = setTimeout(function(){{ pagina = 0; carregar(); }}, 300);
+    }});
+}}
+</script>"""
+    return _pagina("Meus relatórios", corpo, etoken)
+
+
+def _com_view_state(html, view_state):
+    campo = (f'<input type="hidden" name="javax.faces.ViewState" '
+             f'id="j_id1:javax.faces.ViewState:0" value="{view_state}">')
+    return html.replace("</body>", campo + "</body>", 1)
+
+
+def _linha_relatorio(r):
+    link = f'<a href="download/{r["id"]}">Baixar</a>' if r["pronto"] else "Processando"
+    return (f'<tr><td>{r["data"]}</td><td>{r["modelo"]}</td><td>{link}</td><td>{r["id"]}</td>'
+            f'<td>{"Concluído" if r["pronto"] else "Em processamento"}</td></tr>')
+
+
+def _xml_parcial(atualizacoes=None, avaliar=None, erro=None):
+    """<partial-response> JSF com os <update> (CDATA), um <eval> opcional ou um <error>."""
+    xml = ['<?xml version="1.0" encoding="UTF-8"?><partial-response id="j_id1">']
+    if erro:
+        xml.append(f"<error><error-name>{erro[0]}</error-name><error-message><![CDATA[{erro[1]}]]>"
+                   "</error-message></error>")
+    else:
+        xml.append("<changes>")
+        for id_, conteudo in (atualizacoes or {}).items():
+            xml.append(f'<update id="{id_}"><![CDATA[{conteudo}]]></update>')
+        if avaliar:
+            xml.append(f"<eval><![CDATA[{avaliar}]]></eval>")
+        xml.append("</changes>")
+    xml.append("</partial-response>")
+    return "".join(xml)
+
+
+def gerar_xlsx(linhas, relatorio_id):
+    """xlsx mínimo (inlineStr) com `linhas` tarefas fictícias."""
+    def celula(ref, valor):
+        return f'<c r="{ref}" t="inlineStr"><is><t>{valor}</t></is></c>'
+
+    cabecalho = ["ID Tarefa", "Processo", "Data", "Status"]
+    xml = io.StringIO()
+    xml.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+              '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+    xml.write('<row r="1">' + "".join(celula(f"{c}1", v) for c, v in zip("ABCD", cabecalho)) + "</row>")
+    for i in range(linhas):
+        r = i + 2
+        valores = [f"{relatorio_id}-{i}", f"0000{i:06d}-00.2025.8.12.0001",
+                   f"{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/2025", "Pendente"]
+        xml.write(f'<row r="{r}">' + "".join(celula(f"{c}{r}", v) for c, v in zip("ABCD", valores)) + "</row>")
+    xml.write("</sheetData></worksheet>")
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml",
+                    '<?xml version="1.0" encoding="UTF-8"?>'
+                    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                    '<Default Extension="xml" ContentType="application/xml"/>'
+                    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                    '</Types>')
+        zf.writestr("_rels/.rels",
+                    '<?xml version="1.0" encoding="UTF-8"?>'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+                    '</Relationships>')
+        zf.writestr("xl/workbook.xml",
+                    '<?xml version="1.0" encoding="UTF-8"?>'
+                    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                    '<sheets><sheet name="Tarefas" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    '<?xml version="1.0" encoding="UTF-8"?>'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+                    '</Relationships>')
+        zf.writestr("xl/worksheets/sheet1.xml", xml.getvalue())
+    return buf.getvalue()
+
+
+# ============================ SERVIDOR ============================
+
+class EstadoPortal:
+    def __init__(self, opcoes):
+        self.opcoes = dict(OPCOES_PADRAO, **opcoes)
+        self.sessoes = {}        # JSESSIONID -> etoken
+        self.view_states = {}    # (JSESSIONID, caminho) -> ViewState atual
+        self.relatorios = {}     # id -> {"criado": t, "modelo": str}
+        self.arquivos = {}       # id -> bytes do xlsx
+        self.proximo_id = 3612900
+        self.lock = threading.Lock()
+        antigo = time.time() - 86400
+        for _ in range(int(self.opcoes["historico"])):
+            self.relatorios[str(self.proximo_id)] = {"criado": antigo, "modelo": "Tarefas"}
+            self.proximo_id += 1
+
+    def criar_relatorio(self, modelo):
+        with self.lock:
+            self.proximo_id += 1
+            rid = str(self.proximo_id)
+            self.relatorios[rid] = {"criado": time.time(), "modelo": modelo}
+        return rid
+
+    def listar(self, inicio, filtro=""):
+        """(relatórios de [inicio, inicio + por_pagina), há próxima?), mais recentes primeiro."""
+        por_pagina = int(self.opcoes["por_pagina"])
+        ids = sorted(self.relatorios, key=int, reverse=True)
+        if filtro:
+            ids = [rid for rid in ids if filtro in rid]
+        fatia = [
+            {"id": rid, "modelo": self.relatorios[rid]["modelo"], "pronto": self.pronto(rid),
+             "data": time.strftime("%d/%m/%Y %H:%M", time.localtime(self.relatorios[rid]["criado"]))}
+            for rid in ids[inicio:inicio + por_pagina]
+        ]
+        return fatia, inicio + por_pagina < len(ids)
+
+    def novo_view_state(self, sid, caminho):
+        vs = secrets.token_urlsafe(12)
+        self.view_states[(sid, caminho)] = vs
+        return vs
+
+    def pronto(self, rid):
+        return time.time() - self.relatorios[rid]["criado"] >= self.opcoes["pronto_apos"]
+
+    def arquivo(self, rid):
+        with self.lock:
+            if rid not in self.arquivos:
+                self.arquivos[rid] = gerar_xlsx(self.opcoes["linhas"], rid)
+            return self.arquivos[rid]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    estado: EstadoPortal = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    # ---------- utilitários ----------
+    def _sessao(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        sid = cookie["JSESSIONID"].value if "JSESSIONID" in cookie else None
+        return sid if sid in self.estado.sessoes else None
+
+    def _responder(self, status, corpo=b"", tipo="text/html; charset=utf-8", headers=None):
+        if isinstance(corpo, str):
+            corpo = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(corpo)
+
+    def _redirecionar(self, destino, headers=None):
+        h = {"Location": destino}
+        h.update(headers or {})
+        self._responder(302, b"", headers=h)
+
+    def _json(self, dados):
+        time.sleep(self.estado.opcoes["latencia_ajax"])
+        self._responder(200, json.dumps(dados), "application/json")
+
+    def _ler_corpo(self):
+        tam = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(tam) if tam else b""
+
+    # ---------- rotas ----------
+    def do_GET(self):
+        time.sleep(self.estado.opcoes["latencia"])
+        caminho = urlparse(self.path).path.rstrip("/") or "/"
+
+        if caminho in ("/", "/login.elaw"):
+            return self._responder(200, _pagina_login())
+        if caminho == "/logout":
+            cookie = SimpleCookie(self.headers.get("Cookie", ""))
+            if "JSESSIONID" in cookie:
+                self.estado.sessoes.pop(cookie["JSESSIONID"].value, None)
+            return self._redirecionar("/login.elaw")
+
+        sid = self._sessao()
+        if sid is None:
+            return self._redirecionar("/login.elaw")
+        etoken = self.estado.sessoes[sid]
+
+        if caminho in ("/processoView.elaw", "/homePage.elaw"):
+            return self._responder(200, _pagina_processo(etoken))
+        if caminho == "/agendamentoContenciosoList.elaw":
+            html = _pagina_agendamentos(etoken, self.estado.opcoes["iframe_atraso"])
+            return self._responder(200, _com_view_state(html, self.estado.novo_view_state(sid, caminho)))
+        if caminho == "/elawReportGerarDialog.elaw":
+            html = _pagina_dialogo_relatorio()
+            return self._responder(200, _com_view_state(html, self.estado.novo_view_state(sid, caminho)))
+        if caminho == "/userElawReportRequestList.elaw":
+            html = _pagina_meus_relatorios(etoken, self.estado.opcoes["filtro_id"])
+            return self._responder(200, _com_view_state(html, self.estado.novo_view_state(sid, caminho)))
+        if caminho == "/api/relatorios":
+            return self._listar_relatorios(parse_qs(urlparse(self.path).query))
+
+        m = re.fullmatch(r"/download/(\d+)", caminho)
+        if m and m.group(1) in self.estado.relatorios and self.estado.pronto(m.group(1)):
+            return self._download(m.group(1))
+
+        self._responder(404, "não encontrado")
+
+    do_HEAD = do_GET
+
+    def _listar_relatorios(self, query):
+        """Uma página da lista (mais recentes primeiro), opcionalmente filtrada por ID."""
+        pagina = int(query.get("pagina", ["0"])[0])
+        filtro = query.get("id", [""])[0].strip()
+        relatorios, proxima = self.estado.listar(pagina * int(self.estado.opcoes["por_pagina"]), filtro)
+        return self._json({"relatorios": relatorios, "proxima": proxima})
+
+    def _download(self, rid):
+        dados = self.estado.arquivo(rid)
+        headers = {
+            "Content-Disposition": f'attachment; filename="Relatorio_{rid}.xlsx"',
+            "Accept-Ranges": "bytes",
+        }
+        faixa = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if faixa:
+            inicio = int(faixa.group(1))
+            if inicio >= len(dados):
+                return self._responder(416, b"", XLSX_MIME, headers)
+            headers["Content-Range"] = f"bytes {inicio}-{len(dados) - 1}/{len(dados)}"
+            return self._responder(206, dados[inicio:], XLSX_MIME, headers)
+        self._responder(200, dados, XLSX_MIME, headers)
+
+    def do_POST(self):
+        time.sleep(self.estado.opcoes["latencia"])
+        caminho = urlparse(self.path).path
+        corpo = self._ler_corpo()
+
+        if caminho == "/login.elaw":
+            form = parse_qs(corpo.decode("utf-8"))
+            if not form.get("fieldUser") or not form.get("fieldPassword"):
+                return self._responder(200, _pagina_login())
+            sid = secrets.token_hex(16)
+            self.estado.sessoes[sid] = secrets.token_hex(8)
+            return self._redirecionar(
+                "/processoView.elaw", {"Set-Cookie": f"JSESSIONID={sid}; Path=/; HttpOnly"}
+            )
+
+        sid = self._sessao()
+        if sid is None:
+            return self._redirecionar("/login.elaw")
+
+        if self.headers.get("Faces-Request") == "partial/ajax":
+            return self._jsf_parcial(sid, caminho, parse_qs(corpo.decode("utf-8"), keep_blank_values=True))
+        if caminho == "/api/agendamentos":
+            return self._json({"linhas": [[f"Tarefa {i}", "Pendente"] for i in range(20)]})
+        if caminho == "/api/relatorios":
+            modelo = json.loads(corpo or b"{}").get("modelo", "Tarefas")
+            return self._json({"id": self.estado.criar_relatorio(modelo)})
+
+        self._responder(404, "não encontrado")
+
+
+    def _jsf_parcial(self, sid, caminho, form):
+        """POST parcial JSF: valida o ViewState, executa o "clique" em javax.faces.source."""
+        time.sleep(self.estado.opcoes["latencia_ajax"])
+        campo = lambda nome: form.get(nome, [""])[0]
+        xml = lambda **kw: self._responder(200, _xml_parcial(**kw), "text/xml; charset=utf-8")
+
+        if campo("javax.faces.ViewState") != self.estado.view_states.get((sid, caminho)):
+            return xml(erro=("javax.faces.application.ViewExpiredException", "View could not be restored."))
+        fonte = campo("javax.faces.source")
+        atualizacoes, avaliar = {}, None
+
+        if caminho == "/agendamentoContenciosoList.elaw" and fonte == "tabSearchTab:btnPesquisar":
+            if not campo("tabSearchTab:dataFrom_input") or not form.get("tabSearchTab:status"):
+                return xml(erro=("javax.faces.FacesException", "Período e status são obrigatórios."))
+            if campo("tabSearchTab:tipoTarefa_input") != "on":
+                return xml(erro=("javax.faces.FacesException", "Tipo 'Tarefa' não marcado."))
+            linhas = "".join(f"<tr><td>Tarefa {i}</td><td>Pendente</td></tr>" for i in range(20))
+            atualizacoes["tabSearchTab"] = f'<table id="tabSearchTab:dataTable"><tbody>{linhas}</tbody></table>'
+        elif caminho == "/agendamentoContenciosoList.elaw" and fonte == "btnExcel":
+            avaliar = (f"PrimeFaces.openDialog({{url:'elawReportGerarDialog.elaw?pfdlgcid={secrets.token_hex(4)}',"
+                       "sourceComponentId:'btnExcel'});")
+        elif caminho == "/elawReportGerarDialog.elaw" and fonte == "elawReportForm:continuarBtn":
+            opcoes = "".join(f'<option value="{v}">{r}</option>' for v, r in _MODELOS.items())
+            atualizacoes["elawReportForm"] = (
+                '<select id="elawReportForm:selectElawReport_input" name="elawReportForm:selectElawReport_input">'
+                f'<option value="">Selecione</option>{opcoes}</select>'
+            )
+        elif caminho == "/elawReportGerarDialog.elaw" and fonte == "elawReportForm:elawReportGerarBtn":
+            modelo = _MODELOS.get(campo("elawReportForm:selectElawReport_input"))
+            if not modelo:
+                return xml(erro=("javax.faces.FacesException", "Selecione um relatório."))
+            rid = self.estado.criar_relatorio(modelo)
+            atualizacoes["elawReportForm"] = f'<div class="ui-g"><div><span>ID</span></div><div>{rid}</div></div>'
+        elif caminho == "/userElawReportRequestList.elaw" and fonte == "tableElawReportRequest":
+            filtro = campo("tableElawReportRequest:colId:filter").strip() if self.estado.opcoes["filtro_id"] else ""
+            relatorios, _ = self.estado.listar(int(campo("tableElawReportRequest_first") or 0), filtro)
+            atualizacoes["tableElawReportRequest"] = "".join(_linha_relatorio(r) for r in relatorios)
+        else:
+            return xml(erro=("javax.faces.FacesException", f"Componente desconhecido: {fonte}"))
+
+        atualizacoes["j_id1:javax.faces.ViewState:0"] = self.estado.novo_view_state(sid, caminho)
+        return xml(atualizacoes=atualizacoes, avaliar=avaliar)
+
+
+def iniciar_servidor(porta=0, **opcoes):
+    """Sobe o portal simulado numa thread. Retorna (servidor, url_base)."""
+    handler = type("HandlerPortal", (_Handler,), {"estado": EstadoPortal(opcoes)})
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portal eLaw simulado para testes/benchmark.")
+    parser.add_argument("--porta", type=int, default=8765)
+    for nome, padrao in OPCOES_PADRAO.items():
+        parser.add_argument("--" + nome.replace("_", "-"), type=type(padrao), default=padrao)
+    args = parser.parse_args()
+
+    opcoes = {k: getattr(args, k) for k in OPCOES_PADRAO}
+    servidor, url = iniciar_servidor(args.porta, **opcoes)
+    print(f"🧪 Portal eLaw simulado em {url} (ELAW_URL_BASE={url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()